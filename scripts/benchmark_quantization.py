@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Script that compares index memory and recall@k of the quantized encodings against exact float32 search
+"""
+
+import sys
+import time
+import json
+import argparse
+import shutil
+import tempfile
+from pathlib import Path
+import numpy as np
+import faiss
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from rag_system.index_factory import (
+    create_index,
+    recall_at_k,
+    rerank_exact,
+    set_search_defaults,
+    train_index,
+    with_ids,
+)
+from rag_system.vector_file import VectorFile
+
+def generate_embeddings(n_vectors: int, dimension: int, n_topics: int = 200, seed: int = 0) -> np.ndarray:
+    """Generates normalized embeddings clustered around topics, like sentence embeddings of a corpus"""
+    rng = np.random.default_rng(seed)
+    topics = rng.standard_normal((n_topics, dimension)).astype("float32")
+    vectors = topics[rng.integers(0, n_topics, n_vectors)]
+    vectors += 0.6 * rng.standard_normal((n_vectors, dimension)).astype("float32")
+    faiss.normalize_L2(vectors)
+    return vectors
+
+def benchmark_quantization(n_vectors: int, dimension: int, num_queries: int, k: int,
+                           index_types: list, rerank_factors: list, nprobe: int) -> dict:
+    """Measures memory, recall@k and latency per index type, with and without float32 rerank"""
+
+    print(f"📝 Generating {n_vectors:,} synthetic {dimension}-d embeddings...")
+    vectors = generate_embeddings(n_vectors + num_queries, dimension)
+    corpus, queries = vectors[:n_vectors], vectors[n_vectors:]
+    ids = np.arange(n_vectors, dtype="int64")
+
+    # Exact baseline
+    exact = faiss.IndexFlatIP(dimension)
+    exact.add(corpus)
+    _, exact_ids = exact.search(queries, k)
+    flat_bytes = len(faiss.serialize_index(exact))
+
+    # Float32 vectors on disk for the rerank, as VectorStore keeps them
+    temp_dir = tempfile.mkdtemp()
+    vector_file = VectorFile(dimension)
+    vector_file.append(corpus)
+    vector_file.save(str(Path(temp_dir) / "benchmark.vectors"))
+
+    results = {
+        'n_vectors': n_vectors,
+        'dimension': dimension,
+        'k': k,
+        'num_queries': num_queries,
+        'flat_bytes': flat_bytes,
+        'index_types': {},
+    }
+
+    for index_type in index_types:
+        print(f"\n🔍 Building {index_type} index...")
+        index = with_ids(create_index(index_type, dimension, n_vectors))
+        train_index(index, corpus)
+        set_search_defaults(index, nprobe, 64)
+        index.add_with_ids(corpus, ids)
+
+        index_bytes = len(faiss.serialize_index(index))
+        entry = {
+            'index_bytes': index_bytes,
+            'bytes_per_vector': index_bytes / n_vectors,
+            'memory_saved': 1 - index_bytes / flat_bytes,
+            'rerank': {},
+        }
+
+        for factor in [0] + rerank_factors:
+            start_time = time.perf_counter()
+            if factor:
+                _, candidates = index.search(queries, k * factor)
+                _, found = rerank_exact(queries, candidates, vector_file.rows, k)
+            else:
+                _, found = index.search(queries, k)
+            latency_ms = (time.perf_counter() - start_time) * 1000 / num_queries
+
+            entry['rerank'][str(factor)] = {
+                'recall_at_k': recall_at_k(found, exact_ids),
+                'latency_ms': latency_ms,
+            }
+
+        results['index_types'][index_type] = entry
+        print(f"💾 {index_bytes / 1e6:.1f} MB ({entry['memory_saved']:.0%} saved vs flat)")
+        for factor, stats in entry['rerank'].items():
+            label = f"rerank x{factor}" if factor != "0" else "no rerank"
+            print(f"🎯 Recall@{k} {label}: {stats['recall_at_k']:.3f} ({stats['latency_ms']:.2f}ms/query)")
+
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark memory and recall of quantized indexes')
+    parser.add_argument('--output-dir', type=str, default='benchmarks',
+                       help='Output directory for results')
+    parser.add_argument('--num-vectors', type=int, default=100_000,
+                       help='Number of corpus embeddings')
+    parser.add_argument('--dimension', type=int, default=384,
+                       help='Embedding dimension (384 for all-MiniLM-L6-v2)')
+    parser.add_argument('--num-queries', type=int, default=200,
+                       help='Number of test queries')
+    parser.add_argument('--k', type=int, default=10,
+                       help='k used for recall@k against exact search')
+    parser.add_argument('--index-types', type=str, nargs='+',
+                       default=['sq8', 'pq', 'ivf_sq8', 'ivf_pq'],
+                       help='Index types to compare against flat')
+    parser.add_argument('--rerank-factors', type=int, nargs='+', default=[2, 4, 8],
+                       help='Candidates per result fetched for the float32 rerank')
+    parser.add_argument('--nprobe', type=int, default=16,
+                       help='IVF partitions searched per query')
+
+    args = parser.parse_args()
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(exist_ok=True)
+
+    print("🚀 Starting Quantization Benchmark")
+
+    results = benchmark_quantization(args.num_vectors, args.dimension, args.num_queries, args.k,
+                                     args.index_types, args.rerank_factors, args.nprobe)
+
+    results_path = output_dir / 'quantization_results.json'
+    with open(results_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results saved to: {results_path}")
+
+    # Print summary
+    print("\n🎯 Benchmark Summary:")
+    print(f"  flat: {results['flat_bytes'] / 1e6:.1f} MB, recall@{args.k} 1.000")
+    for index_type, entry in results['index_types'].items():
+        best = max(entry['rerank'].items(), key=lambda item: item[1]['recall_at_k'])
+        print(f"  {index_type}: {entry['index_bytes'] / 1e6:.1f} MB "
+              f"({entry['memory_saved']:.0%} saved), "
+              f"recall@{args.k} {entry['rerank']['0']['recall_at_k']:.3f} "
+              f"-> {best[1]['recall_at_k']:.3f} with rerank x{best[0]}")
+
+    print(f"\n✅ Benchmark complete! Results in {output_dir}")
+
+if __name__ == "__main__":
+    main()
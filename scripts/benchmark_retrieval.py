@@ -81,14 +81,18 @@ def generate_test_corpus(size: int) -> list[str]:
     
     return documents
 
-def benchmark_retrieval_latency(corpus_sizes: list[int], num_queries: int = 10) -> dict:
+def benchmark_retrieval_latency(corpus_sizes: list[int], num_queries: int = 10,
+                                index_type: str = "auto", recall_k: int = 10) -> dict:
     """Benchmark retrieval latency across different corpus sizes"""
     
     results = {
         'corpus_sizes': corpus_sizes,
+        'index_type': index_type,
+        'index_types': [],
         'avg_latency_ms': [],
         'p95_latency_ms': [],
-        'throughput_qps': []
+        'throughput_qps': [],
+        'recall_at_k': []
     }
     
     test_queries = [
@@ -118,11 +122,17 @@ def benchmark_retrieval_latency(corpus_sizes: list[int], num_queries: int = 10)
             print("🔧 Building vector index...")
             start_build = time.time()
             
-            rag = RAGSystem(docs_dir=temp_dir)
+            rag = RAGSystem(docs_dir=temp_dir, index_type=index_type)
             rag.build_index(force_rebuild=True)
             
             build_time = time.time() - start_build
             print(f"⚡ Index built in {build_time:.2f}s")
+
+            # Recall of the ANN index against exact flat search
+            recall = rag.vector_store.evaluate_recall(test_queries, top_k=recall_k)
+            results['index_types'].append(recall['index_type'])
+            results['recall_at_k'].append(recall['recall_at_k'])
+            print(f"🎯 Recall@{recall_k} ({recall['index_type']}): {recall['recall_at_k']:.3f}")
             
             # Run queries and measure latency
             print(f"🧪 Running {num_queries} test queries...")
@@ -151,6 +161,7 @@ def benchmark_retrieval_latency(corpus_sizes: list[int], num_queries: int = 10)
             print(f"   Avg latency: {avg_latency:.1f}ms")
             print(f"   P95 latency: {p95_latency:.1f}ms") 
             print(f"   Throughput: {throughput:.1f} QPS")
+            print(f"   Recall@{recall_k}: {results['recall_at_k'][-1]:.3f}")
             
         finally:
             # Cleanup temporary files
@@ -233,6 +244,11 @@ def main():
                        help='Corpus sizes to benchmark')
     parser.add_argument('--num-queries', type=int, default=10,
                        help='Number of test queries per corpus size')
+    parser.add_argument('--index-type', type=str, default='auto',
+                       choices=['auto', 'flat', 'sq8', 'pq', 'ivf_flat', 'ivf_sq8', 'ivf_pq', 'hnsw'],
+                       help='Vector index backend to benchmark')
+    parser.add_argument('--recall-k', type=int, default=10,
+                       help='k used for recall@k against exact search')
     
     args = parser.parse_args()
     
@@ -244,7 +260,8 @@ def main():
     print(f"🧪 Queries per size: {args.num_queries}")
     
     # Run benchmark
-    results = benchmark_retrieval_latency(args.corpus_sizes, args.num_queries)
+    results = benchmark_retrieval_latency(args.corpus_sizes, args.num_queries,
+                                          args.index_type, args.recall_k)
     
     # Save results
     results_path = output_dir / 'benchmark_results.json'
@@ -259,7 +276,8 @@ def main():
     print("\n🎯 Benchmark Summary:")
     for i, size in enumerate(results['corpus_sizes']):
         print(f"  {size:,} docs: {results['avg_latency_ms'][i]:.1f}ms avg, "
-              f"{results['throughput_qps'][i]:.1f} QPS")
+              f"{results['throughput_qps'][i]:.1f} QPS, "
+              f"recall@{args.recall_k} {results['recall_at_k'][i]:.3f} ({results['index_types'][i]})")
     
     print(f"\n✅ Benchmark complete! Results in {output_dir}")
 
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Script that benchmarks the whole pipeline offline: ingestion, embedding, index build, search latency
+under concurrency, memory and recall@k, on a synthetic corpus with a deterministic stub LLM
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import shutil
+import platform
+import argparse
+import resource
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Tuple
+import numpy as np
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+# Never read or overwrite the persisted query-embedding cache of a real deployment
+os.environ["QUERY_CACHE_PATH"] = ""
+
+from rag_system import RAGSystem
+from rag_system.index_factory import (create_index, index_type_of, reconstruct_all,
+                                      stored_ids, train_index, with_ids)
+from rag_system.llm_providers import LLMProvider, StubChatClient
+from rag_system.rate_limiter import RateLimiter
+
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "sa", "ti", "vo", "zen", "pra", "dex", "mor",
+             "qui", "bel", "tor", "gan", "fis", "hul", "jor", "wex"]
+
+class SyntheticCorpus:
+    """Deterministic topical documents that chunk into an exact number of chunks
+
+    Each document belongs to one topic and mixes that topic's words with common words, so
+    nearest neighbours are meaningful. Documents are generated on the fly, which keeps memory
+    flat however many chunks are requested.
+    """
+
+    def __init__(self, num_chunks: int, chunk_words: int, chunk_overlap: int,
+                 chunks_per_doc: int = 4, num_topics: int = 64, seed: int = 0):
+        self.num_chunks = num_chunks
+        self.chunks_per_doc = chunks_per_doc
+        self.num_docs = -(-num_chunks // chunks_per_doc)
+        self.chunk_words = chunk_words
+        self.chunk_overlap = chunk_overlap
+        self.num_topics = num_topics
+        self.seed = seed
+
+        rng = np.random.default_rng(seed)
+        words = set()
+        while len(words) < num_topics * 40 + 400:
+            words.add("".join(rng.choice(SYLLABLES, rng.integers(2, 4))))
+        words = sorted(words)
+        rng.shuffle(words)
+        self.common_words = np.array(words[:400])
+        self.topic_words = np.array(words[400:]).reshape(num_topics, 40)
+
+    def words_in_doc(self, doc_index: int) -> int:
+        """Words that make the last document's window end exactly on a chunk boundary"""
+        chunks = min(self.chunks_per_doc, self.num_chunks - doc_index * self.chunks_per_doc)
+        return chunks * (self.chunk_words - self.chunk_overlap) + self.chunk_overlap
+
+    def document(self, doc_index: int) -> str:
+        """Text of one document; the same index always gives the same text"""
+        rng = np.random.default_rng((self.seed, doc_index))
+        topic = doc_index % self.num_topics
+        n_words = self.words_in_doc(doc_index)
+        topical = rng.random(n_words) < 0.6
+        words = np.where(topical,
+                         self.topic_words[topic][rng.integers(0, 40, n_words)],
+                         self.common_words[rng.integers(0, len(self.common_words), n_words)])
+        # A document identifier, for keyword matches
+        words[0] = f"KB-{topic:03d}-{doc_index:07d}"
+        return " ".join(words)
+
+    def write(self, docs_dir: Path) -> Dict:
+        """Write every document as a .txt file"""
+        docs_dir.mkdir(parents=True, exist_ok=True)
+        total_bytes = 0
+        for doc_index in range(self.num_docs):
+            text = self.document(doc_index)
+            (docs_dir / f"doc_{doc_index:07d}.txt").write_text(text, encoding='utf-8')
+            total_bytes += len(text)
+        return {'documents': self.num_docs, 'bytes': total_bytes}
+
+    def queries(self, count: int) -> List[str]:
+        """Questions about random topics, distinct from one another"""
+        # Seeded past the last document index, so no document shares the stream
+        rng = np.random.default_rng((self.seed, self.num_docs))
+        queries = []
+        for i in range(count):
+            topic = rng.integers(0, self.num_topics)
+            terms = " ".join(self.topic_words[topic][rng.choice(40, 3, replace=False)])
+            queries.append(f"What does {terms} say about case {i}?")
+        return queries
+
+class HashingEmbedder:
+    """Deterministic offline stand-in for the sentence encoder: signed feature hashing of words
+
+    It has the `encode` / `get_sentence_embedding_dimension` surface VectorStore uses and is
+    fast enough to embed millions of chunks, at the cost of lexical rather than semantic
+    similarity.
+    """
+
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+        self._slots: Dict[str, Tuple[int, float]] = {}
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def _slot(self, word: str) -> Tuple[int, float]:
+        slot = self._slots.get(word)
+        if slot is None:
+            digest = zlib.crc32(word.encode('utf-8'))
+            slot = self._slots[word] = (digest % self.dimension, 1.0 if digest & 1 << 31 else -1.0)
+        return slot
+
+    def encode(self, texts: List[str], batch_size: int = 32, show_progress_bar: bool = False,
+               normalize_embeddings: bool = True, **kwargs) -> np.ndarray:
+        embeddings = np.zeros((len(texts), self.dimension), dtype="float32")
+        for row, text in enumerate(texts):
+            slots = [self._slot(word) for word in text.lower().split()]
+            if slots:
+                positions, signs = zip(*slots)
+                embeddings[row] = np.bincount(positions, weights=signs, minlength=self.dimension)
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings /= np.maximum(norms, 1e-12)
+        return embeddings
+
+def stub_llm(latency_ms: float) -> LLMProvider:
+    """LLMProvider answering from a local stub with a fixed latency and no rate limits"""
+
+    def reply(prompt: str) -> str:
+        return f"Stub answer from a {len(prompt)}-character prompt."
+
+    return LLMProvider(
+        clients={"groq": StubChatClient(reply, latency=latency_ms / 1000)},
+        async_clients={},
+        rate_limiters={"groq": RateLimiter()},
+    )
+
+def rss_mb() -> float:
+    """Current resident set size of this process (peak where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes on Linux
+    return peak / 1e6 if sys.platform == 'darwin' else peak / 1e3
+
+def files_mb(vector_store_path: Path) -> Dict[str, float]:
+    """On-disk size of each file (or segment directory) the vector store saved"""
+    sizes = {}
+    for path in sorted(vector_store_path.parent.glob(vector_store_path.name + ".*")):
+        files = path.rglob("*") if path.is_dir() else [path]
+        sizes[path.name] = sum(f.stat().st_size for f in files if f.is_file()) / 1e6
+    return sizes
+
+def latency_stats(latencies: List[float], wall_seconds: float) -> Dict:
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        'queries': len(latencies),
+        'qps': len(latencies) / wall_seconds if wall_seconds > 0 else 0.0,
+        'mean_ms': float(latencies_ms.mean()),
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p95_ms': float(np.percentile(latencies_ms, 95)),
+        'p99_ms': float(np.percentile(latencies_ms, 99)),
+        'max_ms': float(latencies_ms.max()),
+    }
+
+def run_concurrent(call, queries: List[str], concurrency: int) -> Tuple[Dict, List]:
+    """Send every query through `call` from `concurrency` threads and time each one"""
+    latencies = []
+
+    def timed(query: str):
+        start_time = time.perf_counter()
+        result = call(query)
+        latencies.append(time.perf_counter() - start_time)
+        return result
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed, queries))
+    stats = latency_stats(latencies, time.perf_counter() - start_time)
+    stats['concurrency'] = concurrency
+    return stats, results
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True, cwd=Path(__file__).parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+def run_suite(args, work_dir: Path) -> Dict:
+    """Run every benchmark stage and collect the results"""
+    os.environ["CHUNK_SIZE"] = str(args.chunk_words)
+    os.environ["CHUNK_OVERLAP"] = str(args.chunk_overlap)
+
+    results = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'args': vars(args),
+        },
+        'memory': {'baseline_rss_mb': rss_mb()},
+    }
+
+    # 1. Synthetic corpus
+    corpus = SyntheticCorpus(args.num_chunks, args.chunk_words, args.chunk_overlap,
+                             args.chunks_per_doc, seed=args.seed)
+    docs_dir = work_dir / "documents"
+    print(f"📄 Generating {corpus.num_docs:,} documents ({args.num_chunks:,} chunks)...")
+    start_time = time.perf_counter()
+    results['corpus'] = corpus.write(docs_dir)
+    results['corpus']['generate_seconds'] = time.perf_counter() - start_time
+
+    embedder = HashingEmbedder() if args.embedder == 'hashing' else None
+    vector_store_path = work_dir / "index" / "knowledge_base"
+    rag = RAGSystem(docs_dir=str(docs_dir), vector_store_path=str(vector_store_path),
+                    index_type=args.index_type, llm=stub_llm(args.llm_latency_ms),
+                    embedder=embedder)
+    # Load the encoder up front so ingestion is not charged for it
+    rag.warm_up()
+    store = rag.vector_store
+
+    # 2. End-to-end ingestion: read, chunk, embed, index and save
+    print("🔧 Ingesting corpus...")
+    start_time = time.perf_counter()
+    rag.build_index(force_rebuild=True)
+    elapsed = time.perf_counter() - start_time
+    num_chunks = len(store.chunks)
+    results['corpus']['chunks'] = num_chunks
+    results['ingestion'] = {
+        'seconds': elapsed,
+        'docs_per_second': corpus.num_docs / elapsed,
+        'chunks_per_second': num_chunks / elapsed,
+        'mb_per_second': results['corpus']['bytes'] / 1e6 / elapsed,
+    }
+    results['memory']['after_ingestion_rss_mb'] = rss_mb()
+    results['memory']['index_files_mb'] = files_mb(vector_store_path)
+    print(f"⚡ {num_chunks:,} chunks in {elapsed:.2f}s "
+          f"({results['ingestion']['chunks_per_second']:.0f} chunks/s)")
+
+    # 3. Embedding throughput on a sample of the chunks
+    sample = store.chunks[:args.embed_sample]
+    start_time = time.perf_counter()
+    store.embed_documents(sample, show_progress_bar=False)
+    elapsed = time.perf_counter() - start_time
+    results['embedding'] = {
+        'chunks': len(sample),
+        'seconds': elapsed,
+        'chunks_per_second': len(sample) / elapsed if elapsed > 0 else 0.0,
+    }
+    print(f"🧮 Embedding: {results['embedding']['chunks_per_second']:.0f} chunks/s")
+
+    # 4. Index build alone (create, train, add) from the stored vectors, in ID order
+    if store.vectors is not None:
+        ids = np.sort(stored_ids(store.index))
+        vectors = store.vectors.rows(ids)
+    else:
+        ids, vectors = reconstruct_all(store.index)
+        order = np.argsort(ids)
+        ids, vectors = ids[order], vectors[order]
+    start_time = time.perf_counter()
+    rebuilt = with_ids(create_index(store.index_type, store.dimension, len(vectors)))
+    train_index(rebuilt, vectors, store.train_sample_size)
+    rebuilt.add_with_ids(vectors, ids)
+    elapsed = time.perf_counter() - start_time
+    results['index_build'] = {
+        'index_type': index_type_of(rebuilt),
+        'vectors': len(vectors),
+        'seconds': elapsed,
+        'vectors_per_second': len(vectors) / elapsed if elapsed > 0 else 0.0,
+    }
+    print(f"🏗️  {results['index_build']['index_type']} index built in {elapsed:.2f}s")
+    del rebuilt, vectors, ids
+
+    # 5. Search and answer latency at each concurrency level (cold caches every run)
+    queries = corpus.queries(args.num_queries)
+    results['search'] = {}
+    results['answer'] = {}
+    for concurrency in args.concurrency:
+        store.query_cache.clear()
+        stats, _ = run_concurrent(lambda query: rag.search(query, top_k=args.top_k),
+                                  queries, concurrency)
+        results['search'][str(concurrency)] = stats
+        print(f"🔍 Search x{concurrency}: p50 {stats['p50_ms']:.1f}ms, "
+              f"p95 {stats['p95_ms']:.1f}ms, {stats['qps']:.0f} QPS")
+
+        store.query_cache.clear()
+        rag.answer_cache.clear()
+        stats, answers = run_concurrent(lambda query: rag.generate_answer(query), queries,
+                                        concurrency)
+        stats['errors'] = sum(1 for answer in answers if "error" in answer)
+        results['answer'][str(concurrency)] = stats
+        print(f"💬 Answer x{concurrency}: p50 {stats['p50_ms']:.1f}ms, "
+              f"p95 {stats['p95_ms']:.1f}ms, {stats['qps']:.0f} QPS")
+
+    # 6. Recall of the configured index against exact search
+    results['recall'] = store.evaluate_recall(queries, top_k=args.recall_k)
+    print(f"🎯 Recall@{args.recall_k} ({results['recall']['index_type']}): "
+          f"{results['recall']['recall_at_k']:.3f}")
+
+    results['memory']['final_rss_mb'] = rss_mb()
+    results['memory']['peak_rss_mb'] = peak_rss_mb()
+    return results
+
+def flatten(results: Dict, prefix: str = "") -> Dict[str, float]:
+    """Numeric leaves of a results dict keyed by dotted path"""
+    values = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            values.update(flatten(value, path + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[path] = value
+    return values
+
+def compare(results: Dict, baseline: Dict):
+    """Print the relative change of every metric present in both runs"""
+    old = flatten({k: v for k, v in baseline.items() if k != 'meta'})
+    new = flatten({k: v for k, v in results.items() if k != 'meta'})
+    print(f"\n📊 Compared with {baseline.get('meta', {}).get('commit') or 'baseline'}:")
+    for key in sorted(new):
+        if key in old and old[key]:
+            change = (new[key] - old[key]) / abs(old[key])
+            print(f"  {key}: {old[key]:.4g} -> {new[key]:.4g} ({change:+.1%})")
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmark of the full RAG pipeline')
+    parser.add_argument('--output-dir', type=str, default='benchmarks',
+                       help='Output directory for results')
+    parser.add_argument('--num-chunks', type=int, default=10_000,
+                       help='Chunks in the synthetic corpus')
+    parser.add_argument('--chunks-per-doc', type=int, default=4,
+                       help='Chunks per synthetic document')
+    parser.add_argument('--chunk-words', type=int, default=int(os.getenv("CHUNK_SIZE", "500")),
+                       help='Words per chunk (default: CHUNK_SIZE)')
+    parser.add_argument('--chunk-overlap', type=int,
+                       default=int(os.getenv("CHUNK_OVERLAP", "50")),
+                       help='Words shared by consecutive chunks (default: CHUNK_OVERLAP)')
+    parser.add_argument('--embedder', type=str, default='model', choices=['model', 'hashing'],
+                       help='The configured sentence encoder, or a fast feature-hashing '
+                            'stand-in for corpora of millions of chunks')
+    parser.add_argument('--index-type', type=str, default=None,
+                       choices=['auto', 'flat', 'sq8', 'pq', 'ivf_flat', 'ivf_sq8', 'ivf_pq', 'hnsw'],
+                       help='Vector index backend (default: VECTOR_INDEX_TYPE)')
+    parser.add_argument('--num-queries', type=int, default=200,
+                       help='Queries per concurrency level')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32],
+                       help='Concurrent clients to measure search and answer latency with')
+    parser.add_argument('--top-k', type=int, default=3,
+                       help='Chunks retrieved per query')
+    parser.add_argument('--recall-k', type=int, default=10,
+                       help='k used for recall@k against exact search')
+    parser.add_argument('--embed-sample', type=int, default=2048,
+                       help='Chunks embedded to measure embedding throughput')
+    parser.add_argument('--llm-latency-ms', type=float, default=0.0,
+                       help='Simulated round trip of the stub LLM')
+    parser.add_argument('--seed', type=int, default=0,
+                       help='Seed of the synthetic corpus and queries')
+    parser.add_argument('--compare', type=str, default=None,
+                       help='Results JSON of an earlier run to print changes against')
+    parser.add_argument('--keep-corpus', action='store_true',
+                       help='Keep the generated documents and index')
+
+    args = parser.parse_args()
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(exist_ok=True)
+    # Read before running: on the same commit the new results replace that file
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    work_dir = Path(tempfile.mkdtemp(prefix='sglang_bench_'))
+
+    print("🚀 Starting Offline Benchmark Suite")
+    try:
+        results = run_suite(args, work_dir)
+    finally:
+        if args.keep_corpus:
+            print(f"📁 Corpus and index kept in {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    # One file per commit, so runs on different commits can be compared
+    commit = results['meta']['commit']
+    results_path = output_dir / (f'suite_results_{commit}.json' if commit else 'suite_results.json')
+    with open(results_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results saved to: {results_path}")
+
+    if baseline is not None:
+        compare(results, baseline)
+
+    print("\n✅ Benchmark complete!")
+
+if __name__ == "__main__":
+    main()
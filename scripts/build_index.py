@@ -4,6 +4,7 @@ Index Builder Script
 Script that processes documents in data/documents/ and creates a FAISS vector index for search
 """
 
+import argparse
 import sys
 import time
 from pathlib import Path
@@ -16,6 +17,14 @@ from rag_system import RAGSystem
 
 def main():
     """Loads documents from data directory and builds searchable vector index"""
+    parser = argparse.ArgumentParser(description="Build the FAISS vector index")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only re-embed new and changed documents and drop deleted ones",
+    )
+    args = parser.parse_args()
+
     print("🔧 Building vector index from documents...")
     start_time = time.time()
     
@@ -24,7 +33,10 @@ def main():
     
     # Build index (this includes loading documents)
     print("📄 Building index (this includes loading documents)...")
-    rag.build_index(force_rebuild=True)
+    if args.incremental:
+        rag.build_index(incremental=True)
+    else:
+        rag.build_index(force_rebuild=True)
     
     elapsed = time.time() - start_time
     print(f"✅ Index built successfully in {elapsed:.2f}s")
@@ -53,6 +53,52 @@ class Config:
     def embedding_model(self) -> str:
         return os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
 
+    @property
+    def vector_index_type(self) -> str:
+        return os.getenv("VECTOR_INDEX_TYPE", "auto")
+
+    @property
+    def vector_mmap(self) -> bool:
+        """Memory-map the saved index read-only so serving processes share its pages"""
+        return os.getenv("VECTOR_MMAP", "false").lower() == "true"
+
+    @property
+    def vector_rerank_factor(self) -> int:
+        """Candidates per result reranked with float32 vectors on quantized indexes (0 = off)"""
+        return int(os.getenv("VECTOR_RERANK_FACTOR", "4"))
+
+    @property
+    def ivf_nprobe(self) -> int:
+        return int(os.getenv("IVF_NPROBE", "16"))
+
+    @property
+    def hnsw_ef_search(self) -> int:
+        return int(os.getenv("HNSW_EF_SEARCH", "64"))
+
+    @property
+    def query_cache_size(self) -> int:
+        return int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+
+    @property
+    def query_cache_ttl(self) -> float:
+        return float(os.getenv("QUERY_CACHE_TTL", "3600"))
+
+    @property
+    def query_cache_path(self) -> str:
+        return os.getenv("QUERY_CACHE_PATH", "")
+
+    @property
+    def answer_cache_size(self) -> int:
+        return int(os.getenv("ANSWER_CACHE_SIZE", "512"))
+
+    @property
+    def answer_cache_threshold(self) -> float:
+        return float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+
+    @property
+    def answer_cache_ttl(self) -> float:
+        return float(os.getenv("ANSWER_CACHE_TTL", "600"))
+
     @property
     def chunk_size(self) -> int:
         return int(os.getenv("CHUNK_SIZE", "500"))
@@ -61,6 +107,72 @@ class Config:
     def chunk_overlap(self) -> int:
         return int(os.getenv("CHUNK_OVERLAP", "50"))
 
+    @property
+    def ingest_workers(self) -> int:
+        """Chunking processes for ingestion; 0 uses every CPU core"""
+        return int(os.getenv("INGEST_WORKERS", "0"))
+
+    @property
+    def ingest_batch_size(self) -> int:
+        return int(os.getenv("INGEST_BATCH_SIZE", "256"))
+
+    @property
+    def ingest_queue_size(self) -> int:
+        return int(os.getenv("INGEST_QUEUE_SIZE", "64"))
+
+    @property
+    def retrieval_batching(self) -> bool:
+        """Coalesce concurrent searches into one embedding pass and one index search"""
+        return os.getenv("RETRIEVAL_BATCHING", "true").lower() == "true"
+
+    @property
+    def retrieval_batch_size(self) -> int:
+        return int(os.getenv("RETRIEVAL_BATCH_SIZE", "32"))
+
+    @property
+    def retrieval_batch_wait_ms(self) -> float:
+        return float(os.getenv("RETRIEVAL_BATCH_WAIT_MS", "3"))
+
+    @property
+    def hybrid_search(self) -> bool:
+        """Fuse BM25 keyword matches with dense results so exact identifiers are found"""
+        return os.getenv("HYBRID_SEARCH", "false").lower() == "true"
+
+    @property
+    def hybrid_fusion(self) -> str:
+        return os.getenv("HYBRID_FUSION", "rrf")
+
+    @property
+    def hybrid_alpha(self) -> float:
+        """Dense weight of the weighted fusion (BM25 gets 1 - alpha)"""
+        return float(os.getenv("HYBRID_ALPHA", "0.5"))
+
+    @property
+    def rerank_enabled(self) -> bool:
+        """Re-score a wider candidate set with a cross-encoder before building the prompt"""
+        return os.getenv("RERANK", "false").lower() == "true"
+
+    @property
+    def rerank_model(self) -> str:
+        return os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+
+    @property
+    def rerank_candidates(self) -> int:
+        return int(os.getenv("RERANK_CANDIDATES", "50"))
+
+    @property
+    def rerank_batch_size(self) -> int:
+        return int(os.getenv("RERANK_BATCH_SIZE", "16"))
+
+    @property
+    def rerank_budget_ms(self) -> float:
+        """Scoring time allowed per retrieval batch; fewer candidates are reranked under load"""
+        return float(os.getenv("RERANK_BUDGET_MS", "250"))
+
+    @property
+    def rerank_cache_size(self) -> int:
+        return int(os.getenv("RERANK_CACHE_SIZE", "4096"))
+
     @property
     def top_k_results(self) -> int:
         return int(os.getenv("TOP_K_RESULTS", "3"))
@@ -81,6 +193,66 @@ class Config:
     def max_concurrent_calls(self) -> int:
         return int(os.getenv("MAX_CONCURRENT_CALLS", "5"))
 
+    @property
+    def llm_pool_size(self) -> int:
+        """Pooled keep-alive connections per provider; defaults to MAX_CONCURRENT_CALLS"""
+        return int(os.getenv("LLM_POOL_SIZE", "0")) or self.max_concurrent_calls
+
+    @property
+    def llm_keepalive_expiry(self) -> float:
+        return float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+
+    @property
+    def llm_http2(self) -> bool:
+        return os.getenv("LLM_HTTP2", "true").lower() == "true"
+
+    @property
+    def groq_rpm(self) -> int:
+        """Client-side request budget per minute (0 = unlimited)"""
+        return int(os.getenv("GROQ_RPM", "0"))
+
+    @property
+    def groq_tpm(self) -> int:
+        """Client-side token budget per minute (0 = unlimited)"""
+        return int(os.getenv("GROQ_TPM", "0"))
+
+    @property
+    def together_rpm(self) -> int:
+        return int(os.getenv("TOGETHER_RPM", "0"))
+
+    @property
+    def together_tpm(self) -> int:
+        return int(os.getenv("TOGETHER_TPM", "0"))
+
+    @property
+    def llm_hedging(self) -> bool:
+        """Send a backup request to the next provider when "auto" routing sees a slow call"""
+        return os.getenv("LLM_HEDGING", "true").lower() == "true"
+
+    @property
+    def llm_hedge_quantile(self) -> float:
+        return float(os.getenv("LLM_HEDGE_QUANTILE", "0.95"))
+
+    @property
+    def llm_hedge_delay(self) -> float:
+        """Hedge delay used until a provider has enough latency samples"""
+        return float(os.getenv("LLM_HEDGE_DELAY", "2.0"))
+
+    @property
+    def perspective_timeout(self) -> float:
+        """Seconds allowed for each multi-perspective LLM call"""
+        return float(os.getenv("PERSPECTIVE_TIMEOUT", "8"))
+
+    @property
+    def perspective_quorum(self) -> int:
+        """Perspectives needed before synthesis may start without the rest"""
+        return int(os.getenv("PERSPECTIVE_QUORUM", "2"))
+
+    @property
+    def perspective_grace(self) -> float:
+        """Seconds to wait for stragglers once the quorum is reached"""
+        return float(os.getenv("PERSPECTIVE_GRACE", "1.0"))
+
     @property
     def web_host(self) -> str:
         return os.getenv("WEB_HOST", "localhost")
@@ -89,6 +261,29 @@ class Config:
     def web_port(self) -> int:
         return int(os.getenv("WEB_PORT", "8080"))
 
+    @property
+    def api_host(self) -> str:
+        return os.getenv("API_HOST", "127.0.0.1")
+
+    @property
+    def api_port(self) -> int:
+        return int(os.getenv("API_PORT", "8000"))
+
+    @property
+    def api_workers(self) -> int:
+        """HTTP API server processes; each loads its own copy of the index"""
+        return int(os.getenv("API_WORKERS", "1"))
+
+    @property
+    def daemon_socket(self) -> str:
+        """Unix socket of the warm CLI daemon (`sglang-rag --serve`); empty disables it"""
+        return os.getenv("DAEMON_SOCKET", "data/sglang-rag.sock")
+
+    @property
+    def tracing_enabled(self) -> bool:
+        """Time pipeline stages: "timings" in answers and histograms at the API's /metrics"""
+        return os.getenv("TRACING", "false").lower() == "true"
+
     @property
     def debug_mode(self) -> bool:
         return os.getenv("DEBUG_MODE", "false").lower() == "true"
@@ -102,15 +297,59 @@ class Config:
             "documents_dir": self.documents_dir,
             "vector_index_dir": self.vector_index_dir,
             "embedding_model": self.embedding_model,
+            "vector_index_type": self.vector_index_type,
+            "vector_mmap": self.vector_mmap,
+            "vector_rerank_factor": self.vector_rerank_factor,
+            "ivf_nprobe": self.ivf_nprobe,
+            "hnsw_ef_search": self.hnsw_ef_search,
+            "query_cache_size": self.query_cache_size,
+            "query_cache_ttl": self.query_cache_ttl,
+            "query_cache_path": self.query_cache_path,
+            "answer_cache_size": self.answer_cache_size,
+            "answer_cache_threshold": self.answer_cache_threshold,
+            "answer_cache_ttl": self.answer_cache_ttl,
             "chunk_size": self.chunk_size,
             "chunk_overlap": self.chunk_overlap,
+            "ingest_workers": self.ingest_workers,
+            "ingest_batch_size": self.ingest_batch_size,
+            "ingest_queue_size": self.ingest_queue_size,
+            "retrieval_batching": self.retrieval_batching,
+            "retrieval_batch_size": self.retrieval_batch_size,
+            "retrieval_batch_wait_ms": self.retrieval_batch_wait_ms,
+            "hybrid_search": self.hybrid_search,
+            "hybrid_fusion": self.hybrid_fusion,
+            "hybrid_alpha": self.hybrid_alpha,
+            "rerank_enabled": self.rerank_enabled,
+            "rerank_model": self.rerank_model,
+            "rerank_candidates": self.rerank_candidates,
+            "rerank_batch_size": self.rerank_batch_size,
+            "rerank_budget_ms": self.rerank_budget_ms,
+            "rerank_cache_size": self.rerank_cache_size,
             "top_k_results": self.top_k_results,
             "default_provider": self.default_provider,
             "max_tokens": self.max_tokens,
             "temperature": self.temperature,
             "max_concurrent_calls": self.max_concurrent_calls,
+            "llm_pool_size": self.llm_pool_size,
+            "llm_keepalive_expiry": self.llm_keepalive_expiry,
+            "llm_http2": self.llm_http2,
+            "groq_rpm": self.groq_rpm,
+            "groq_tpm": self.groq_tpm,
+            "together_rpm": self.together_rpm,
+            "together_tpm": self.together_tpm,
+            "llm_hedging": self.llm_hedging,
+            "llm_hedge_quantile": self.llm_hedge_quantile,
+            "llm_hedge_delay": self.llm_hedge_delay,
+            "perspective_timeout": self.perspective_timeout,
+            "perspective_quorum": self.perspective_quorum,
+            "perspective_grace": self.perspective_grace,
             "web_host": self.web_host,
             "web_port": self.web_port,
+            "api_host": self.api_host,
+            "api_port": self.api_port,
+            "api_workers": self.api_workers,
+            "daemon_socket": self.daemon_socket,
+            "tracing_enabled": self.tracing_enabled,
             "debug_mode": self.debug_mode,
         }
 
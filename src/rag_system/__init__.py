@@ -3,13 +3,39 @@ SGLang RAG System - Core Package
 Professional-grade RAG implementation with SGLang integration
 """
 
+import importlib
+from typing import TYPE_CHECKING
+
 __version__ = "1.0.0"
 __author__ = "SGLang RAG Team"
 __email__ = "team@sglang-rag.com"
 
-from .document_processor import DocumentProcessor
-from .llm_providers import LLMProvider
-from .rag_pipeline import RAGSystem
-from .vector_store import DocumentChunk, VectorStore
+if TYPE_CHECKING:
+    from .document_processor import DocumentProcessor
+    from .llm_providers import LLMProvider
+    from .rag_pipeline import RAGSystem
+    from .vector_store import DocumentChunk, VectorStore
+
+# Public name -> defining module. Modules are imported on first attribute access, so
+# importing the package (or the CLI) does not load FAISS, torch or the provider SDKs.
+_EXPORTS = {
+    "DocumentProcessor": ".document_processor",
+    "LLMProvider": ".llm_providers",
+    "RAGSystem": ".rag_pipeline",
+    "DocumentChunk": ".vector_store",
+    "VectorStore": ".vector_store",
+}
 
 __all__ = ["VectorStore", "DocumentChunk", "LLMProvider", "DocumentProcessor", "RAGSystem"]
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
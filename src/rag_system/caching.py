@@ -0,0 +1,314 @@
+"""
+Caching Module
+Thread-safe LRU caches with TTL expiry for embeddings and other hot-path results
+"""
+
+import atexit
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+
+class LRUCache:
+    """Bounded, thread-safe LRU cache with optional time-to-live"""
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        # key -> (value, expires_at); wall-clock expiry so entries can be persisted
+        self._data: Dict[Hashable, Tuple[Any, Optional[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value (refreshing its recency) or default"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Return an unexpired cached value without counting a lookup or refreshing recency"""
+        with self._lock:
+            entry = self._data.get(key)
+        if entry is None or (entry[1] is not None and entry[1] <= time.time()):
+            return default
+        return entry[0]
+
+    def put(self, key: Hashable, value: Any, expires_at: Optional[float] = None):
+        """Insert or refresh a value, evicting the least recently used entries if full"""
+        if not self.enabled:
+            return
+
+        if expires_at is None and self.ttl_seconds:
+            expires_at = time.time() + self.ttl_seconds
+
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove an entry and return its value"""
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def clear(self):
+        """Drop all entries (counters are kept)"""
+        with self._lock:
+            self._data.clear()
+
+    def snapshot(self) -> List[Tuple[Hashable, Any, Optional[float]]]:
+        """Unexpired entries from least to most recently used"""
+        now = time.time()
+        with self._lock:
+            return [
+                (key, value, expires_at)
+                for key, (value, expires_at) in self._data.items()
+                if expires_at is None or expires_at > now
+            ]
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+
+class EmbeddingCache(LRUCache):
+    """LRU cache of query embeddings keyed on model name and normalized query text"""
+
+    def __init__(
+        self,
+        model_name: str,
+        max_size: int = 1024,
+        ttl_seconds: Optional[float] = 3600.0,
+        persist_path: Optional[str] = None,
+    ):
+        super().__init__(max_size, ttl_seconds)
+        self.model_name = model_name
+        self.persist_path = persist_path
+
+        if persist_path and self.enabled:
+            self.load(persist_path)
+            atexit.register(self.save)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Canonical form of a query used as the cache key"""
+        return " ".join(text.split())
+
+    def _key(self, text: str) -> Tuple[str, str]:
+        return (self.model_name, self.normalize(text))
+
+    def get_embedding(self, text: str) -> Optional[np.ndarray]:
+        return self.get(self._key(text))
+
+    def peek_embedding(self, text: str) -> Optional[np.ndarray]:
+        return self.peek(self._key(text))
+
+    def put_embedding(self, text: str, embedding: np.ndarray):
+        self.put(self._key(text), np.array(embedding, dtype="float32", copy=True))
+
+    def save(self, path: Optional[str] = None):
+        """Spill unexpired embeddings to disk so a warm cache survives restarts"""
+        path = path or self.persist_path
+        entries = self.snapshot()
+        if not path or not entries:
+            return
+
+        target = Path(path)
+        target.parent.mkdir(exist_ok=True, parents=True)
+        tmp_path = target.with_name(target.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                model_name=np.array(self.model_name),
+                texts=np.array([key[1] for key, _, _ in entries]),
+                vectors=np.stack([value for _, value, _ in entries]),
+                expires_at=np.array(
+                    [np.nan if expires is None else expires for _, _, expires in entries]
+                ),
+            )
+        os.replace(tmp_path, target)
+
+    def load(self, path: Optional[str] = None):
+        """Warm the cache from a previous spill (entries for other models are ignored)"""
+        path = path or self.persist_path
+        if not path or not Path(path).exists():
+            return
+
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if str(data["model_name"]) != self.model_name:
+                    return
+                now = time.time()
+                for text, vector, expires in zip(
+                    data["texts"], data["vectors"], data["expires_at"]
+                ):
+                    expires_at = None if np.isnan(expires) else float(expires)
+                    if expires_at is None or expires_at > now:
+                        self.put((self.model_name, str(text)), vector, expires_at=expires_at)
+        except Exception as e:
+            print(f"[!] Could not load embedding cache from {path}: {e}")
+
+
+class SemanticAnswerCache:
+    """Answer cache matched by query-embedding similarity within the same retrieved context
+
+    Entries are grouped by (provider, fingerprints of the retrieved chunks): a lookup only
+    considers answers generated from exactly the same context text, so edited or different
+    documents never hit. Chunk IDs are not enough, as an edit can keep a chunk's ID.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        max_size: int = 512,
+        ttl_seconds: Optional[float] = 600.0,
+    ):
+        self.threshold = threshold
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        # entry id -> (group key, embedding, answer, expires_at)
+        self._entries: Dict[int, Tuple[Tuple, np.ndarray, str, Optional[float]]] = OrderedDict()
+        self._groups: Dict[Tuple, List[int]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @staticmethod
+    def fingerprint(text: str) -> str:
+        """Content hash of a retrieved chunk, as used in the context key"""
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _group_key(provider: str, context: List[str]) -> Tuple:
+        return (provider, tuple(context))
+
+    def lookup(
+        self, embedding: np.ndarray, provider: str, context: List[str]
+    ) -> Optional[Tuple[str, float]]:
+        """Return (answer, similarity) for the closest cached query above the threshold"""
+        group = self._group_key(provider, context)
+        now = time.time()
+
+        with self._lock:
+            best_id, best_score = None, -1.0
+            for entry_id in list(self._groups.get(group, [])):
+                _, cached_embedding, _, expires_at = self._entries[entry_id]
+                if expires_at is not None and expires_at <= now:
+                    self._remove(entry_id)
+                    continue
+                score = float(np.dot(cached_embedding, embedding))
+                if score > best_score:
+                    best_id, best_score = entry_id, score
+
+            if best_id is None or best_score < self.threshold:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            return self._entries[best_id][2], best_score
+
+    def store(self, embedding: np.ndarray, provider: str, context: List[str], answer: str):
+        """Cache an answer for a query embedding and its retrieved context"""
+        if not self.enabled:
+            return
+
+        group = self._group_key(provider, context)
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds else None
+
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (
+                group,
+                np.array(embedding, dtype="float32", copy=True),
+                answer,
+                expires_at,
+            )
+            self._groups.setdefault(group, []).append(entry_id)
+
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, entry_id: int):
+        """Drop an entry and its group membership (caller holds the lock)"""
+        group = self._entries.pop(entry_id)[0]
+        members = self._groups[group]
+        members.remove(entry_id)
+        if not members:
+            del self._groups[group]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._groups.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,271 @@
+"""
+Chunk Store Module
+Memory-mapped columnar on-disk storage for document chunks
+
+A chunk store directory holds a manifest.json (segment list and store metadata) and one
+directory per append-only segment. Incremental saves add a segment instead of rewriting
+the store. Each segment contains:
+    segment.json            row count, metadata column names, source file table
+    text.bin / text_offsets.npy     UTF-8 chunk texts and their byte offsets
+    ids.bin / id_offsets.npy        chunk IDs and their byte offsets
+    source_codes.npy        index into the segment's source file table
+    chunk_index.npy         position of each chunk within its source file
+    meta_<key>.npy          integer metadata columns shared by every chunk
+    meta_extra.bin / meta_extra_offsets.npy     JSON for any remaining metadata
+"""
+
+import bisect
+import json
+import os
+import shutil
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .vector_store import DocumentChunk
+
+FORMAT_VERSION = 2
+
+
+class _BlobWriter:
+    """Append variable-length byte strings to a blob file and track their offsets"""
+
+    def __init__(self, path: Path):
+        self._file = open(path, "wb")
+        self.offsets = [0]
+
+    def append(self, data: bytes):
+        self._file.write(data)
+        self.offsets.append(self.offsets[-1] + len(data))
+
+    def close(self, offsets_path: Path):
+        self._file.close()
+        np.save(offsets_path, np.asarray(self.offsets, dtype="int64"))
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, (int, np.integer)) and not isinstance(value, bool)
+
+
+def _write_segment(segment_dir: Path, chunks: Sequence):
+    """Write one segment's blobs and columns"""
+    segment_dir.mkdir(parents=True)
+
+    # First pass: integer metadata keys shared by every chunk become dense columns
+    int_keys: Optional[set] = None
+    for chunk in chunks:
+        keys = {key for key, value in chunk.metadata.items() if _is_int(value)}
+        int_keys = keys if int_keys is None else int_keys & keys
+    int_columns = sorted(int_keys or [])
+
+    texts = _BlobWriter(segment_dir / "text.bin")
+    ids = _BlobWriter(segment_dir / "ids.bin")
+    extras = _BlobWriter(segment_dir / "meta_extra.bin")
+    sources: Dict[str, int] = {}
+    source_codes = np.empty(len(chunks), dtype="int32")
+    chunk_index = np.empty(len(chunks), dtype="int64")
+    columns = {key: np.empty(len(chunks), dtype="int64") for key in int_columns}
+
+    # Second pass: stream texts into blobs and fill the columns
+    for row, chunk in enumerate(chunks):
+        texts.append(chunk.text.encode("utf-8"))
+        ids.append(chunk.id.encode("utf-8"))
+        source_codes[row] = sources.setdefault(chunk.source_file, len(sources))
+        chunk_index[row] = chunk.chunk_index
+        for key in int_columns:
+            columns[key][row] = chunk.metadata[key]
+        extra = {key: value for key, value in chunk.metadata.items() if key not in columns}
+        extras.append(json.dumps(extra).encode("utf-8") if extra else b"")
+
+    texts.close(segment_dir / "text_offsets.npy")
+    ids.close(segment_dir / "id_offsets.npy")
+    extras.close(segment_dir / "meta_extra_offsets.npy")
+    np.save(segment_dir / "source_codes.npy", source_codes)
+    np.save(segment_dir / "chunk_index.npy", chunk_index)
+    for key, column in columns.items():
+        np.save(segment_dir / f"meta_{key}.npy", column)
+
+    with open(segment_dir / "segment.json", "w", encoding="utf-8") as f:
+        json.dump({"count": len(chunks), "int_columns": int_columns, "sources": list(sources)}, f)
+
+
+def _write_manifest(store_dir: Path, segments: List[str], metadata: Optional[Dict]):
+    """Atomically replace the store manifest"""
+    manifest = {"version": FORMAT_VERSION, "segments": segments, "metadata": metadata or {}}
+    tmp_path = store_dir / "manifest.json.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, store_dir / "manifest.json")
+
+
+def write_chunk_store(path: str, chunks: Iterable[DocumentChunk], metadata: Optional[Dict] = None):
+    """Write chunks to a new single-segment chunk store (atomically replacing any existing one)"""
+    chunks = chunks if isinstance(chunks, Sequence) else list(chunks)
+    target = Path(path)
+    tmp_dir = target.with_name(target.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    _write_segment(tmp_dir / "seg-000000", chunks)
+    _write_manifest(tmp_dir, ["seg-000000"], metadata)
+
+    # A directory cannot be replaced in one rename: move the old store aside, move the new
+    # one in, then delete the old one. recover_chunk_store finishes a swap cut short.
+    old_dir = target.with_name(target.name + ".old")
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if target.exists():
+        os.replace(target, old_dir)
+    os.replace(tmp_dir, target)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def recover_chunk_store(path: str):
+    """Put a store back in place if a save crashed between moving the old one aside and
+    moving the new one in: the complete new store if there is one, else the old store"""
+    target = Path(path)
+    if target.exists():
+        return
+    tmp_dir = target.with_name(target.name + ".tmp")
+    old_dir = target.with_name(target.name + ".old")
+    if (tmp_dir / "manifest.json").exists():
+        os.replace(tmp_dir, target)
+        shutil.rmtree(old_dir, ignore_errors=True)
+    elif old_dir.is_dir():
+        os.replace(old_dir, target)
+
+
+def append_chunk_segment(
+    path: str, chunks: Iterable[DocumentChunk], metadata: Optional[Dict] = None
+):
+    """Append chunks to an existing store as a new segment and update its metadata"""
+    chunks = chunks if isinstance(chunks, Sequence) else list(chunks)
+    store_dir = Path(path)
+    with open(store_dir / "manifest.json", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != FORMAT_VERSION:
+        raise ValueError("Only segmented chunk stores can be appended to; rewrite the store first")
+    segments = manifest["segments"]
+
+    if chunks:
+        name = f"seg-{len(segments):06d}"
+        shutil.rmtree(store_dir / name, ignore_errors=True)
+        _write_segment(store_dir / name, chunks)
+        segments = segments + [name]
+
+    _write_manifest(store_dir, segments, metadata)
+
+
+def _map_blob(path: Path) -> np.ndarray:
+    """Read-only byte view of a blob file (np.memmap rejects empty files)"""
+    if path.stat().st_size == 0:
+        return np.zeros(0, dtype="uint8")
+    return np.memmap(path, dtype="uint8", mode="r")
+
+
+class _Segment:
+    """Memory-mapped columns of one segment"""
+
+    def __init__(self, path: Path, info: Optional[Dict] = None):
+        if info is None:
+            with open(path / "segment.json", encoding="utf-8") as f:
+                info = json.load(f)
+
+        self.count = info["count"]
+        self.sources: List[str] = info["sources"]
+        self.text = _map_blob(path / "text.bin")
+        self.text_offsets = np.load(path / "text_offsets.npy", mmap_mode="r")
+        self.ids = _map_blob(path / "ids.bin")
+        self.id_offsets = np.load(path / "id_offsets.npy", mmap_mode="r")
+        self.extra = _map_blob(path / "meta_extra.bin")
+        self.extra_offsets = np.load(path / "meta_extra_offsets.npy", mmap_mode="r")
+        self.source_codes = np.load(path / "source_codes.npy", mmap_mode="r")
+        self.chunk_index = np.load(path / "chunk_index.npy", mmap_mode="r")
+        self.columns = {
+            key: np.load(path / f"meta_{key}.npy", mmap_mode="r") for key in info["int_columns"]
+        }
+
+    def materialize(self, row: int) -> DocumentChunk:
+        """Build the DocumentChunk for one stored row"""
+        metadata = {key: int(column[row]) for key, column in self.columns.items()}
+        extra = self._slice(self.extra, self.extra_offsets, row)
+        if extra:
+            metadata.update(json.loads(extra))
+
+        return DocumentChunk(
+            id=self._slice(self.ids, self.id_offsets, row),
+            text=self._slice(self.text, self.text_offsets, row),
+            source_file=self.sources[self.source_codes[row]],
+            chunk_index=int(self.chunk_index[row]),
+            metadata=metadata,
+        )
+
+    @staticmethod
+    def _slice(blob: np.ndarray, offsets: np.ndarray, row: int) -> str:
+        return blob[offsets[row] : offsets[row + 1]].tobytes().decode("utf-8")
+
+
+class MappedChunks(Sequence):
+    """Sequence of DocumentChunks backed by a memory-mapped chunk store
+
+    Opening is O(1) in the number of chunks: nothing is deserialized until an item is
+    accessed, and each access materializes only that chunk. Chunks appended after loading
+    are kept in memory (see `pending`) until the next save appends them as a segment.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        with open(self.path / "manifest.json", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+
+        version = self.manifest.get("version")
+        if version == 1:
+            # Version 1 stores were a single unsegmented directory described by the manifest
+            self._segments = [_Segment(self.path, self.manifest)]
+        elif version == FORMAT_VERSION:
+            self._segments = [_Segment(self.path / name) for name in self.manifest["segments"]]
+        else:
+            raise ValueError(f"Unsupported chunk store version: {version}")
+
+        # Global row at which each segment starts
+        self._starts = []
+        total = 0
+        for segment in self._segments:
+            self._starts.append(total)
+            total += segment.count
+        self._count = total
+        self.pending: List[DocumentChunk] = []
+
+    @property
+    def metadata(self) -> Dict:
+        """Store-level metadata recorded when the store was written"""
+        return self.manifest["metadata"]
+
+    @property
+    def stored_count(self) -> int:
+        """Number of chunks persisted on disk"""
+        return self._count
+
+    def __len__(self) -> int:
+        return self._count + len(self.pending)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("chunk index out of range")
+        if index >= self._count:
+            return self.pending[index - self._count]
+
+        segment_no = bisect.bisect_right(self._starts, index) - 1
+        return self._segments[segment_no].materialize(index - self._starts[segment_no])
+
+    def append(self, chunk: DocumentChunk):
+        self.pending.append(chunk)
+
+    def extend(self, chunks: Iterable[DocumentChunk]):
+        self.pending.extend(chunks)
@@ -0,0 +1,165 @@
+"""
+Client Registry Module
+Process-wide, pooled LLM provider clients shared by every LLMProvider
+"""
+
+import asyncio
+import importlib.util
+import threading
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+# Consecutive connection-level failures after which a client's pool is discarded
+MAX_CONSECUTIVE_FAILURES = 3
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class ClientRegistry:
+    """Thread-safe cache of provider clients backed by keep-alive (HTTP/2 if available) pools
+
+    Clients are keyed by provider and API key, so every RAGSystem in the process reuses the
+    same warm connections. Async clients are cached per event loop because their pools are
+    loop-bound. A client whose transport keeps failing is dropped and rebuilt on next use;
+    requests already using it are left to finish.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        keepalive_expiry: float = 60.0,
+        timeout: float = 60.0,
+        http2: bool = True,
+    ):
+        self.pool_size = pool_size
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._lock = threading.Lock()
+        self._clients: Dict[Tuple[str, str], Any] = {}
+        self._async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._failures: Dict[str, int] = {}
+        # Evicted sync clients, still open for calls in flight; closed by GC or close()
+        self._retired: weakref.WeakSet = weakref.WeakSet()
+        self.created = 0
+
+    def _http_options(self) -> Dict:
+        return {
+            "http2": self.http2,
+            "timeout": self.timeout,
+            "limits": httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+        }
+
+    def get(self, provider: str, client_class: type, api_key: str) -> Any:
+        """Shared sync client for a provider, created on first use"""
+        key = (provider, api_key)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = client_class(
+                    api_key=api_key, http_client=httpx.Client(**self._http_options())
+                )
+                self._clients[key] = client
+                self.created += 1
+            return client
+
+    def get_async(self, provider: str, client_class: type, api_key: str) -> Any:
+        """Shared async client for a provider on the running event loop"""
+        loop = asyncio.get_running_loop()
+        key = (provider, api_key)
+        with self._lock:
+            loop_clients = self._async_clients.setdefault(loop, {})
+            client = loop_clients.get(key)
+            if client is None:
+                client = client_class(
+                    api_key=api_key, http_client=httpx.AsyncClient(**self._http_options())
+                )
+                loop_clients[key] = client
+                self.created += 1
+            return client
+
+    def report_success(self, provider: str):
+        with self._lock:
+            self._failures.pop(provider, None)
+
+    def report_failure(self, provider: str, error: Exception):
+        """Count transport failures; evict the provider's clients once they look unhealthy"""
+        if not _is_connection_error(error):
+            return
+
+        with self._lock:
+            failures = self._failures.get(provider, 0) + 1
+            self._failures[provider] = failures
+            if failures < MAX_CONSECUTIVE_FAILURES:
+                return
+
+            self._failures.pop(provider, None)
+            stale = [key for key in self._clients if key[0] == provider]
+            for key in stale:
+                # Other threads may be mid-request on this client: only stop handing it out
+                self._retired.add(self._clients.pop(key))
+            for loop_clients in self._async_clients.values():
+                for key in [key for key in loop_clients if key[0] == provider]:
+                    # Async clients can only be closed on their own loop; let them be collected
+                    del loop_clients[key]
+        print(f"[!] Resetting {provider} connection pool after {failures} consecutive failures")
+
+    def close(self):
+        """Close all pooled sync connections, including those of evicted clients"""
+        with self._lock:
+            for client in list(self._clients.values()) + list(self._retired):
+                _close_quietly(client)
+            self._clients.clear()
+            self._retired = weakref.WeakSet()
+            self._async_clients = weakref.WeakKeyDictionary()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "async_loops": len(self._async_clients),
+                "created": self.created,
+                "pool_size": self.pool_size,
+                "http2": self.http2,
+                "failures": dict(self._failures),
+            }
+
+
+def _is_connection_error(error: Exception) -> bool:
+    """Whether an error points at the transport rather than the request"""
+    if isinstance(error, (httpx.TransportError, ConnectionError, TimeoutError)):
+        return True
+    # SDK errors wrap the httpx error; their class names say so (APIConnectionError, ...)
+    return "Connection" in type(error).__name__ or "Timeout" in type(error).__name__
+
+
+def _close_quietly(client: Any):
+    try:
+        client.close()
+    except Exception:
+        pass
+
+
+_registry: Optional[ClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ClientRegistry:
+    """The process-wide registry, sized from the configuration on first use"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            from config import config
+
+            _registry = ClientRegistry(
+                pool_size=config.llm_pool_size,
+                keepalive_expiry=config.llm_keepalive_expiry,
+                http2=config.llm_http2,
+            )
+        return _registry
@@ -4,8 +4,11 @@ Text processing, chunking, and document management utilities
 """
 
 import hashlib
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Tuple
 
 from .vector_store import DocumentChunk
 
@@ -13,9 +16,16 @@ from .vector_store import DocumentChunk
 class DocumentProcessor:
     """Process documents into chunks for vector storage"""
 
-    def __init__(self, chunk_size: int = 500, chunk_overlap: int = 50):
+    # Files larger than this are streamed in bounded parts instead of chunked in one go
+    LARGE_FILE_BYTES = 16 * 1024 * 1024
+    READ_BLOCK_SIZE = 256 * 1024
+    STREAM_PART_CHUNKS = 256
+
+    def __init__(self, chunk_size: int = 500, chunk_overlap: int = 50, workers: int = 0):
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        # Processes used to read and chunk files; 0 uses every CPU core
+        self.workers = workers or os.cpu_count() or 1
 
     def load_documents(self, docs_dir: str) -> List[DocumentChunk]:
         """Load and chunk all documents from directory"""
@@ -34,65 +44,199 @@ class DocumentProcessor:
                 print(f"[!] No .txt documents found in {docs_dir}. Please add documents and try again.")
                 return []
 
-            for file_path in txt_files:
-                try:
-                    print(f"[*] Processing {file_path.name}...")
+            for _, chunks in self.iter_file_chunks(txt_files):
+                all_chunks.extend(chunks)
 
-                    with open(file_path, encoding="utf-8") as f:
-                        content = f.read()
+            print(f"[i] Total chunks created: {len(all_chunks)})")
+            return all_chunks
+
+        except Exception as e:
+            print(f"[!] Error loading documents: {e}")
+            return []
 
-                    if not content.strip():
-                        print(f"   [!] Warning: {file_path.name} is empty, skipping...")
-                        continue
+    def iter_file_chunks(
+        self, file_paths: Iterable[Path]
+    ) -> Iterator[Tuple[Path, List[DocumentChunk]]]:
+        """Yield (file, chunks) in input order, reading and chunking files in a process pool
 
-                    # Split into chunks
-                    chunks = self._chunk_text(content, file_path.name)
-                    all_chunks.extend(chunks)
+        Files over LARGE_FILE_BYTES are streamed in this process and yielded as several
+        consecutive parts of at most STREAM_PART_CHUNKS chunks each, so memory stays
+        bounded by chunk size rather than file size.
+        """
+        file_paths = [Path(file_path) for file_path in file_paths]
+        if self.workers <= 1 or len(file_paths) < 2:
+            for file_path in file_paths:
+                yield from self._load_in_parts(file_path)
+            return
 
-                    print(f"   [+] Created {len(chunks)} chunks from {file_path.name}")
+        # Keep a bounded window of files in flight so huge corpora don't queue every path
+        window = self.workers * 4
+        pool = ProcessPoolExecutor(max_workers=min(self.workers, len(file_paths)))
+        in_flight = deque()
+        try:
+            for file_path in file_paths:
+                future = None
+                if not self._is_large(file_path):
+                    future = pool.submit(
+                        _chunk_file, file_path, self.chunk_size, self.chunk_overlap
+                    )
+                in_flight.append((file_path, future))
+                if len(in_flight) >= window:
+                    yield from self._collect(*in_flight.popleft())
+            while in_flight:
+                yield from self._collect(*in_flight.popleft())
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
 
-                except Exception as e:
-                    print(f"   [!] Error processing {file_path.name}: {e}")
-                    continue
+    def _collect(self, file_path: Path, future) -> Iterator[Tuple[Path, List[DocumentChunk]]]:
+        """Results for one file: the pool's chunk list, or streamed parts of a large file"""
+        if future is None:
+            yield from self._load_in_parts(file_path)
+            return
 
-            print(f"[i] Total chunks created: {len(all_chunks)})")
-            return all_chunks
+        chunks = future.result()
+        if chunks:
+            print(f"   [+] Created {len(chunks)} chunks from {file_path.name}")
+        yield file_path, chunks
 
+    def _load_in_parts(self, file_path: Path) -> Iterator[Tuple[Path, List[DocumentChunk]]]:
+        if not self._is_large(file_path):
+            yield file_path, self.load_file(file_path)
+            return
+
+        print(f"[*] Streaming {file_path.name}...")
+        part: List[DocumentChunk] = []
+        total = 0
+        try:
+            for chunk in self.iter_chunks(file_path):
+                part.append(chunk)
+                if len(part) >= self.STREAM_PART_CHUNKS:
+                    total += len(part)
+                    yield file_path, part
+                    part = []
         except Exception as e:
-            print(f"[!] Error loading documents: {e}")
+            # Parts already yielded cannot be taken back; the rest of the file is skipped
+            print(f"   [!] Error processing {file_path.name}: {e}")
+
+        total += len(part)
+        if part or not total:
+            yield file_path, part
+        print(f"   [+] Created {total} chunks from {file_path.name}")
+
+    def _is_large(self, file_path: Path) -> bool:
+        try:
+            return file_path.stat().st_size > self.LARGE_FILE_BYTES
+        except OSError:
+            return False
+
+    def load_file(self, file_path: Path, verbose: bool = True) -> List[DocumentChunk]:
+        """Load and chunk a single document (empty or unreadable files yield no chunks)"""
+        file_path = Path(file_path)
+        try:
+            if verbose:
+                print(f"[*] Processing {file_path.name}...")
+
+            # Split into chunks
+            chunks = list(self.iter_chunks(file_path))
+
+            if not chunks:
+                print(f"   [!] Warning: {file_path.name} is empty, skipping...")
+                return []
+
+            if verbose:
+                print(f"   [+] Created {len(chunks)} chunks from {file_path.name}")
+            return chunks
+
+        except Exception as e:
+            print(f"   [!] Error processing {file_path.name}: {e}")
             return []
 
+    def iter_chunks(self, file_path: Path) -> Iterator[DocumentChunk]:
+        """Stream a file's chunks without reading the whole file into memory"""
+        file_path = Path(file_path)
+        return self._iter_window_chunks(self._iter_words(file_path), file_path.name)
+
+    def _iter_words(self, file_path: Path) -> Iterator[str]:
+        """Whitespace-separated words of a file, read in fixed-size blocks"""
+        carry = ""
+        with open(file_path, encoding="utf-8") as f:
+            while True:
+                block = f.read(self.READ_BLOCK_SIZE)
+                if not block:
+                    break
+
+                block = carry + block
+                words = block.split()
+                # A block that doesn't end in whitespace may have cut its last word in two
+                carry = words.pop() if words and not block[-1].isspace() else ""
+                yield from words
+
+        if carry:
+            yield carry
+
     def _chunk_text(self, text: str, source_file: str) -> List[DocumentChunk]:
         """Split text into overlapping chunks"""
-        words = text.split()
-        chunks = []
-
-        for i in range(0, len(words), self.chunk_size - self.chunk_overlap):
-            chunk_words = words[i : i + self.chunk_size]
-            chunk_text = " ".join(chunk_words)
-
-            # Create unique ID for chunk
-            chunk_id = hashlib.md5(f"{source_file}_{i}_{chunk_text[:50]}".encode()).hexdigest()[:12]
-
-            chunk = DocumentChunk(
-                id=chunk_id,
-                text=chunk_text,
-                source_file=source_file,
-                chunk_index=len(chunks),
-                metadata={
-                    "word_count": len(chunk_words),
-                    "char_count": len(chunk_text),
-                    "start_word": i,
-                    "end_word": i + len(chunk_words),
-                },
-            )
-            chunks.append(chunk)
-
-            # Stop if we've covered all words
-            if i + self.chunk_size >= len(words):
-                break
-
-        return chunks
+        return list(self._iter_window_chunks(iter(text.split()), source_file))
+
+    def _iter_window_chunks(self, words: Iterator[str], source_file: str) -> Iterator[DocumentChunk]:
+        """Slide a chunk_size word window forward by (chunk_size - chunk_overlap) words
+
+        Only the current window is held in memory. A trailing partial window is emitted only
+        if it contains words not covered by the previous chunk.
+        """
+        step = self.chunk_size - self.chunk_overlap
+        if self.chunk_size < 1 or step < 1:
+            raise ValueError("chunk_size must be positive and larger than chunk_overlap")
+
+        window: deque = deque()
+        start = 0  # word position of window[0]
+        skip = 0  # words to drop before the next window starts (when step > chunk_size)
+        fresh = False  # whether the window holds words not yet emitted
+        chunk_index = 0
+
+        for word in words:
+            if skip:
+                skip -= 1
+                continue
+
+            window.append(word)
+            fresh = True
+            if len(window) == self.chunk_size:
+                yield self._make_chunk(window, source_file, start, chunk_index)
+                chunk_index += 1
+                fresh = False
+
+                dropped = min(step, len(window))
+                for _ in range(dropped):
+                    window.popleft()
+                skip = step - dropped
+                start += step
+
+        if window and fresh:
+            yield self._make_chunk(window, source_file, start, chunk_index)
+
+    @staticmethod
+    def _make_chunk(
+        window: Iterable[str], source_file: str, start: int, chunk_index: int
+    ) -> DocumentChunk:
+        chunk_words = list(window)
+        chunk_text = " ".join(chunk_words)
+
+        # Create unique ID for chunk
+        chunk_id = hashlib.md5(f"{source_file}_{start}_{chunk_text[:50]}".encode()).hexdigest()[:12]
+
+        return DocumentChunk(
+            id=chunk_id,
+            text=chunk_text,
+            source_file=source_file,
+            chunk_index=chunk_index,
+            metadata={
+                "word_count": len(chunk_words),
+                "char_count": len(chunk_text),
+                "start_word": start,
+                "end_word": start + len(chunk_words),
+            },
+        )
 
     def preprocess_text(self, text: str) -> str:
         """Basic text preprocessing"""
@@ -122,3 +266,10 @@ class DocumentProcessor:
             "files": files,
             "avg_chunk_size": total_words / len(chunks) if chunks else 0,
         }
+
+
+def _chunk_file(file_path: Path, chunk_size: int, chunk_overlap: int) -> List[DocumentChunk]:
+    """Process-pool worker: load and chunk one file"""
+    return DocumentProcessor(chunk_size, chunk_overlap, workers=1).load_file(
+        file_path, verbose=False
+    )
@@ -0,0 +1,284 @@
+"""
+Index Factory Module
+Construction, training and tuning of FAISS ANN index backends
+"""
+
+import math
+from typing import Callable, Dict, Optional, Tuple
+
+import faiss
+import numpy as np
+
+INDEX_TYPES = ("auto", "flat", "sq8", "pq", "ivf_flat", "ivf_sq8", "ivf_pq", "hnsw")
+
+# Compressed encodings; search over-fetches from these and reranks with exact float32 vectors
+QUANTIZED_TYPES = ("sq8", "pq", "ivf_sq8", "ivf_pq")
+
+# Corpus-size thresholds used by the "auto" index type
+AUTO_FLAT_MAX_VECTORS = 10_000
+AUTO_HNSW_MAX_VECTORS = 200_000
+AUTO_IVF_FLAT_MAX_VECTORS = 2_000_000
+
+# FAISS clustering wants roughly this many training points per centroid
+MIN_POINTS_PER_CENTROID = 39
+
+HNSW_M = 32
+
+# Read-only mapping of a saved index. IO_FLAG_MMAP_IFC (FAISS >= 1.10) maps flat codes, HNSW
+# graphs and IVF lists alike; older FAISS can only map IVF inverted lists
+MMAP_IO_FLAGS = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+
+
+def choose_index_type(n_vectors: int) -> str:
+    """Pick an index backend suited to the corpus size"""
+    if n_vectors < AUTO_FLAT_MAX_VECTORS:
+        return "flat"
+    if n_vectors < AUTO_HNSW_MAX_VECTORS:
+        return "hnsw"
+    if n_vectors < AUTO_IVF_FLAT_MAX_VECTORS:
+        return "ivf_flat"
+    return "ivf_pq"
+
+
+def default_nlist(n_vectors: int) -> int:
+    """Number of IVF partitions for a corpus of the given size"""
+    nlist = int(4 * math.sqrt(max(n_vectors, 1)))
+    return max(1, min(nlist, n_vectors // MIN_POINTS_PER_CENTROID))
+
+
+def default_pq_m(dimension: int) -> int:
+    """Number of PQ sub-quantizers (must divide the dimension), aiming for 8-dim sub-vectors"""
+    for m in range(max(1, dimension // 8), 0, -1):
+        if dimension % m == 0:
+            return m
+    return 1
+
+
+def default_pq_nbits(n_vectors: int) -> int:
+    """Bits per PQ code; 8-bit codes need 256 training points, so shrink for tiny corpora"""
+    return max(1, min(8, int(math.log2(max(n_vectors, 2)))))
+
+
+def factory_string(index_type: str, dimension: int, n_vectors: int) -> str:
+    """Build the faiss.index_factory description for an index type"""
+    if index_type == "flat":
+        return "Flat"
+    if index_type == "sq8":
+        return "SQ8"
+    if index_type == "pq":
+        return f"PQ{default_pq_m(dimension)}x{default_pq_nbits(n_vectors)}"
+    if index_type == "hnsw":
+        return f"HNSW{HNSW_M}"
+    if index_type == "ivf_flat":
+        return f"IVF{default_nlist(n_vectors)},Flat"
+    if index_type == "ivf_sq8":
+        return f"IVF{default_nlist(n_vectors)},SQ8"
+    if index_type == "ivf_pq":
+        nbits = default_pq_nbits(n_vectors)
+        return f"IVF{default_nlist(n_vectors)},PQ{default_pq_m(dimension)}x{nbits}"
+    raise ValueError(f"Unknown index type '{index_type}'. Expected one of {INDEX_TYPES}")
+
+
+def create_index(index_type: str, dimension: int, n_vectors: int = 0) -> faiss.Index:
+    """Create an (untrained) inner-product index of the requested type"""
+    if index_type == "auto":
+        index_type = choose_index_type(n_vectors)
+    index = faiss.index_factory(
+        dimension, factory_string(index_type, dimension, n_vectors), faiss.METRIC_INNER_PRODUCT
+    )
+    if isinstance(index, (faiss.IndexPQ, faiss.IndexIVFPQ)):
+        # Polysemous codes only help Hamming-filtered search, and training them is slow
+        index.do_polysemous_training = False
+    return index
+
+
+def train_index(
+    index: faiss.Index, embeddings: np.ndarray, sample_size: int = 100_000, seed: int = 0
+):
+    """Train an index on a random sample of the embeddings (no-op when no training is needed)"""
+    if index.is_trained:
+        return
+
+    if len(embeddings) > sample_size:
+        rng = np.random.default_rng(seed)
+        sample = embeddings[rng.choice(len(embeddings), sample_size, replace=False)]
+    else:
+        sample = embeddings
+
+    print(f"[*] Training {type(index).__name__} on {len(sample)} vectors...")
+    index.train(np.ascontiguousarray(sample, dtype="float32"))
+
+
+def read_index(path: str, mmap: bool = False) -> faiss.Index:
+    """Read a saved index, either into private memory or as a shared read-only mapping
+
+    A mapped index is served from the OS page cache, so processes mapping the same file
+    share its pages. It must not be modified: FAISS aborts the process on writes to mapped
+    buffers, and clone_index keeps the mapping, so copy it via serialize_index first.
+    """
+    return faiss.read_index(path, MMAP_IO_FLAGS if mmap else 0)
+
+
+def base_index(index: faiss.Index) -> faiss.Index:
+    """The underlying index, unwrapped from any ID map"""
+    index = faiss.downcast_index(index)
+    if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        return faiss.downcast_index(index.index)
+    return index
+
+
+def with_ids(index: faiss.Index) -> faiss.Index:
+    """Give an index stable external IDs so vectors can be removed later
+
+    IVF indexes store IDs natively (a hashtable direct map keeps reconstruction and
+    removal working); other indexes are wrapped in an IndexIDMap2. Already populated
+    indexes keep their positional IDs.
+    """
+    # Downcast views do not own the index, so keep returning the caller's object
+    if isinstance(faiss.downcast_index(index), (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        return index
+
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        if ivf.direct_map.type != faiss.DirectMap.Hashtable:
+            ivf.set_direct_map_type(faiss.DirectMap.Hashtable)
+        return index
+
+    if index.ntotal == 0:
+        return faiss.IndexIDMap2(index)
+
+    vectors = index.reconstruct_n(0, index.ntotal)
+    empty = faiss.clone_index(index)
+    empty.reset()
+    wrapped = faiss.IndexIDMap2(empty)
+    wrapped.add_with_ids(vectors, np.arange(len(vectors), dtype="int64"))
+    return wrapped
+
+
+def stored_ids(index: faiss.Index) -> np.ndarray:
+    """External IDs of all vectors currently in the index"""
+    index = faiss.downcast_index(index)
+    if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        return faiss.vector_to_array(index.id_map).astype("int64")
+
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        invlists = ivf.invlists
+        parts = [
+            faiss.rev_swig_ptr(invlists.get_ids(list_no), invlists.list_size(list_no)).copy()
+            for list_no in range(ivf.nlist)
+            if invlists.list_size(list_no)
+        ]
+        return np.concatenate(parts).astype("int64") if parts else np.zeros(0, dtype="int64")
+
+    return np.arange(index.ntotal, dtype="int64")
+
+
+def reconstruct_all(index: faiss.Index) -> Tuple[np.ndarray, np.ndarray]:
+    """(ids, vectors) for everything in the index; lossy for PQ-encoded indexes"""
+    ids = stored_ids(index)
+    if len(ids) == 0:
+        return ids, np.zeros((0, index.d), dtype="float32")
+    return ids, index.reconstruct_batch(ids)
+
+
+def remove_ids(index: faiss.Index, ids: np.ndarray) -> int:
+    """Remove vectors by external ID; raises RuntimeError if the index cannot remove"""
+    ids = np.ascontiguousarray(ids, dtype="int64")
+    if faiss.try_extract_index_ivf(faiss.downcast_index(index)) is not None:
+        # Hashtable direct maps only accept array selectors
+        return index.remove_ids(faiss.IDSelectorArray(ids))
+    return index.remove_ids(faiss.IDSelectorBatch(ids))
+
+
+def index_type_of(index: faiss.Index) -> str:
+    """Reverse-map a FAISS index object to one of INDEX_TYPES"""
+    index = base_index(index)
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivf_pq"
+    if isinstance(index, faiss.IndexIVFScalarQuantizer):
+        return "ivf_sq8"
+    if isinstance(index, faiss.IndexIVF):
+        return "ivf_flat"
+    if isinstance(index, faiss.IndexScalarQuantizer):
+        return "sq8"
+    if isinstance(index, faiss.IndexPQ):
+        return "pq"
+    return "flat"
+
+
+def set_search_defaults(index: faiss.Index, nprobe: int, ef_search: int):
+    """Set the default search effort stored on an IVF or HNSW index"""
+    base = base_index(index)
+    if isinstance(base, faiss.IndexIVF):
+        base.nprobe = min(nprobe, base.nlist)
+    elif isinstance(base, faiss.IndexHNSW):
+        base.hnsw.efSearch = ef_search
+
+
+def search_params(
+    index: faiss.Index, nprobe: Optional[int] = None, ef_search: Optional[int] = None
+) -> Optional[faiss.SearchParameters]:
+    """Per-query search parameters for IVF (nprobe) and HNSW (efSearch) indexes"""
+    index = base_index(index)
+    if isinstance(index, faiss.IndexIVF) and nprobe:
+        params = faiss.SearchParametersIVF()
+        params.nprobe = min(nprobe, index.nlist)
+        return params
+    if isinstance(index, faiss.IndexHNSW) and ef_search:
+        params = faiss.SearchParametersHNSW()
+        params.efSearch = ef_search
+        return params
+    return None
+
+
+def rerank_exact(
+    query_embeddings: np.ndarray,
+    candidate_ids: np.ndarray,
+    vectors_for: Callable[[np.ndarray], np.ndarray],
+    top_k: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Re-score ANN candidates by exact inner product and keep each query's best top_k
+
+    `vectors_for` maps an array of vector IDs to their float32 vectors. Returns
+    (scores, ids) shaped like a FAISS search result, padded with -1 IDs.
+    """
+    scores = np.full((len(query_embeddings), top_k), -np.inf, dtype="float32")
+    ids = np.full((len(query_embeddings), top_k), -1, dtype="int64")
+    for row, (query, candidates) in enumerate(zip(query_embeddings, candidate_ids)):
+        candidates = candidates[candidates != -1]
+        if len(candidates) == 0:
+            continue
+        exact = vectors_for(candidates) @ query
+        best = np.argsort(-exact, kind="stable")[:top_k]
+        scores[row, : len(best)] = exact[best]
+        ids[row, : len(best)] = candidates[best]
+    return scores, ids
+
+
+def recall_at_k(approx_ids: np.ndarray, exact_ids: np.ndarray) -> float:
+    """Mean fraction of the exact top-k neighbours found by the approximate search"""
+    if len(exact_ids) == 0:
+        return 0.0
+
+    hits = 0
+    total = 0
+    for approx_row, exact_row in zip(approx_ids, exact_ids):
+        expected = set(int(i) for i in exact_row if i != -1)
+        hits += len(expected.intersection(int(i) for i in approx_row if i != -1))
+        total += len(expected)
+    return hits / total if total else 0.0
+
+
+def describe_index(index: faiss.Index) -> Dict:
+    """Summary of an index's type and tuning knobs"""
+    base = base_index(index)
+    info: Dict = {"index_type": index_type_of(base), "ntotal": index.ntotal}
+    if isinstance(base, faiss.IndexIVF):
+        info["nlist"] = base.nlist
+        info["nprobe"] = base.nprobe
+    if isinstance(base, faiss.IndexHNSW):
+        info["ef_search"] = base.hnsw.efSearch
+    return info
@@ -0,0 +1,116 @@
+"""
+Index Manifest Module
+Tracks which source files are indexed so updates only re-embed what changed
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class ManifestDiff:
+    """Source files grouped by how they changed since the manifest was written"""
+
+    new: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.new or self.changed or self.deleted)
+
+
+def file_digest(file_path: Path, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FileManifest:
+    """Per-file content hash, stat fingerprint and vector IDs of an index, stored as JSON"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        # file name -> {"sha256", "mtime", "size", "vector_ids"}
+        self.files: Dict[str, Dict] = {}
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def load(self) -> "FileManifest":
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported index manifest version: {data.get('version')}")
+        self.files = data["files"]
+        return self
+
+    def save(self):
+        """Atomically write the manifest"""
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "files": self.files}, f)
+        os.replace(tmp_path, self.path)
+
+    def scan(self, docs_dir: str, pattern: str = "*.txt") -> ManifestDiff:
+        """Compare the documents directory against the manifest
+
+        Files whose size and mtime are unchanged are assumed unchanged without being read;
+        otherwise the content hash decides, so touched-but-identical files are not re-embedded.
+        """
+        diff = ManifestDiff()
+        on_disk = {path.name: path for path in sorted(Path(docs_dir).glob(pattern))}
+
+        for name, file_path in on_disk.items():
+            entry = self.files.get(name)
+            if entry is None:
+                diff.new.append(name)
+                continue
+
+            stat = file_path.stat()
+            if entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+                diff.unchanged.append(name)
+            elif entry["sha256"] == file_digest(file_path):
+                # Refresh the fingerprint so the next scan takes the fast path
+                entry["size"], entry["mtime"] = stat.st_size, stat.st_mtime
+                diff.unchanged.append(name)
+            else:
+                diff.changed.append(name)
+
+        diff.deleted = sorted(name for name in self.files if name not in on_disk)
+        return diff
+
+    @staticmethod
+    def fingerprint(file_path: Path) -> Dict:
+        """Stat, then hash, a file; taken before it is read, an edit made while it is being
+        indexed shows up as a change on the next scan"""
+        stat = Path(file_path).stat()
+        return {
+            "sha256": file_digest(file_path),
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+        }
+
+    def record(self, file_path: Path, vector_ids: List[int], fingerprint: Optional[Dict] = None):
+        """Remember a file's fingerprint (by default its current one) and its vector IDs"""
+        file_path = Path(file_path)
+        self.files[file_path.name] = {
+            **(fingerprint or self.fingerprint(file_path)),
+            "vector_ids": [int(i) for i in vector_ids],
+        }
+
+    def forget(self, name: str) -> List[int]:
+        """Drop a file from the manifest and return its vector IDs"""
+        entry = self.files.pop(name, None)
+        return entry["vector_ids"] if entry else []
@@ -0,0 +1,150 @@
+"""
+Ingestion Module
+Streaming document ingestion that overlaps file I/O, chunking, embedding and indexing
+"""
+
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from .document_processor import DocumentProcessor
+from .vector_store import DocumentChunk, VectorStore
+
+# Sentinel marking the end of the producer's output
+_DONE = object()
+
+
+class IngestionPipeline:
+    """Stream files through a chunking process pool, batched embedding and incremental FAISS adds
+
+    A producer thread collects (file, chunks) results from the processor's process pool into
+    a bounded queue; the calling thread drains it, embeds fixed-size batches and adds them to
+    the index while the pool keeps reading and chunking the next files.
+    """
+
+    def __init__(
+        self,
+        vector_store: VectorStore,
+        processor: DocumentProcessor,
+        batch_size: int = 256,
+        queue_size: int = 64,
+    ):
+        if batch_size < 1 or queue_size < 1:
+            raise ValueError("batch_size and queue_size must be positive")
+
+        self.vector_store = vector_store
+        self.processor = processor
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+
+    def run(self, file_paths: Sequence[Path]) -> List[Tuple[Path, List[int]]]:
+        """Ingest files and return each file's vector IDs, in input order"""
+        start_time = time.time()
+        items: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        producer = threading.Thread(
+            target=self._produce, args=(list(file_paths), items, stop), daemon=True
+        )
+        producer.start()
+
+        self._results: List[Tuple[Path, List[int]]] = []
+        # Chunks awaiting embedding, and embedded chunks awaiting the index
+        self._batch: List[Tuple[int, DocumentChunk]] = []
+        self._embedded: List[Tuple[List[Tuple[int, DocumentChunk]], np.ndarray]] = []
+        total_chunks = 0
+
+        try:
+            while True:
+                item = items.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, BaseException):
+                    raise RuntimeError(f"Error during document ingestion: {item}") from item
+
+                file_path, chunks = item
+                # Large files arrive as several consecutive parts
+                if not self._results or self._results[-1][0] != file_path:
+                    self._results.append((file_path, []))
+                owner = len(self._results) - 1
+                for chunk in chunks:
+                    self._batch.append((owner, chunk))
+                    if len(self._batch) >= self.batch_size:
+                        self._embed_batch()
+                total_chunks += len(chunks)
+
+            if self._batch:
+                self._embed_batch()
+            self._flush(force=True)
+        finally:
+            stop.set()
+            producer.join()
+
+        elapsed = time.time() - start_time
+        rate = total_chunks / elapsed if elapsed > 0 else 0.0
+        print(
+            f"[+] Ingested {len(self._results)} files ({total_chunks} chunks) "
+            f"in {elapsed:.1f}s ({rate:.0f} chunks/s)"
+        )
+        if self.vector_store.index is not None:
+            print(f"[i] Total vectors in index: {self.vector_store.index.ntotal}")
+        return self._results
+
+    def _produce(self, file_paths: List[Path], items: queue.Queue, stop: threading.Event):
+        """Producer thread: forward chunked files from the process pool into the queue"""
+
+        def put(item) -> bool:
+            # Time out periodically so a failed consumer never leaves this thread blocked
+            while not stop.is_set():
+                try:
+                    items.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        try:
+            for result in self.processor.iter_file_chunks(file_paths):
+                if not put(result):
+                    return
+        except Exception as e:
+            put(e)
+            return
+        put(_DONE)
+
+    def _embed_batch(self):
+        """Embed the current batch and hand it to the index as soon as it can take it"""
+        embeddings = self.vector_store.embed_documents(
+            [chunk for _, chunk in self._batch], show_progress_bar=False
+        )
+        self._embedded.append((self._batch, embeddings))
+        self._batch = []
+        self._flush()
+
+    def _flush(self, force: bool = False):
+        """Add embedded batches to the index
+
+        An index that still has to be created and trained waits until a full training sample
+        has been embedded, so IVF partitions are sized for the corpus rather than one batch.
+        """
+        if not self._embedded:
+            return
+
+        pending = sum(len(rows) for rows, _ in self._embedded)
+        if (
+            not force
+            and self.vector_store.needs_training_sample
+            and pending < self.vector_store.train_sample_size
+        ):
+            return
+
+        rows = [row for batch, _ in self._embedded for row in batch]
+        embeddings = np.vstack([batch_embeddings for _, batch_embeddings in self._embedded])
+        self._embedded = []
+
+        ids = self.vector_store.add_embedded([chunk for _, chunk in rows], embeddings)
+        for (owner, _), vector_id in zip(rows, ids):
+            self._results[owner][1].append(vector_id)
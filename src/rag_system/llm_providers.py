@@ -3,83 +3,545 @@ LLM Provider Management
 Unified interface for different LLM providers (Groq, Together AI, etc.)
 """
 
+import asyncio
+import contextvars
+import importlib
 import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Optional
+from types import SimpleNamespace
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Union,
+)
 
 from dotenv import load_dotenv
-from groq import Groq
-from together import Together
+
+from .client_registry import get_registry
+from .provider_router import AUTO, ProviderRouter, get_router
+from .rate_limiter import (
+    PRIORITY_INTERACTIVE,
+    RateLimiter,
+    estimate_tokens,
+    get_rate_limiter,
+    retry_after,
+    used_tokens,
+)
+from .tracing import span
+
+if TYPE_CHECKING:
+    from groq import Groq
+    from together import Together
 
 # Load environment variables
 load_dotenv(Path(".env"), override=True)
 
+# Returned by generate_response when no provider produced an answer
+ALL_PROVIDERS_FAILED = "[!] All providers failed or are not configured."
+
+# Retries of one provider after 429 responses before falling back to the next
+MAX_RATE_LIMIT_RETRIES = 2
+
+# provider -> (display name, API key variable, sync client, async client, model). Client
+# classes are "module.Class" paths, imported only once a client is created
+PROVIDERS = {
+    "groq": ("Groq", "GROQ_API_KEY", "groq.Groq", "groq.AsyncGroq", "llama3-8b-8192"),
+    "together": (
+        "Together AI",
+        "TOGETHER_API_KEY",
+        "together.Together",
+        "together.AsyncTogether",
+        "meta-llama/Llama-3-8b-chat-hf",
+    ),
+}
+
+
+def _client_class(path: str) -> type:
+    """Import a provider SDK client class from its "module.Class" path"""
+    module, name = path.rsplit(".", 1)
+    return getattr(importlib.import_module(module), name)
+
 
 class LLMProvider:
-    """Unified interface for different LLM providers"""
+    """Unified interface for different LLM providers
+
+    Clients can be injected (e.g. StubChatClient / AsyncStubChatClient) to run the pipeline
+    without network access; otherwise pooled clients are taken from the process-wide
+    ClientRegistry, so every instance shares the same warm connections.
 
-    def __init__(self):
-        self.groq_client: Optional[Groq] = None
-        self.together_client: Optional[Together] = None
-        self._initialize_clients()
+    With provider="auto" the ProviderRouter picks the fastest healthy provider from rolling
+    latency stats and, when hedging is enabled, sends a backup request to the runner-up if
+    the first has not answered within its p95 latency.
+
+    Every call first takes budget from the provider's RateLimiter (RPM/TPM token buckets,
+    served by priority), and a 429 holds that provider's queue for the retry-after period.
+    """
+
+    def __init__(
+        self,
+        clients: Optional[Dict[str, Any]] = None,
+        async_clients: Optional[Dict[str, Any]] = None,
+        router: Optional[ProviderRouter] = None,
+        rate_limiters: Optional[Dict[str, RateLimiter]] = None,
+    ):
+        self.router = router or get_router()
+        self.rate_limiters: Dict[str, RateLimiter] = dict(rate_limiters or {})
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+        self._hedge_lock = threading.Lock()
+        self._injected = clients is not None
+        self._injected_async = async_clients is not None
+        self.clients: Dict[str, Any] = dict(clients or {})
+        self.async_clients: Dict[str, Any] = dict(async_clients or {})
+        self.registry = None if self._injected and self._injected_async else get_registry()
+        if not self._injected:
+            self._initialize_clients()
 
     def _initialize_clients(self):
-        """Initialize available LLM clients"""
-        # Initialize Groq
-        groq_key = os.getenv("GROQ_API_KEY")
-        if groq_key:
-            self.groq_client = Groq(api_key=groq_key)
-            print("[+] Groq client initialized")
-
-        # Initialize Together AI
-        together_key = os.getenv("TOGETHER_API_KEY")
-        if together_key:
-            self.together_client = Together(api_key=together_key)
-            print("[+] Together AI client initialized")
-
-    def generate_response(self, prompt: str, provider: str = "groq", max_tokens: int = 500) -> str:
+        """Report configured providers; their clients are created on first use"""
+        for name, (label, _, _, _, _) in PROVIDERS.items():
+            if self._configured(name):
+                print(f"[+] {label} client configured")
+
+    def _configured(self, provider: str) -> bool:
+        """Whether a provider can be called, without creating its client"""
+        if self._injected:
+            return self.clients.get(provider) is not None
+        return provider in PROVIDERS and bool(os.getenv(PROVIDERS[provider][1]))
+
+    def _client(self, provider: str) -> Optional[Any]:
+        """Sync client for a provider (a pooled registry client unless injected)"""
+        if self._injected:
+            return self.clients.get(provider)
+
+        if provider not in PROVIDERS or not os.getenv(PROVIDERS[provider][1]):
+            return None
+        _, key_var, client_class, _, _ = PROVIDERS[provider]
+        return self.registry.get(provider, _client_class(client_class), os.getenv(key_var))
+
+    def _async_client(self, provider: str) -> Optional[Any]:
+        """Async client for a provider, pooled per running event loop unless injected"""
+        if self._injected_async:
+            return self.async_clients.get(provider)
+
+        if provider not in PROVIDERS or not os.getenv(PROVIDERS[provider][1]):
+            return None
+        _, key_var, _, async_class, _ = PROVIDERS[provider]
+        return self.registry.get_async(provider, _client_class(async_class), os.getenv(key_var))
+
+    @property
+    def groq_client(self) -> Optional["Groq"]:
+        return self._client("groq")
+
+    @property
+    def together_client(self) -> Optional["Together"]:
+        return self._client("together")
+
+    def _report(self, provider: str, error: Optional[Exception] = None):
+        """Feed call outcomes to the registry's connection health tracking"""
+        if self.registry is None:
+            return
+        if error is None:
+            self.registry.report_success(provider)
+        else:
+            self.registry.report_failure(provider, error)
+
+    def _fallback_order(self, provider: str, client_for: Callable[[str], Any]) -> List[str]:
+        """Providers to try, in order: routed for "auto", else requested first then the rest"""
+        if provider == AUTO:
+            order = self.router.rank(list(PROVIDERS))
+        else:
+            order = [provider] + [name for name in PROVIDERS if name != provider]
+        return [name for name in order if client_for(name) is not None]
+
+    @staticmethod
+    def _request(provider: str, prompt: str, max_tokens: int) -> Dict:
+        return {
+            "model": PROVIDERS[provider][4],
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+            "temperature": 0.3,
+        }
+
+    def _limiter(self, provider: str) -> RateLimiter:
+        if provider not in self.rate_limiters:
+            self.rate_limiters[provider] = get_rate_limiter(provider)
+        return self.rate_limiters[provider]
+
+    def _backoff(self, provider: str, error: Exception, attempt: int) -> bool:
+        """On a 429, hold the provider's queue for its retry-after; True to retry the call"""
+        wait = retry_after(error)
+        if wait is None:
+            return False
+        self._limiter(provider).penalize(wait)
+        if attempt >= MAX_RATE_LIMIT_RETRIES:
+            return False
+        print(f"[!] {provider} rate limited; retrying in {wait:.1f}s")
+        return True
+
+    def _call(
+        self, provider: str, prompt: str, max_tokens: int, priority: int = PRIORITY_INTERACTIVE
+    ) -> Optional[str]:
+        """One timed, rate-limited request to one provider; None if it failed"""
+        limiter = self._limiter(provider)
+        reserved = estimate_tokens(prompt) + max_tokens
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            with span("rate_limit_wait", provider=provider):
+                limiter.acquire(reserved, priority)
+            start_time = time.time()
+            # A failed or rate-limited call returns its whole reservation
+            used: Optional[int] = 0
+            try:
+                with span("llm", provider=provider) as llm_span:
+                    try:
+                        response = self._client(provider).chat.completions.create(
+                            **self._request(provider, prompt, max_tokens)
+                        )
+                    except Exception as e:
+                        if self._backoff(provider, e, attempt):
+                            llm_span.set(status="rate_limited")
+                            continue
+                        llm_span.set(status="error")
+                        print(f"[!] Error with {provider}: {e}")
+                        self.router.record(provider, time.time() - start_time, ok=False)
+                        self._report(provider, e)
+                        return None
+                    llm_span.set(status="ok")
+                used = used_tokens(response)
+            finally:
+                limiter.settle(reserved, used)
+            self.router.record(provider, time.time() - start_time)
+            self._report(provider)
+            return response.choices[0].message.content
+        return None
+
+    async def _acall(
+        self, provider: str, prompt: str, max_tokens: int, priority: int = PRIORITY_INTERACTIVE
+    ) -> Optional[str]:
+        """Async _call; a cancelled (hedged-out) call still counts its time as a latency sample"""
+        limiter = self._limiter(provider)
+        reserved = estimate_tokens(prompt) + max_tokens
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            with span("rate_limit_wait", provider=provider):
+                await limiter.aacquire(reserved, priority)
+            start_time = time.time()
+            # A failed or rate-limited call returns its whole reservation
+            used: Optional[int] = 0
+            try:
+                with span("llm", provider=provider) as llm_span:
+                    try:
+                        response = await self._async_client(provider).chat.completions.create(
+                            **self._request(provider, prompt, max_tokens)
+                        )
+                    except asyncio.CancelledError:
+                        # The provider may still generate the answer: keep it charged
+                        used = None
+                        llm_span.set(status="cancelled")
+                        self.router.record(provider, time.time() - start_time)
+                        raise
+                    except Exception as e:
+                        if self._backoff(provider, e, attempt):
+                            llm_span.set(status="rate_limited")
+                            continue
+                        llm_span.set(status="error")
+                        print(f"[!] Error with {provider}: {e}")
+                        self.router.record(provider, time.time() - start_time, ok=False)
+                        self._report(provider, e)
+                        return None
+                    llm_span.set(status="ok")
+                used = used_tokens(response)
+            finally:
+                limiter.settle(reserved, used)
+            self.router.record(provider, time.time() - start_time)
+            self._report(provider)
+            return response.choices[0].message.content
+        return None
+
+    def _hedge_executor(self) -> ThreadPoolExecutor:
+        with self._hedge_lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(thread_name_prefix="llm-hedge")
+            return self._hedge_pool
+
+    def generate_response(
+        self,
+        prompt: str,
+        provider: str = "groq",
+        max_tokens: int = 500,
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> str:
         """Generate response using specified provider, with single fallback (no recursion)"""
-        tried = set()
-        providers_to_try = [provider, "together" if provider == "groq" else "groq"]
-        for prov in providers_to_try:
-            if prov in tried:
-                continue
-            tried.add(prov)
+        order = self._fallback_order(provider, self._client)
+        if provider == AUTO and self.router.hedge and len(order) > 1:
+            answer = self._hedged(order[0], order[1], prompt, max_tokens, priority)
+            if answer is not None:
+                return answer
+            order = order[2:]
+
+        for prov in order:
+            answer = self._call(prov, prompt, max_tokens, priority)
+            if answer is not None:
+                return answer
+        return ALL_PROVIDERS_FAILED
+
+    def _hedged(
+        self, primary: str, backup: str, prompt: str, max_tokens: int, priority: int
+    ) -> Optional[str]:
+        """First answer from primary, or from backup once primary is slow or has failed
+
+        A sync request already in flight cannot be cancelled; the slower one finishes in the
+        background and only its latency is kept.
+        """
+        executor = self._hedge_executor()
+        # Copy the context so the hedged calls report to this request's trace
+        call = contextvars.copy_context().run
+        futures = {executor.submit(call, self._call, primary, prompt, max_tokens, priority)}
+        done, _ = wait(futures, timeout=self.router.hedge_delay(primary))
+        if done and next(iter(done)).result() is not None:
+            return next(iter(done)).result()
+
+        print(f"[*] Hedging {primary} with {backup}")
+        call = contextvars.copy_context().run
+        futures.add(executor.submit(call, self._call, backup, prompt, max_tokens, priority))
+        while futures:
+            done, futures = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.result() is not None:
+                    return future.result()
+        return None
+
+    async def agenerate_response(
+        self,
+        prompt: str,
+        provider: str = "groq",
+        max_tokens: int = 500,
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> str:
+        """Async generate_response on the providers' async clients (no thread per request)"""
+        order = self._fallback_order(provider, self._async_client)
+        if provider == AUTO and self.router.hedge and len(order) > 1:
+            answer = await self._ahedged(order[0], order[1], prompt, max_tokens, priority)
+            if answer is not None:
+                return answer
+            order = order[2:]
+
+        for prov in order:
+            answer = await self._acall(prov, prompt, max_tokens, priority)
+            if answer is not None:
+                return answer
+        return ALL_PROVIDERS_FAILED
+
+    async def _ahedged(
+        self, primary: str, backup: str, prompt: str, max_tokens: int, priority: int
+    ) -> Optional[str]:
+        """Async _hedged; the losing request is cancelled"""
+        tasks = {asyncio.ensure_future(self._acall(primary, prompt, max_tokens, priority))}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.router.hedge_delay(primary))
+            if done and next(iter(done)).result() is not None:
+                return next(iter(done)).result()
+
+            print(f"[*] Hedging {primary} with {backup}")
+            tasks = (tasks - done) | {
+                asyncio.ensure_future(self._acall(backup, prompt, max_tokens, priority))
+            }
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.result() is not None:
+                        return task.result()
+            return None
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stream_response(
+        self,
+        prompt: str,
+        provider: str = "groq",
+        max_tokens: int = 500,
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> Iterator[str]:
+        """Yield the completion as text deltas as the provider produces them
+
+        Falls back to the next provider only if the failure happened before the first token;
+        a stream that breaks midway re-raises the error, so a truncated answer is never
+        mistaken for a complete one.
+        """
+        prompt_tokens = estimate_tokens(prompt)
+        reserved = prompt_tokens + max_tokens
+        for prov in self._fallback_order(provider, self._client):
+            client = self._client(prov)
+            limiter = self._limiter(prov)
+            with span("rate_limit_wait", provider=prov):
+                limiter.acquire(reserved, priority)
+            start_time = time.time()
+            parts: List[str] = []
+            try:
+                with span("llm", provider=prov) as llm_span:
+                    try:
+                        stream = client.chat.completions.create(
+                            **self._request(prov, prompt, max_tokens), stream=True
+                        )
+                        for chunk in stream:
+                            delta = _delta_text(chunk)
+                            if delta:
+                                parts.append(delta)
+                                yield delta
+                    except Exception as e:
+                        llm_span.set(status="error")
+                        print(f"[!] Error with {prov}: {e}")
+                        self.router.record(prov, time.time() - start_time, ok=False)
+                        self._report(prov, e)
+                        if parts:
+                            raise
+                        self._backoff(prov, e, MAX_RATE_LIMIT_RETRIES)
+                        continue
+                    llm_span.set(status="ok")
+            finally:
+                # Charge what was streamed; a stream that produced nothing returns it all
+                limiter.settle(reserved, _streamed_tokens(prompt_tokens, parts))
+            self.router.record(prov, time.time() - start_time)
+            self._report(prov)
+            return
+        yield ALL_PROVIDERS_FAILED
+
+    async def astream_response(
+        self,
+        prompt: str,
+        provider: str = "groq",
+        max_tokens: int = 500,
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> AsyncIterator[str]:
+        """Async stream_response on the providers' async clients"""
+        prompt_tokens = estimate_tokens(prompt)
+        reserved = prompt_tokens + max_tokens
+        for prov in self._fallback_order(provider, self._async_client):
+            client = self._async_client(prov)
+            limiter = self._limiter(prov)
+            with span("rate_limit_wait", provider=prov):
+                await limiter.aacquire(reserved, priority)
+            start_time = time.time()
+            parts: List[str] = []
             try:
-                if prov == "groq" and self.groq_client:
-                    response = self.groq_client.chat.completions.create(
-                        messages=[{"role": "user", "content": prompt}],
-                        model="llama3-8b-8192",
-                        max_tokens=max_tokens,
-                        temperature=0.3,
-                    )
-                    return response.choices[0].message.content
-                elif prov == "together" and self.together_client:
-                    response = self.together_client.chat.completions.create(
-                        model="meta-llama/Llama-3-8b-chat-hf",
-                        messages=[{"role": "user", "content": prompt}],
-                        max_tokens=max_tokens,
-                        temperature=0.3,
-                    )
-                    return response.choices[0].message.content
-            except Exception as e:
-                print(f"[!] Error with {prov}: {e}")
-                continue
-        return f"[!] All providers failed or are not configured."
+                with span("llm", provider=prov) as llm_span:
+                    try:
+                        stream = await client.chat.completions.create(
+                            **self._request(prov, prompt, max_tokens), stream=True
+                        )
+                        async for chunk in stream:
+                            delta = _delta_text(chunk)
+                            if delta:
+                                parts.append(delta)
+                                yield delta
+                    except Exception as e:
+                        llm_span.set(status="error")
+                        print(f"[!] Error with {prov}: {e}")
+                        self.router.record(prov, time.time() - start_time, ok=False)
+                        self._report(prov, e)
+                        if parts:
+                            raise
+                        self._backoff(prov, e, MAX_RATE_LIMIT_RETRIES)
+                        continue
+                    llm_span.set(status="ok")
+            finally:
+                # Charge what was streamed; a stream that produced nothing returns it all
+                limiter.settle(reserved, _streamed_tokens(prompt_tokens, parts))
+            self.router.record(prov, time.time() - start_time)
+            self._report(prov)
+            return
+        yield ALL_PROVIDERS_FAILED
 
     def is_available(self, provider: str) -> bool:
         """Check if a provider is available"""
-        if provider == "groq":
-            return self.groq_client is not None
-        elif provider == "together":
-            return self.together_client is not None
-        return False
+        return self._configured(provider)
 
     def list_available_providers(self) -> list:
         """List all available providers"""
-        providers = []
-        if self.groq_client:
-            providers.append("groq")
-        if self.together_client:
-            providers.append("together")
-        return providers
+        return [name for name in PROVIDERS if self._configured(name)]
+
+
+def _streamed_tokens(prompt_tokens: int, parts: List[str]) -> int:
+    """Estimated tokens of a streamed call; 0 if nothing was generated"""
+    return prompt_tokens + estimate_tokens("".join(parts)) if parts else 0
+
+
+def _delta_text(chunk) -> Optional[str]:
+    """Text carried by one streamed completion chunk"""
+    if not chunk.choices:
+        return None
+    return chunk.choices[0].delta.content
+
+
+class StubChatClient:
+    """Offline chat client with the Groq/Together `chat.completions.create` call shape
+
+    `reply` is either a fixed answer or a function of the prompt; `latency` simulates the
+    provider round-trip (or the delay between tokens when streaming).
+    """
+
+    def __init__(
+        self, reply: Union[str, Callable[[str], str]] = "Stub answer.", latency: float = 0.0
+    ):
+        self.reply = reply
+        self.latency = latency
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _reply_text(self, messages: List[Dict]) -> str:
+        self.calls += 1
+        prompt = messages[-1]["content"]
+        return self.reply(prompt) if callable(self.reply) else self.reply
+
+    def _respond(self, messages: List[Dict]) -> SimpleNamespace:
+        text = self._reply_text(messages)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+    @staticmethod
+    def _tokens(text: str) -> List[SimpleNamespace]:
+        """Streamed chunks, one per word (keeping the separating spaces)"""
+        words = text.split(" ")
+        pieces = [word + " " for word in words[:-1]] + [words[-1]]
+        return [
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+            for piece in pieces
+            if piece
+        ]
+
+    def _create(self, messages: List[Dict], stream: bool = False, **kwargs):
+        if stream:
+            return self._stream(self._tokens(self._reply_text(messages)))
+        if self.latency:
+            time.sleep(self.latency)
+        return self._respond(messages)
+
+    def _stream(self, chunks: List[SimpleNamespace]) -> Iterator[SimpleNamespace]:
+        for chunk in chunks:
+            if self.latency:
+                time.sleep(self.latency)
+            yield chunk
+
+
+class AsyncStubChatClient(StubChatClient):
+    """Async counterpart of StubChatClient"""
+
+    async def _create(self, messages: List[Dict], stream: bool = False, **kwargs):
+        if stream:
+            return self._astream(self._tokens(self._reply_text(messages)))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._respond(messages)
+
+    async def _astream(self, chunks: List[SimpleNamespace]) -> AsyncIterator[SimpleNamespace]:
+        for chunk in chunks:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            yield chunk
@@ -0,0 +1,144 @@
+"""
+Provider Router Module
+Latency-aware provider selection and hedging delays from rolling per-provider stats
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Pseudo-provider name that lets the router pick
+AUTO = "auto"
+
+
+class ProviderStats:
+    """Rolling window of one provider's latencies and call outcomes"""
+
+    def __init__(self, window: int = 50):
+        self.latencies: deque = deque(maxlen=window)
+        self.outcomes: deque = deque(maxlen=window)
+        self.last_failure = 0.0
+
+    def record(self, latency: float, ok: bool):
+        self.outcomes.append(ok)
+        if ok:
+            self.latencies.append(latency)
+        else:
+            self.last_failure = time.time()
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        return float(np.quantile(self.latencies, q))
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return 1.0 - sum(self.outcomes) / len(self.outcomes)
+
+
+class ProviderRouter:
+    """Rank providers by rolling latency and health, and time hedged requests
+
+    Providers without samples are tried first so every provider gets measured. A provider
+    whose recent error rate exceeds `max_error_rate` sinks to the end of the ranking until
+    `cooldown` seconds pass without a failure. The hedge delay is the primary's latency
+    quantile (p95 by default), so a backup request only fires for its slowest calls.
+    """
+
+    def __init__(
+        self,
+        window: int = 50,
+        hedge: bool = True,
+        hedge_quantile: float = 0.95,
+        default_hedge_delay: float = 2.0,
+        min_hedge_delay: float = 0.05,
+        min_samples: int = 5,
+        max_error_rate: float = 0.5,
+        cooldown: float = 30.0,
+    ):
+        if not 0.0 < hedge_quantile <= 1.0:
+            raise ValueError("hedge_quantile must be in (0, 1]")
+
+        self.window = window
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.default_hedge_delay = default_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._stats: Dict[str, ProviderStats] = {}
+
+    def _get(self, provider: str) -> ProviderStats:
+        if provider not in self._stats:
+            self._stats[provider] = ProviderStats(self.window)
+        return self._stats[provider]
+
+    def record(self, provider: str, latency: float, ok: bool = True):
+        """Record one completed (or failed) call"""
+        with self._lock:
+            self._get(provider).record(latency, ok)
+
+    def _is_healthy(self, stats: ProviderStats) -> bool:
+        if len(stats.outcomes) < self.min_samples or stats.error_rate <= self.max_error_rate:
+            return True
+        return time.time() - stats.last_failure > self.cooldown
+
+    def rank(self, providers: List[str]) -> List[str]:
+        """Healthy providers fastest first (by median latency), then unhealthy ones"""
+        with self._lock:
+
+            def key(item):
+                position, name = item
+                stats = self._get(name)
+                median = stats.quantile(0.5)
+                return (not self._is_healthy(stats), median or 0.0, position)
+
+            return [name for _, name in sorted(enumerate(providers), key=key)]
+
+    def hedge_delay(self, provider: str) -> float:
+        """How long to wait on a provider before firing a backup request"""
+        with self._lock:
+            stats = self._get(provider)
+            delay = stats.quantile(self.hedge_quantile)
+            if len(stats.latencies) < self.min_samples or delay is None:
+                delay = self.default_hedge_delay
+        return max(self.min_hedge_delay, delay)
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                name: {
+                    "samples": len(stats.outcomes),
+                    "p50": stats.quantile(0.5),
+                    "p95": stats.quantile(0.95),
+                    "error_rate": stats.error_rate,
+                    "healthy": self._is_healthy(stats),
+                }
+                for name, stats in self._stats.items()
+            }
+
+
+_router: Optional[ProviderRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> ProviderRouter:
+    """The process-wide router, configured on first use"""
+    global _router
+    with _router_lock:
+        if _router is None:
+            from config import config
+
+            _router = ProviderRouter(
+                hedge=config.llm_hedging,
+                hedge_quantile=config.llm_hedge_quantile,
+                default_hedge_delay=config.llm_hedge_delay,
+            )
+        return _router
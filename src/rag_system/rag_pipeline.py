@@ -3,20 +3,58 @@ RAG Pipeline Implementation
 Complete RAG system combining retrieval and generation
 """
 
+import asyncio
+import contextvars
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
 import sys
 
+import numpy as np
+
 # Add src to path for imports
 src_path = Path(__file__).parent.parent
 sys.path.insert(0, str(src_path))
 
 from .document_processor import DocumentProcessor
-from .llm_providers import LLMProvider
+from .caching import SemanticAnswerCache
+from .index_factory import index_type_of
+from .index_manifest import FileManifest
+from .ingestion import IngestionPipeline
+from .llm_providers import ALL_PROVIDERS_FAILED, LLMProvider
+from .rate_limiter import PRIORITY_BATCH, PRIORITY_INTERACTIVE
+from .reranker import CrossEncoderReranker
+from .retrieval_batcher import RetrievalBatcher
+from . import tracing
+from .tracing import span, traced
 from .vector_store import DocumentChunk, VectorStore
+from config import config
 from sglang_helpers.structured_prompts import StructuredPrompts
 from sglang_helpers.parallel_processing import ParallelProcessor
 
+PERSPECTIVES = ["technical", "business", "user"]
+
+
+def _copy_future(source: Future, target: Future):
+    """Resolve `target` with the outcome of the finished `source`"""
+    if source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
+
+
+def _run_coroutine(coro: Awaitable):
+    """Run a coroutine to completion from sync code, even if a loop is already running"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # Carry the caller's context so spans still reach its trace
+        return executor.submit(contextvars.copy_context().run, asyncio.run, coro).result()
+
 
 class RAGSystem:
     """Complete RAG system combining retrieval and generation with SGLang structured prompts"""
@@ -25,41 +63,294 @@ class RAGSystem:
         self,
         docs_dir: str = "data/documents",
         vector_store_path: str = "data/vector_index/knowledge_base",
+        index_type: Optional[str] = None,
+        llm: Optional[LLMProvider] = None,
+        mmap: Optional[bool] = None,
+        embedder=None,
     ):
         self.docs_dir = docs_dir
         self.vector_store_path = vector_store_path
-        self.vector_store = VectorStore()
-        self.llm = LLMProvider()
-        self.processor = DocumentProcessor()
+        # Version of the saved index this instance serves; set when it is loaded or saved
+        self.index_version: Optional[int] = None
+        if config.tracing_enabled:
+            tracing.enable()
+        self.vector_store = VectorStore(
+            index_type=index_type or config.vector_index_type,
+            nprobe=config.ivf_nprobe,
+            ef_search=config.hnsw_ef_search,
+            query_cache_size=config.query_cache_size,
+            query_cache_ttl=config.query_cache_ttl,
+            query_cache_path=config.query_cache_path or None,
+            mmap=config.vector_mmap if mmap is None else mmap,
+            rerank_factor=config.vector_rerank_factor,
+            # A preloaded encoder, e.g. an offline stand-in for benchmarks
+            model=embedder,
+        )
+        self.llm = llm or LLMProvider()
+        self.processor = DocumentProcessor(
+            chunk_size=config.chunk_size,
+            chunk_overlap=config.chunk_overlap,
+            workers=config.ingest_workers,
+        )
+        self.answer_cache = SemanticAnswerCache(
+            threshold=config.answer_cache_threshold,
+            max_size=config.answer_cache_size,
+            ttl_seconds=config.answer_cache_ttl,
+        )
         
         # Initialize SGLang components
         self.structured_prompts = StructuredPrompts()
-        self.parallel_processor = ParallelProcessor(max_concurrent=5)
+        self.parallel_processor = ParallelProcessor(max_concurrent=config.max_concurrent_calls)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        # Optional cross-encoder pass over a wider candidate set, within a latency budget
+        self.reranker: Optional[CrossEncoderReranker] = None
+        if config.rerank_enabled:
+            self.reranker = CrossEncoderReranker(
+                config.rerank_model,
+                candidates=config.rerank_candidates,
+                batch_size=config.rerank_batch_size,
+                latency_budget=config.rerank_budget_ms / 1000,
+                cache_size=config.rerank_cache_size,
+            )
 
-    def build_index(self, force_rebuild: bool = False):
-        """Build or load the vector index"""
+        # Concurrent queries share one embedding pass and one index search
+        self.retrieval_batcher: Optional[RetrievalBatcher] = None
+        if config.retrieval_batching:
+            self.retrieval_batcher = RetrievalBatcher(
+                self._retrieve,
+                max_batch_size=config.retrieval_batch_size,
+                max_wait=config.retrieval_batch_wait_ms / 1000,
+            )
+
+    def build_index(self, force_rebuild: bool = False, incremental: bool = False):
+        """Build or load the vector index, optionally applying only changed documents"""
         vector_file_path = Path(f"{self.vector_store_path}.faiss")
+        # Cached answers belong to the index being replaced
+        self.answer_cache.clear()
 
         if vector_file_path.exists() and not force_rebuild:
             print("[*] Loading existing vector index...")
+            # Read before loading, so a save racing the load is seen as a newer index
+            version = self.saved_index_version()
             self.vector_store.load(self.vector_store_path)
+            self.index_version = version
+            if incremental:
+                self.update_index()
         else:
             print("[*] Building new vector index...")
+            # A forced rebuild must not append to an index that is already loaded
+            self.vector_store.reset()
 
-            # Load and process documents
-            chunks = self.processor.load_documents(self.docs_dir)
+            # Stream documents into the index, keeping track of each file's vector IDs
+            manifest = FileManifest(self.manifest_path)
+            txt_files = sorted(Path(self.docs_dir).glob("*.txt"))
+            if not txt_files:
+                print(f"[!] No .txt documents found in {self.docs_dir}. Please add documents and try again.")
 
-            # Build vector store
-            self.vector_store.add_documents(chunks)
+            self._index_files(txt_files, manifest)
 
             # Save for future use
             self.vector_store.save(self.vector_store_path)
+            manifest.save()
+            self.index_version = self.saved_index_version()
+
+    def warm_up(self):
+        """Load the models that are otherwise loaded by the first query"""
+        self.vector_store.warm_up()
+        if self.reranker is not None:
+            self.reranker.warm_up()
+
+    def _index_files(self, file_paths: List[Path], manifest: FileManifest) -> int:
+        """Stream files through chunking, embedding and indexing, recording each file's IDs"""
+        pipeline = IngestionPipeline(
+            self.vector_store,
+            self.processor,
+            batch_size=config.ingest_batch_size,
+            queue_size=config.ingest_queue_size,
+        )
+        # Fingerprinted before ingestion reads them, so a file edited meanwhile is not
+        # recorded as up to date with the old contents indexed
+        fingerprints = {Path(path).name: FileManifest.fingerprint(path) for path in file_paths}
+        added = 0
+        for file_path, ids in pipeline.run(file_paths):
+            manifest.record(file_path, ids, fingerprints[Path(file_path).name])
+            added += len(ids)
+        return added
+
+    @property
+    def manifest_path(self) -> str:
+        return f"{self.vector_store_path}.files.json"
+
+    def saved_index_version(self) -> Optional[int]:
+        """Modification time (ns) of the saved index file, which every save replaces"""
+        try:
+            return os.stat(f"{self.vector_store_path}.faiss").st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def update_index(self) -> Dict:
+        """Re-embed only new and changed documents and drop vectors of deleted ones"""
+        manifest = FileManifest(self.manifest_path)
+        if not manifest.exists():
+            print("[!] No index manifest found; rebuilding the full index")
+            self.build_index(force_rebuild=True)
+            return {"rebuilt": True}
+
+        manifest.load()
+        diff = manifest.scan(self.docs_dir)
+        summary = {
+            "new": len(diff.new),
+            "changed": len(diff.changed),
+            "deleted": len(diff.deleted),
+            "unchanged": len(diff.unchanged),
+            "removed_vectors": 0,
+            "added_vectors": 0,
+        }
+
+        if not diff.has_changes:
+            manifest.save()
+            print(f"[+] Index is up to date ({len(diff.unchanged)} files unchanged)")
+            return summary
+
+        # Answers were generated from the old documents
+        self.answer_cache.clear()
+
+        # Stale vectors stay as tombstoned chunk rows until the next full rebuild
+        stale_ids = [i for name in diff.changed + diff.deleted for i in manifest.forget(name)]
+        summary["removed_vectors"] = self.vector_store.remove_ids(stale_ids)
+
+        file_paths = [Path(self.docs_dir) / name for name in diff.new + diff.changed]
+        summary["added_vectors"] = self._index_files(file_paths, manifest)
+
+        self.vector_store.save(self.vector_store_path)
+        manifest.save()
+        self.index_version = self.saved_index_version()
+        print(
+            f"[+] Index updated: {summary['new']} new, {summary['changed']} changed, "
+            f"{summary['deleted']} deleted, {summary['unchanged']} unchanged files "
+            f"(+{summary['added_vectors']}/-{summary['removed_vectors']} vectors)"
+        )
+        return summary
 
     def search(self, query: str, top_k: int = 3) -> List[Tuple[DocumentChunk, float]]:
-        """Search for relevant documents"""
-        return self.vector_store.search(query, top_k)
+        """Search for relevant documents (micro-batched with concurrent searches if enabled)"""
+        with span("retrieve"):
+            if self.retrieval_batcher is not None:
+                return self.retrieval_batcher.search(query, top_k)
+            return self._retrieve([query], top_k)[0]
+
+    def _submit_search(self, query: str, top_k: int = 3) -> Future:
+        """Search without blocking; the Future resolves to the retrieved documents"""
+        if self.retrieval_batcher is not None:
+            return self.retrieval_batcher.submit(query, top_k)
+        context = contextvars.copy_context()
+        return self._llm_executor().submit(context.run, self.search, query, top_k)
+
+    async def asearch(self, query: str, top_k: int = 3) -> List[Tuple[DocumentChunk, float]]:
+        """Async search that awaits the (batched) retrieval instead of blocking the loop"""
+        with span("retrieve"):
+            if self.retrieval_batcher is not None:
+                return await self.retrieval_batcher.asearch(query, top_k)
+            # Run in this request's context so the retrieval spans land in its trace
+            context = contextvars.copy_context()
+            retrieval = self._llm_executor().submit(context.run, self._retrieve, [query], top_k)
+            return (await asyncio.wrap_future(retrieval))[0]
+
+    def submit_answer(self, query: str, provider: str = "groq") -> Future:
+        """Answer a question in the background: batched retrieval, then its own LLM call"""
+        answer: Future = Future()
+        if not query or not query.strip():
+            answer.set_result(self.generate_answer(query, provider))
+            return answer
+
+        def on_generated(generation: Future):
+            result = None if generation.exception() is not None else generation.result()
+            if isinstance(result, dict) and "timings" in result:
+                # Batched retrieval ran on the batcher thread, before this answer's trace
+                result["timings"]["spans"][:0] = getattr(retrieval, "spans", [])
+            _copy_future(generation, answer)
+
+        def on_retrieved(search: Future):
+            try:
+                relevant_docs = search.result()
+            except Exception as e:
+                print(f"[!] Error during document search: {e}")
+                answer.set_result(
+                    {
+                        "answer": "Sorry, there was an error searching the documents.",
+                        "sources": [],
+                        "query": query,
+                        "error": f"Search error: {str(e)}",
+                    }
+                )
+                return
+            generation = self._llm_executor().submit(
+                self.generate_answer_from_docs, query, relevant_docs, provider
+            )
+            generation.add_done_callback(on_generated)
+
+        retrieval = self._submit_search(query)
+        retrieval.add_done_callback(on_retrieved)
+        return answer
+
+    def search_batch(
+        self, queries: List[str], top_k: int = 3
+    ) -> List[List[Tuple[DocumentChunk, float]]]:
+        """Search for relevant documents for several queries at once"""
+        return self._retrieve(queries, top_k)
+
+    def _retrieve(
+        self, queries: List[str], top_k: int
+    ) -> List[List[Tuple[DocumentChunk, float]]]:
+        """Retrieve candidates as configured, reranking them down to top_k if enabled"""
+        if self.reranker is None:
+            return self._retrieve_candidates(queries, top_k)
+        candidates = self._retrieve_candidates(
+            queries, self.reranker.candidate_count(len(queries), top_k)
+        )
+        with span("rerank"):
+            return self.reranker.rerank_batch(queries, candidates, top_k)
+
+    def _retrieve_candidates(
+        self, queries: List[str], top_k: int
+    ) -> List[List[Tuple[DocumentChunk, float]]]:
+        """Hybrid (dense + BM25) or dense-only retrieval, as configured"""
+        if config.hybrid_search:
+            return self.vector_store.hybrid_search_batch(
+                queries, top_k, fusion=config.hybrid_fusion, alpha=config.hybrid_alpha
+            )
+        return self.vector_store.search_batch(queries, top_k)
 
-    def generate_answer(self, query: str, provider: str = "groq") -> Dict:
+    def _build_context(
+        self, relevant_docs: List[Tuple[DocumentChunk, float]]
+    ) -> Tuple[str, List[Dict]]:
+        """Format retrieved chunks into a prompt context and a list of source descriptions"""
+        with span("context"):
+            context_parts = []
+            sources = []
+
+            for i, (chunk, score) in enumerate(relevant_docs, 1):
+                context_parts.append(f"Source {i} ({chunk.source_file}):\n{chunk.text}")
+                preview = chunk.text[:100] + "..." if len(chunk.text) > 100 else chunk.text
+                sources.append(
+                    {
+                        "file": chunk.source_file,
+                        "chunk_id": chunk.id,
+                        "score": score,
+                        "preview": preview,
+                    }
+                )
+
+            return "\n\n".join(context_parts), sources
+
+    def _rag_prompt(self, query: str, context: str) -> str:
+        """Render the structured RAG prompt"""
+        with span("prompt"):
+            return self.structured_prompts.structured_rag_prompt(query, context)
+
+    @traced
+    def generate_answer(self, query: str, provider: str = "groq", top_k: int = 3) -> Dict:
         """Generate answer using RAG pipeline"""
         try:
             # Validate input
@@ -76,7 +367,7 @@ class RAGSystem:
             # Step 1: Retrieve relevant documents
             print("[*] Retrieving relevant documents...")
             try:
-                relevant_docs = self.search(query, top_k=3)
+                relevant_docs = self.search(query, top_k=top_k)
             except Exception as e:
                 print(f"[!] Error during document search: {e}")
                 return {
@@ -86,71 +377,426 @@ class RAGSystem:
                     "error": f"Search error: {str(e)}"
                 }
 
-            if not relevant_docs:
-                return {
-                    "answer": "I don't have enough information to answer that question.",
+            return self.generate_answer_from_docs(query, relevant_docs, provider)
+
+        except Exception as e:
+            print(f"[!] Unexpected error in generate_answer: {e}")
+            return {
+                "answer": "An unexpected error occurred. Please try again.",
+                "sources": [],
+                "query": query,
+                "error": f"Unexpected error: {str(e)}"
+            }
+
+    @traced
+    def generate_answer_from_docs(
+        self,
+        query: str,
+        relevant_docs: List[Tuple[DocumentChunk, float]],
+        provider: str = "groq",
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> Dict:
+        """Generate an answer from already-retrieved documents"""
+        if not relevant_docs:
+            return {
+                "answer": "I don't have enough information to answer that question.",
+                "sources": [],
+                "query": query,
+            }
+
+        # Step 2: Prepare context
+        context, sources = self._build_context(relevant_docs)
+        for source in sources:
+            print(f"   [*] {source['file']} (score: {source['score']:.3f})")
+
+        # Reuse an answer to a near-identical question over the same context
+        cached, query_embedding = self._lookup_cached_answer(
+            query, relevant_docs, provider, sources
+        )
+        if cached is not None:
+            return cached
+
+        # Step 3: Generate response using SGLang structured prompts
+        print(f"[*] Generating response using {provider}...")
+
+        try:
+            # Use SGLang structured prompt for better consistency
+            prompt = self._rag_prompt(query, context)
+            answer = self.llm.generate_response(prompt, provider, priority=priority)
+        except Exception as e:
+            return self._llm_error(query, sources, e)
+
+        return self._finish_answer(query, relevant_docs, provider, sources, answer, query_embedding)
+
+    def stream_answer(
+        self, query: str, provider: str = "groq", top_k: int = 3
+    ) -> Iterator[Dict]:
+        """Answer a question as a stream of events
+
+        Yields {"type": "sources"} as soon as retrieval finishes, then {"type": "token"}
+        events as the LLM produces text, and finally {"type": "done"} with the full answer and
+        time to first token (or {"type": "error"} if the question cannot be answered).
+        """
+        start_time = time.perf_counter()
+        if not query or not query.strip():
+            yield {"type": "error", "error": "Empty or invalid query"}
+            return
+
+        try:
+            relevant_docs = self.search(query, top_k=top_k)
+        except Exception as e:
+            print(f"[!] Error during document search: {e}")
+            yield {"type": "error", "error": f"Search error: {str(e)}"}
+            return
+
+        context, sources = self._build_context(relevant_docs)
+        yield {"type": "sources", "sources": sources}
+
+        if not relevant_docs:
+            answer = "I don't have enough information to answer that question."
+            yield {"type": "token", "text": answer}
+            yield {"type": "done", "answer": answer, "time_to_first_token": None}
+            return
+
+        cached, query_embedding = self._lookup_cached_answer(
+            query, relevant_docs, provider, sources
+        )
+        if cached is not None:
+            yield {"type": "token", "text": cached["answer"]}
+            yield {
+                "type": "done",
+                "answer": cached["answer"],
+                "cached": True,
+                "time_to_first_token": time.perf_counter() - start_time,
+            }
+            return
+
+        prompt = self._rag_prompt(query, context)
+        parts: List[str] = []
+        first_token_at = None
+        try:
+            for text in self.llm.stream_response(prompt, provider):
+                if first_token_at is None:
+                    first_token_at = time.perf_counter() - start_time
+                parts.append(text)
+                yield {"type": "token", "text": text}
+        except Exception as e:
+            print(f"[!] Error generating response: {e}")
+            yield {"type": "error", "error": f"LLM error: {str(e)}"}
+            return
+
+        answer = "".join(parts)
+        self._finish_answer(query, relevant_docs, provider, sources, answer, query_embedding)
+        yield {"type": "done", "answer": answer, "time_to_first_token": first_token_at}
+
+    async def astream_answer(
+        self, query: str, provider: str = "groq", top_k: int = 3
+    ) -> AsyncIterator[Dict]:
+        """Async stream_answer on the async provider clients (same events)"""
+        start_time = time.perf_counter()
+        if not query or not query.strip():
+            yield {"type": "error", "error": "Empty or invalid query"}
+            return
+
+        try:
+            relevant_docs = await self.asearch(query, top_k=top_k)
+        except Exception as e:
+            print(f"[!] Error during document search: {e}")
+            yield {"type": "error", "error": f"Search error: {str(e)}"}
+            return
+
+        context, sources = self._build_context(relevant_docs)
+        yield {"type": "sources", "sources": sources}
+
+        if not relevant_docs:
+            answer = "I don't have enough information to answer that question."
+            yield {"type": "token", "text": answer}
+            yield {"type": "done", "answer": answer, "time_to_first_token": None}
+            return
+
+        cached, query_embedding = self._lookup_cached_answer(
+            query, relevant_docs, provider, sources
+        )
+        if cached is not None:
+            yield {"type": "token", "text": cached["answer"]}
+            yield {
+                "type": "done",
+                "answer": cached["answer"],
+                "cached": True,
+                "time_to_first_token": time.perf_counter() - start_time,
+            }
+            return
+
+        prompt = self._rag_prompt(query, context)
+        parts: List[str] = []
+        first_token_at = None
+        try:
+            async for text in self.llm.astream_response(prompt, provider):
+                if first_token_at is None:
+                    first_token_at = time.perf_counter() - start_time
+                parts.append(text)
+                yield {"type": "token", "text": text}
+        except Exception as e:
+            print(f"[!] Error generating response: {e}")
+            yield {"type": "error", "error": f"LLM error: {str(e)}"}
+            return
+
+        answer = "".join(parts)
+        self._finish_answer(query, relevant_docs, provider, sources, answer, query_embedding)
+        yield {"type": "done", "answer": answer, "time_to_first_token": first_token_at}
+
+    @traced
+    async def agenerate_answer_from_docs(
+        self, query: str, relevant_docs: List[Tuple[DocumentChunk, float]], provider: str = "groq"
+    ) -> Dict:
+        """Async generate_answer_from_docs: the LLM call runs on the event loop"""
+        if not relevant_docs:
+            return {
+                "answer": "I don't have enough information to answer that question.",
+                "sources": [],
+                "query": query,
+            }
+
+        context, sources = self._build_context(relevant_docs)
+        cached, query_embedding = self._lookup_cached_answer(
+            query, relevant_docs, provider, sources
+        )
+        if cached is not None:
+            return cached
+
+        try:
+            prompt = self._rag_prompt(query, context)
+            answer = await self.parallel_processor.run(
+                self.llm.agenerate_response(prompt, provider)
+            )
+        except Exception as e:
+            return self._llm_error(query, sources, e)
+
+        return self._finish_answer(query, relevant_docs, provider, sources, answer, query_embedding)
+
+    @staticmethod
+    def _answer_context(relevant_docs: List[Tuple[DocumentChunk, float]]) -> List[str]:
+        """Answer-cache key of a retrieved context: the full text of each chunk, hashed"""
+        return [SemanticAnswerCache.fingerprint(chunk.text) for chunk, _ in relevant_docs]
+
+    def _lookup_cached_answer(
+        self,
+        query: str,
+        relevant_docs: List[Tuple[DocumentChunk, float]],
+        provider: str,
+        sources: List[Dict],
+    ) -> Tuple[Optional[Dict], Optional[np.ndarray]]:
+        """Semantic answer-cache hit (if any) and the query embedding used to look it up"""
+        if not self.answer_cache.enabled:
+            return None, None
+
+        with span("answer_cache") as cache_span:
+            # The embedding retrieval just computed, not a second embedding pass
+            query_embedding = self.vector_store.query_embedding(query)
+            cached = self.answer_cache.lookup(
+                query_embedding, provider, self._answer_context(relevant_docs)
+            )
+            cache_span.set(cache="miss" if cached is None else "hit")
+        if cached is None:
+            return None, query_embedding
+
+        answer, similarity = cached
+        print(f"[+] Answer served from semantic cache (similarity: {similarity:.3f})")
+        return {
+            "answer": answer,
+            "sources": sources,
+            "query": query,
+            "context_used": len(relevant_docs),
+            "cached": True,
+        }, query_embedding
+
+    def _finish_answer(
+        self,
+        query: str,
+        relevant_docs: List[Tuple[DocumentChunk, float]],
+        provider: str,
+        sources: List[Dict],
+        answer: str,
+        query_embedding: Optional[np.ndarray],
+    ) -> Dict:
+        """Cache a successful answer and build the result"""
+        if query_embedding is not None and answer != ALL_PROVIDERS_FAILED:
+            self.answer_cache.store(
+                query_embedding, provider, self._answer_context(relevant_docs), answer
+            )
+
+        return {
+            "answer": answer,
+            "sources": sources,
+            "query": query,
+            "context_used": len(relevant_docs),
+        }
+
+    @staticmethod
+    def _llm_error(query: str, sources: List[Dict], error: Exception) -> Dict:
+        print(f"[!] Error generating response: {error}")
+        return {
+            "answer": "Sorry, there was an error generating the response. Please try again.",
+            "sources": sources,
+            "query": query,
+            "error": f"LLM error: {str(error)}"
+        }
+
+    def generate_answers_batch(
+        self, queries: List[str], provider: str = "groq", max_workers: Optional[int] = None
+    ) -> List[Dict]:
+        """Answer many questions: one batched retrieval, then concurrent LLM calls"""
+        results: List[Optional[Dict]] = [None] * len(queries)
+        for i, query in enumerate(queries):
+            if not query or not query.strip():
+                results[i] = {
+                    "answer": "Please provide a valid question.",
                     "sources": [],
                     "query": query,
+                    "error": "Empty or invalid query"
                 }
 
-            # Step 2: Prepare context
-            context_parts = []
-            sources = []
+        valid = [i for i, result in enumerate(results) if result is None]
+        if not valid:
+            return results
 
-            for i, (chunk, score) in enumerate(relevant_docs, 1):
-                context_parts.append(f"Source {i} ({chunk.source_file}):\n{chunk.text}")
-                sources.append(
-                    {
-                        "file": chunk.source_file,
-                        "chunk_id": chunk.id,
-                        "score": score,
-                        "preview": chunk.text[:100] + "..." if len(chunk.text) > 100 else chunk.text,
-                    }
-                )
-                print(f"   [*] {chunk.source_file} (score: {score:.3f})")
+        print(f"[*] Retrieving documents for {len(valid)} queries...")
+        try:
+            batch_docs = self.search_batch([queries[i] for i in valid], top_k=3)
+        except Exception as e:
+            print(f"[!] Error during batch document search: {e}")
+            for i in valid:
+                results[i] = {
+                    "answer": "Sorry, there was an error searching the documents.",
+                    "sources": [],
+                    "query": queries[i],
+                    "error": f"Search error: {str(e)}"
+                }
+            return results
+
+        # Fan the retrieved contexts out to the LLM with bounded concurrency; batch calls
+        # queue behind interactive ones for the provider's rate budget
+        with ThreadPoolExecutor(max_workers=max_workers or config.max_concurrent_calls) as executor:
+            futures = {
+                executor.submit(
+                    self.generate_answer_from_docs, queries[i], docs, provider, PRIORITY_BATCH
+                ): i
+                for i, docs in zip(valid, batch_docs)
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
 
-            context = "\n\n".join(context_parts)
+        return results
 
-            # Step 3: Generate response using SGLang structured prompts
-            print(f"[*] Generating response using {provider}...")
+    def cache_stats(self) -> Dict:
+        """Hit/miss metrics for the query-embedding, answer and rerank caches"""
+        stats = {
+            "query_embeddings": self.vector_store.query_cache.stats(),
+            "answers": self.answer_cache.stats(),
+        }
+        if self.reranker is not None:
+            stats["reranker"] = self.reranker.stats()
+        return stats
+
+    def _show_stats(self):
+        """Print index, provider and cache statistics"""
+        store = self.vector_store
+        index = store.index
+        print(f"   Documents directory: {self.docs_dir}")
+        print(f"   Chunks: {len(store.chunks)} ({len(store.deleted_ids)} deleted)")
+        if index is not None:
+            print(f"   Vectors: {index.ntotal} ({index_type_of(index)} index)")
+        else:
+            print("   Vectors: 0 (index not built)")
+        providers = self.llm.list_available_providers()
+        print(f"   Available providers: {', '.join(providers) or 'none'}")
+        for name, stats in self.cache_stats().items():
+            cache = stats.get("cache", stats)
+            if "hit_rate" in cache:
+                print(f"   {name} cache hit rate: {cache['hit_rate']:.1%}")
+
+    @traced
+    def generate_multi_perspective_answer(
+        self, query: str, provider: str = "groq", top_k: int = 3
+    ) -> Dict:
+        """Generate answer from multiple perspectives using SGLang structured prompts"""
+        print(f"[?] Multi-perspective Query: {query}")
 
-            try:
-                # Use SGLang structured prompt for better consistency
-                prompt = self.structured_prompts.structured_rag_prompt(query, context)
-                answer = self.llm.generate_response(prompt, provider)
-            except Exception as e:
-                print(f"[!] Error generating response: {e}")
-                return {
-                    "answer": "Sorry, there was an error generating the response. Please try again.",
-                    "sources": sources,
-                    "query": query,
-                    "error": f"LLM error: {str(e)}"
-                }
+        # Step 1: Retrieve relevant documents
+        print("[*] Retrieving relevant documents...")
+        relevant_docs = self.search(query, top_k=top_k)
 
+        # Steps 2-4: the sync provider clients run on a thread pool so perspectives overlap
+        loop_executor = self._llm_executor()
+
+        async def generate(prompt: str, max_tokens: int) -> str:
+            loop = asyncio.get_running_loop()
+            # A context per call: concurrent perspectives cannot share one
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(
+                loop_executor, context.run, self.llm.generate_response, prompt, provider, max_tokens
+            )
+
+        return _run_coroutine(self._multi_perspective_from_docs(query, relevant_docs, generate))
+
+    @traced
+    async def generate_answer_async(
+        self, query: str, provider: str = "groq", top_k: int = 3
+    ) -> Dict:
+        """Async version using SGLang parallel processing
+
+        Retrieval runs in the default executor and the LLM call on the async provider
+        clients, so one event loop can keep many requests in flight.
+        """
+        if not query or not query.strip():
             return {
-                "answer": answer,
-                "sources": sources,
+                "answer": "Please provide a valid question.",
+                "sources": [],
                 "query": query,
-                "context_used": len(relevant_docs),
+                "error": "Empty or invalid query"
             }
 
+        print(f"[?] Async Query: {query}")
+
+        # Step 1: Retrieve relevant documents without blocking the event loop
+        try:
+            relevant_docs = await self.asearch(query, top_k)
         except Exception as e:
-            print(f"[!] Unexpected error in generate_answer: {e}")
+            print(f"[!] Error during document search: {e}")
             return {
-                "answer": "An unexpected error occurred. Please try again.",
+                "answer": "Sorry, there was an error searching the documents.",
                 "sources": [],
                 "query": query,
-                "error": f"Unexpected error: {str(e)}"
+                "error": f"Search error: {str(e)}"
             }
 
-    def generate_multi_perspective_answer(self, query: str, provider: str = "groq") -> Dict:
-        """Generate answer from multiple perspectives using SGLang structured prompts"""
+        result = await self.agenerate_answer_from_docs(query, relevant_docs, provider)
+        result["processing"] = "async"
+        return result
+
+    @traced
+    async def agenerate_multi_perspective_answer(
+        self, query: str, provider: str = "groq", top_k: int = 3
+    ) -> Dict:
+        """Async multi-perspective analysis on the async provider clients"""
         print(f"[?] Multi-perspective Query: {query}")
 
-        # Step 1: Retrieve relevant documents
-        print("[*] Retrieving relevant documents...")
-        relevant_docs = self.search(query, top_k=3)
+        relevant_docs = await self.asearch(query, top_k)
+
+        async def generate(prompt: str, max_tokens: int) -> str:
+            return await self.parallel_processor.run(
+                self.llm.agenerate_response(prompt, provider, max_tokens=max_tokens)
+            )
 
+        return await self._multi_perspective_from_docs(query, relevant_docs, generate)
+
+    async def _multi_perspective_from_docs(
+        self,
+        query: str,
+        relevant_docs: List[Tuple[DocumentChunk, float]],
+        generate: Callable[[str, int], Awaitable[str]],
+    ) -> Dict:
+        """Dispatch the perspective prompts concurrently, then synthesize what came back"""
         if not relevant_docs:
             return {
                 "answer": "I don't have enough information to answer that question.",
@@ -161,37 +807,41 @@ class RAGSystem:
             }
 
         # Step 2: Prepare context
-        context_parts = []
-        sources = []
-
-        for i, (chunk, score) in enumerate(relevant_docs, 1):
-            context_parts.append(f"Source {i} ({chunk.source_file}):\n{chunk.text}")
-            sources.append(
-                {
-                    "file": chunk.source_file,
-                    "chunk_id": chunk.id,
-                    "score": score,
-                    "preview": chunk.text[:100] + "..." if len(chunk.text) > 100 else chunk.text,
-                }
-            )
-
-        context = "\n\n".join(context_parts)
+        context, sources = self._build_context(relevant_docs)
 
         # Step 3: Generate perspectives using SGLang
         print("[*] Generating multi-perspective analysis...")
-        perspectives = ["technical", "business", "user"]
-        perspective_results = {}
-
-        for perspective in perspectives:
-            print(f"   [*] Analyzing from {perspective} perspective...")
-            prompt = self.structured_prompts.multi_perspective_prompt(query, context, perspective)
-            response = self.llm.generate_response(prompt, provider, max_tokens=300)
-            perspective_results[perspective] = response
+        with span("prompt"):
+            prompts = {
+                perspective: self.structured_prompts.multi_perspective_prompt(
+                    query, context, perspective
+                )
+                for perspective in PERSPECTIVES
+            }
+        perspective_results = await self._gather_perspectives(
+            prompts,
+            generate,
+            timeout=config.perspective_timeout,
+            quorum=config.perspective_quorum,
+            grace=config.perspective_grace,
+        )
+        missing = [name for name in PERSPECTIVES if name not in perspective_results]
+
+        if not perspective_results:
+            return {
+                "answer": "Sorry, none of the perspectives could be generated. Please try again.",
+                "perspectives": {},
+                "synthesis": "",
+                "sources": sources,
+                "query": query,
+                "missing_perspectives": missing,
+                "error": "All perspective calls failed or timed out",
+            }
 
         # Step 4: Synthesize perspectives
         print("[*] Synthesizing perspectives...")
         synthesis_prompt = self.structured_prompts.synthesis_prompt(query, perspective_results)
-        synthesis = self.llm.generate_response(synthesis_prompt, provider, max_tokens=400)
+        synthesis = await generate(synthesis_prompt, 400)
 
         return {
             "answer": synthesis,
@@ -199,50 +849,69 @@ class RAGSystem:
             "synthesis": synthesis,
             "sources": sources,
             "query": query,
+            "missing_perspectives": missing,
         }
 
-    async def generate_answer_async(self, query: str, provider: str = "groq") -> Dict:
-        """Async version using SGLang parallel processing"""
-        print(f"[?] Async Query: {query}")
-
-        # Step 1: Retrieve relevant documents
-        relevant_docs = self.search(query, top_k=3)
-
-        if not relevant_docs:
-            return {
-                "answer": "I don't have enough information to answer that question.",
-                "sources": [],
-                "query": query,
-            }
+    @staticmethod
+    async def _gather_perspectives(
+        prompts: Dict[str, str],
+        generate: Callable[[str, int], Awaitable[str]],
+        timeout: float,
+        quorum: int,
+        grace: float,
+    ) -> Dict[str, str]:
+        """Run perspective calls concurrently with per-call timeouts
+
+        Returns as soon as every call has finished, or once a quorum has succeeded and the
+        grace period for stragglers has passed. Failed, timed-out and abandoned perspectives
+        are left out of the result.
+        """
+        quorum = min(quorum, len(prompts))
+        tasks = {
+            asyncio.ensure_future(asyncio.wait_for(generate(prompt, 300), timeout)): perspective
+            for perspective, prompt in prompts.items()
+        }
+        for perspective in prompts:
+            print(f"   [*] Analyzing from {perspective} perspective...")
 
-        # Prepare context
-        context_parts = []
-        sources = []
-        for i, (chunk, score) in enumerate(relevant_docs, 1):
-            context_parts.append(f"Source {i} ({chunk.source_file}):\n{chunk.text}")
-            sources.append(
-                {
-                    "file": chunk.source_file,
-                    "chunk_id": chunk.id,
-                    "score": score,
-                    "preview": chunk.text[:100] + "..." if len(chunk.text) > 100 else chunk.text,
-                }
+        loop = asyncio.get_running_loop()
+        results: Dict[str, str] = {}
+        pending = set(tasks)
+        deadline = None
+        while pending:
+            wait_for = None if deadline is None else max(0.0, deadline - loop.time())
+            done, pending = await asyncio.wait(
+                pending, timeout=wait_for, return_when=asyncio.FIRST_COMPLETED
             )
-
-        context = "\n\n".join(context_parts)
-
-        # Generate response asynchronously
-        prompt = self.structured_prompts.structured_rag_prompt(query, context)
-        
-        # This would need async LLM support - for now return synchronous result
-        answer = self.llm.generate_response(prompt, provider)
-
-        return {
-            "answer": answer,
-            "sources": sources,
-            "query": query,
-            "processing": "async"
-        }
+            for task in done:
+                perspective = tasks[task]
+                error = task.exception()
+                if error is not None:
+                    reason = "timed out" if isinstance(error, asyncio.TimeoutError) else error
+                    print(f"   [!] {perspective} perspective failed: {reason}")
+                elif task.result() == ALL_PROVIDERS_FAILED:
+                    print(f"   [!] {perspective} perspective failed: no provider answered")
+                else:
+                    results[perspective] = task.result()
+
+            if deadline is None and len(results) >= quorum:
+                deadline = loop.time() + grace
+            if deadline is not None and loop.time() >= deadline:
+                break
+
+        for task in pending:
+            task.cancel()
+            print(f"   [-] Synthesizing without the {tasks[task]} perspective")
+
+        return {name: results[name] for name in prompts if name in results}
+
+    def _llm_executor(self) -> ThreadPoolExecutor:
+        """Thread pool for sync LLM calls that must not block the caller past their timeout"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=config.max_concurrent_calls, thread_name_prefix="llm"
+            )
+        return self._executor
 
     def interactive_demo(self):
         """Run interactive demo with SGLang features"""
@@ -299,15 +968,21 @@ class RAGSystem:
                         print("Please provide a question after 'multi:'")
                     continue
 
-                # Generate regular answer using SGLang structured prompts
-                result = self.generate_answer(query)
-
-                # Display results
-                print("\n[+] Answer:")
-                print(f"{result['answer']}")
-
-                print(f"\n[i] Sources used ({len(result['sources'])} documents):")
-                for i, source in enumerate(result["sources"], 1):
+                # Generate regular answer using SGLang structured prompts, streamed as it arrives
+                sources = []
+                for event in self.stream_answer(query):
+                    if event["type"] == "sources":
+                        sources = event["sources"]
+                        print("\n[+] Answer:")
+                    elif event["type"] == "token":
+                        print(event["text"], end="", flush=True)
+                    elif event["type"] == "error":
+                        print(f"[!] Error: {event['error']}")
+                    elif event["type"] == "done":
+                        print()
+
+                print(f"\n[i] Sources used ({len(sources)} documents):")
+                for i, source in enumerate(sources, 1):
                     print(f"   {i}. {source['file']} (relevance: {source['score']:.3f}")
                     print(f"      Preview: {source['preview']}")
             except Exception as e:
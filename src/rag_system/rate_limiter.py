@@ -0,0 +1,209 @@
+"""
+Rate Limiter Module
+Client-side requests-per-minute and tokens-per-minute budgets for LLM providers
+"""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Lower values are served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+# Backoff after a 429 that carries no usable retry-after header
+DEFAULT_BACKOFF = 1.0
+
+# Upper bound on one sleep, so waiters notice budget returned by settle()
+MAX_POLL_INTERVAL = 0.25
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a prompt (about four characters per token)"""
+    return len(text) // 4 + 1
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds a provider asked us to back off, or None if the error is not a 429"""
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    if status != 429:
+        return None
+
+    headers = getattr(response, "headers", None) or {}
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        try:
+            return max(0.0, float(headers.get(header)) * scale)
+        except (TypeError, ValueError):
+            continue
+    return DEFAULT_BACKOFF
+
+
+def used_tokens(response: Any) -> Optional[int]:
+    """Total tokens reported by a completion response, if the provider reports usage"""
+    usage = getattr(response, "usage", None)
+    total = getattr(usage, "total_tokens", None)
+    return total if isinstance(total, int) else None
+
+
+class TokenBucket:
+    """Continuously refilling budget of `rate_per_minute` units, bursting up to `capacity`"""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available (0 if they are now)"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float):
+        self.level -= min(amount, self.capacity)
+
+    def give(self, amount: float):
+        self.level = min(self.capacity, self.level + amount)
+
+
+class RateLimiter:
+    """RPM and TPM token buckets for one provider, granted to waiters in priority order
+
+    Waiters queue by (priority, arrival); only the head of the queue may take budget, so a
+    stream of small batch requests cannot starve an interactive one. A 429 from the provider
+    blocks the whole queue for its retry-after period. Limits of 0 mean unlimited.
+    """
+
+    def __init__(self, rpm: int = 0, tpm: int = 0):
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+        self._waiters: List[Tuple[int, int, int]] = []
+        self._arrivals = itertools.count()
+        self.granted = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+
+    def _delay(self, tokens: int, now: float) -> float:
+        delay = max(0.0, self.blocked_until - now)
+        if self.requests is not None:
+            delay = max(delay, self.requests.delay(1, now))
+        if self.tokens is not None:
+            delay = max(delay, self.tokens.delay(tokens, now))
+        return delay
+
+    def _enqueue(self, tokens: int, priority: int) -> Tuple[int, int, int]:
+        ticket = (priority, next(self._arrivals), tokens)
+        with self._lock:
+            heapq.heappush(self._waiters, ticket)
+        return ticket
+
+    def _try_acquire(self, ticket: Tuple[int, int, int]) -> float:
+        """Take the budget if this ticket is at the head and it fits; else seconds to wait"""
+        with self._lock:
+            now = time.monotonic()
+            head = self._waiters[0]
+            delay = self._delay(head[2], now)
+            if head != ticket or delay > 0:
+                return min(max(delay, 0.001), MAX_POLL_INTERVAL)
+
+            heapq.heappop(self._waiters)
+            if self.requests is not None:
+                self.requests.take(1)
+            if self.tokens is not None:
+                self.tokens.take(ticket[2])
+            self.granted += 1
+            return 0.0
+
+    def _dequeue(self, ticket: Tuple[int, int, int]):
+        with self._lock:
+            if ticket in self._waiters:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+
+    def acquire(self, tokens: int = 1, priority: int = PRIORITY_INTERACTIVE) -> float:
+        """Block until one request of `tokens` tokens fits the budget; returns seconds waited"""
+        start_time = time.monotonic()
+        ticket = self._enqueue(tokens, priority)
+        try:
+            while True:
+                delay = self._try_acquire(ticket)
+                if delay == 0.0:
+                    break
+                time.sleep(delay)
+        except BaseException:
+            self._dequeue(ticket)
+            raise
+        return self._waited(start_time)
+
+    async def aacquire(self, tokens: int = 1, priority: int = PRIORITY_INTERACTIVE) -> float:
+        """Async acquire: waits on the event loop instead of blocking a thread"""
+        start_time = time.monotonic()
+        ticket = self._enqueue(tokens, priority)
+        try:
+            while True:
+                delay = self._try_acquire(ticket)
+                if delay == 0.0:
+                    break
+                await asyncio.sleep(delay)
+        except BaseException:
+            self._dequeue(ticket)
+            raise
+        return self._waited(start_time)
+
+    def _waited(self, start_time: float) -> float:
+        waited = time.monotonic() - start_time
+        with self._lock:
+            self.total_wait += waited
+        return waited
+
+    def settle(self, reserved: int, used: Optional[int]):
+        """Return the unused part of a token reservation once actual usage is known"""
+        if self.tokens is None or used is None or used >= reserved:
+            return
+        with self._lock:
+            self.tokens.give(reserved - used)
+
+    def penalize(self, seconds: float):
+        """Hold every waiter back for `seconds` (the provider's retry-after)"""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.throttled += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "granted": self.granted,
+                "throttled": self.throttled,
+                "waiting": len(self._waiters),
+                "total_wait": round(self.total_wait, 3),
+            }
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> RateLimiter:
+    """The process-wide limiter for a provider, using its configured RPM/TPM limits"""
+    with _limiters_lock:
+        if provider not in _limiters:
+            from config import config
+
+            _limiters[provider] = RateLimiter(
+                rpm=getattr(config, f"{provider}_rpm", 0), tpm=getattr(config, f"{provider}_tpm", 0)
+            )
+        return _limiters[provider]
@@ -0,0 +1,178 @@
+"""
+Reranker Module
+Cross-encoder re-scoring of retrieved candidates within a latency budget
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .caching import EmbeddingCache, LRUCache
+from .vector_store import DocumentChunk
+
+SearchResults = List[Tuple[DocumentChunk, float]]
+
+DEFAULT_RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+# Weight of the newest measurement in the running per-pair scoring cost
+COST_SMOOTHING = 0.3
+
+# Gap between consecutive unscored candidates, below the lowest cross-encoder score
+UNSCORED_STEP = 1e-3
+
+
+class CrossEncoderReranker:
+    """Re-score (query, chunk) pairs with a small cross-encoder and keep the best top_k
+
+    Retrieval asks `candidate_count` how wide to search: `candidates` per query, cut down
+    when the measured cost per pair says a batch of queries would overrun
+    `latency_budget`. Scoring runs on CPU in batches, best retrieval ranks first across
+    all queries, and stops at the budget; candidates left unscored follow the scored
+    ones in retrieval order, with scores stepping down from just below the lowest
+    cross-encoder score (their dense similarity is on another scale). Pair scores are
+    cached, so repeated questions cost nothing.
+    """
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_RERANK_MODEL,
+        candidates: int = 50,
+        batch_size: int = 16,
+        latency_budget: Optional[float] = 0.25,
+        cache_size: int = 4096,
+        max_length: int = 256,
+        model=None,
+    ):
+        if candidates < 1:
+            raise ValueError("candidates must be positive")
+
+        self.model_name = model_name
+        self.candidates = candidates
+        self.batch_size = batch_size
+        self.latency_budget = latency_budget
+        self.max_length = max_length
+        self.scores = LRUCache(cache_size)
+        # Loaded on first use, so the reranker costs nothing until a search needs it
+        self._model = model
+        self._model_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.seconds_per_pair: Optional[float] = None
+        self.pairs_scored = 0
+        self.truncated = 0
+        self.over_budget = 0
+
+    @property
+    def model(self):
+        with self._model_lock:
+            if self._model is None:
+                from sentence_transformers import CrossEncoder
+
+                print(f"[*] Loading reranker model {self.model_name}...")
+                self._model = CrossEncoder(
+                    self.model_name, max_length=self.max_length, device="cpu"
+                )
+            return self._model
+
+    def warm_up(self):
+        """Load the model and score one pair ahead of the first rerank"""
+        self.model.predict([("warm up", "warm up")], show_progress_bar=False)
+
+    def candidate_count(self, num_queries: int, top_k: int) -> int:
+        """Candidates to retrieve per query so scoring a batch of queries fits the budget"""
+        wanted = max(top_k, self.candidates)
+        if not self.latency_budget or self.seconds_per_pair is None:
+            return wanted
+        affordable = int(self.latency_budget / (self.seconds_per_pair * max(num_queries, 1)))
+        count = max(top_k, min(wanted, affordable))
+        if count < wanted:
+            with self._stats_lock:
+                self.truncated += 1
+        return count
+
+    def rerank(self, query: str, results: SearchResults, top_k: int) -> SearchResults:
+        """Rerank one query's candidates"""
+        return self.rerank_batch([query], [results], top_k)[0]
+
+    def rerank_batch(
+        self, queries: List[str], results: List[SearchResults], top_k: int
+    ) -> List[SearchResults]:
+        """Rerank each query's candidates, scoring all uncached pairs in shared batches"""
+        keys = [EmbeddingCache.normalize(query) for query in queries]
+        scored: List[Dict[int, float]] = [{} for _ in queries]
+
+        # Walk candidates rank by rank across queries, so a budget stop cuts the tails
+        pending = []
+        for depth in range(max((len(hits) for hits in results), default=0)):
+            for position, hits in enumerate(results):
+                if depth >= len(hits):
+                    continue
+                chunk = hits[depth][0]
+                key = (keys[position], chunk.id, hash(chunk.text))
+                score = self.scores.get(key)
+                if score is None:
+                    pending.append((position, depth, key))
+                else:
+                    scored[position][depth] = score
+
+        if pending:
+            self._score(queries, results, pending, scored)
+
+        # Unscored candidates rank below every cross-encoder score of their query (or of
+        # the batch, if none of the query's pairs were scored)
+        all_scores = [score for query_scores in scored for score in query_scores.values()]
+        batch_floor = min(all_scores, default=0.0)
+
+        reranked = []
+        for position, hits in enumerate(results):
+            order = sorted(scored[position], key=lambda depth: -scored[position][depth])
+            ranked = [(hits[depth][0], scored[position][depth]) for depth in order]
+            floor = min(scored[position].values(), default=batch_floor)
+            unscored = [hit[0] for depth, hit in enumerate(hits) if depth not in scored[position]]
+            ranked.extend(
+                (chunk, floor - UNSCORED_STEP * rank) for rank, chunk in enumerate(unscored, 1)
+            )
+            reranked.append(ranked[:top_k])
+        return reranked
+
+    def _score(self, queries: List[str], results: List[SearchResults], pending, scored):
+        """Score pending pairs batch by batch until done or out of budget"""
+        model = self.model
+        start_time = time.perf_counter()
+        for batch_start in range(0, len(pending), self.batch_size):
+            elapsed = time.perf_counter() - start_time
+            if batch_start and self.latency_budget and elapsed >= self.latency_budget:
+                with self._stats_lock:
+                    self.over_budget += 1
+                break
+
+            batch = pending[batch_start : batch_start + self.batch_size]
+            pairs = [
+                (queries[position], results[position][depth][0].text)
+                for position, depth, _ in batch
+            ]
+            batch_start_time = time.perf_counter()
+            batch_scores = model.predict(pairs, batch_size=len(pairs), show_progress_bar=False)
+            self._record_cost(time.perf_counter() - batch_start_time, len(pairs))
+
+            for (position, depth, key), score in zip(batch, batch_scores):
+                scored[position][depth] = float(score)
+                self.scores.put(key, float(score))
+
+    def _record_cost(self, seconds: float, pairs: int):
+        per_pair = seconds / pairs
+        with self._stats_lock:
+            self.pairs_scored += pairs
+            if self.seconds_per_pair is None:
+                self.seconds_per_pair = per_pair
+            else:
+                self.seconds_per_pair += COST_SMOOTHING * (per_pair - self.seconds_per_pair)
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            return {
+                "pairs_scored": self.pairs_scored,
+                "ms_per_pair": (self.seconds_per_pair or 0.0) * 1000,
+                "truncated": self.truncated,
+                "over_budget": self.over_budget,
+                "cache": self.scores.stats(),
+            }
@@ -0,0 +1,177 @@
+"""
+Retrieval Batcher Module
+Micro-batching of concurrent retrieval requests into one embedding pass and one index search
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+from . import tracing
+from .vector_store import DocumentChunk
+
+SearchResults = List[Tuple[DocumentChunk, float]]
+SearchBatch = Callable[[List[str], int], List[SearchResults]]
+
+# Sentinel that stops the worker thread
+_STOP = object()
+
+
+class SearchFuture(Future):
+    """Future of a batched search, with the spans its batch recorded on the worker thread"""
+
+    def __init__(self):
+        super().__init__()
+        self.spans: List[Dict] = []
+
+
+class RetrievalBatcher:
+    """Collect concurrent searches and run them as one `search_batch` call per top_k
+
+    A single worker thread takes every request already queued; when the previous batch
+    showed concurrent traffic it also waits up to `max_wait` seconds for more, up to
+    `max_batch_size`. A lone request under no load is dispatched immediately, so batching
+    adds no latency when there is nothing to batch. Callers get a Future per query, which
+    also carries the spans (embed, index_search, ...) of the batch that answered it.
+    """
+
+    def __init__(
+        self, search_batch: SearchBatch, max_batch_size: int = 32, max_wait: float = 0.003
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be positive")
+
+        self.search_batch = search_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._requests: queue.Queue = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._last_batch_size = 0
+        self.batches = 0
+        self.requests = 0
+
+    def submit(self, query: str, top_k: int = 3) -> SearchFuture:
+        """Queue a search; the Future resolves to its (chunk, score) results"""
+        future = SearchFuture()
+        self._ensure_worker()
+        self._requests.put((query, top_k, future))
+        return future
+
+    def search(self, query: str, top_k: int = 3) -> SearchResults:
+        """Blocking search through the batcher, adding its batch's spans to the current trace"""
+        future = self.submit(query, top_k)
+        try:
+            return future.result()
+        finally:
+            tracing.record(future.spans)
+
+    async def asearch(self, query: str, top_k: int = 3) -> SearchResults:
+        """Awaitable search through the batcher, adding its batch's spans to the current trace"""
+        future = self.submit(query, top_k)
+        try:
+            return await asyncio.wrap_future(future)
+        finally:
+            tracing.record(future.spans)
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="retrieval-batcher", daemon=True
+                )
+                self._worker.start()
+
+    def _collect(self, first) -> List:
+        """The first request plus whatever joins it within the batching window"""
+        batch = [first]
+        deadline = time.monotonic() + (self.max_wait if self._last_batch_size > 1 else 0.0)
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                item = (
+                    self._requests.get(timeout=timeout)
+                    if timeout > 0
+                    else self._requests.get_nowait()
+                )
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self._requests.put(_STOP)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._requests.get()
+            if first is _STOP:
+                return
+            batch = self._collect(first)
+            self._last_batch_size = len(batch)
+            self.batches += 1
+            self.requests += len(batch)
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: List):
+        """Search the batch once per distinct top_k
+
+        Rerank over-fetch, hybrid fusion and the rerank budget all depend on top_k, so
+        searching at the largest one and trimming would make a caller's results depend on
+        which other requests shared its batch.
+        """
+        groups: Dict[int, List] = {}
+        for item in batch:
+            if item[2].set_running_or_notify_cancel():
+                groups.setdefault(item[1], []).append(item)
+        for top_k, group in groups.items():
+            self._dispatch_group(group, top_k)
+
+    def _dispatch_group(self, group: List, top_k: int):
+        # The group's spans are shared by all of its callers, handed back on their futures
+        with tracing.trace() as group_trace:
+            try:
+                results = self.search_batch([query for query, _, _ in group], top_k)
+            except Exception as e:
+                if len(group) > 1:
+                    # One bad query must not fail its neighbours: retry them one by one
+                    for item in group:
+                        self._dispatch_one(item)
+                    return
+                group[0][2].spans = group_trace.spans
+                group[0][2].set_exception(e)
+                return
+
+        for (_, _, future), hits in zip(group, results):
+            future.spans = group_trace.spans
+            future.set_result(hits)
+
+    def _dispatch_one(self, item):
+        query, top_k, future = item
+        with tracing.trace() as item_trace:
+            try:
+                hits = self.search_batch([query], top_k)[0]
+            except Exception as e:
+                future.spans = item_trace.spans
+                future.set_exception(e)
+                return
+        future.spans = item_trace.spans
+        future.set_result(hits)
+
+    def close(self):
+        """Stop the worker once queued requests have been served"""
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                self._requests.put(_STOP)
+                self._worker.join()
+            self._worker = None
+
+    def stats(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_batch_size": self.requests / self.batches if self.batches else 0.0,
+        }
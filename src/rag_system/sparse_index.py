@@ -0,0 +1,254 @@
+"""
+Sparse Index Module
+Array-backed BM25 keyword index and rank fusion with dense search results
+
+Postings are stored CSR-style: `indptr[t]:indptr[t + 1]` slices the document IDs and term
+frequencies of term t out of two flat arrays. New documents are buffered as arrays and
+merged into the CSR layout on the next search or save; removed documents are masked out
+immediately and their postings dropped at that merge. A saved index is a directory of
+.npy arrays plus the term list, with the postings memory-mapped on load.
+"""
+
+import math
+import os
+import re
+import shutil
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+# Words, plus identifiers joined by - _ . / : (error codes, endpoints, policy numbers)
+TOKEN_PATTERN = re.compile(r"\w+(?:[-./:]\w+)*")
+TOKEN_SEPARATORS = re.compile(r"[-_./:]+")
+
+# Rank constant of reciprocal rank fusion; 60 is the usual choice
+RRF_K = 60
+
+FUSION_METHODS = ("rrf", "weighted")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased terms; compound identifiers are indexed whole and by their parts"""
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(text.lower()):
+        token = match.group()
+        tokens.append(token)
+        parts = [part for part in TOKEN_SEPARATORS.split(token) if part]
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+class BM25Index:
+    """Okapi BM25 over CSR postings keyed by vector ID"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.vocab: Dict[str, int] = {}
+        self.indptr = np.zeros(1, dtype="int64")
+        self.doc_ids = np.zeros(0, dtype="int32")
+        self.tfs = np.zeros(0, dtype="uint16")
+        # Per vector ID: token count and whether the document is still indexed
+        self.doc_lens = np.zeros(0, dtype="int32")
+        self.live = np.zeros(0, dtype=bool)
+        self.num_docs = 0
+        self.total_length = 0
+        self._pending: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        self._has_removals = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.doc_lens)
+
+    def add(self, ids: Sequence[int], texts: Iterable[str]):
+        """Index documents under their vector IDs"""
+        term_ids: List[int] = []
+        doc_ids: List[int] = []
+        tfs: List[int] = []
+        lengths: List[int] = []
+        with self._lock:
+            for doc_id, text in zip(ids, texts):
+                counts = Counter(tokenize(text))
+                for term, tf in counts.items():
+                    term_ids.append(self.vocab.setdefault(term, len(self.vocab)))
+                    doc_ids.append(doc_id)
+                    tfs.append(min(tf, 65535))
+                lengths.append(sum(counts.values()))
+
+            ids = np.asarray(ids, dtype="int64")
+            if len(ids) == 0:
+                return
+            if ids.max() >= len(self.doc_lens):
+                grow = int(ids.max()) + 1 - len(self.doc_lens)
+                self.doc_lens = np.concatenate([self.doc_lens, np.zeros(grow, dtype="int32")])
+                self.live = np.concatenate([self.live, np.zeros(grow, dtype=bool)])
+            self.doc_lens[ids] = lengths
+            self.live[ids] = True
+            self.num_docs += len(ids)
+            self.total_length += sum(lengths)
+            self._pending.append(
+                (
+                    np.asarray(term_ids, dtype="int64"),
+                    np.asarray(doc_ids, dtype="int32"),
+                    np.asarray(tfs, dtype="uint16"),
+                )
+            )
+
+    def remove(self, ids: Iterable[int]):
+        """Stop matching the given vector IDs"""
+        with self._lock:
+            ids = np.fromiter(ids, dtype="int64")
+            ids = ids[ids < len(self.live)]
+            ids = ids[self.live[ids]]
+            if len(ids) == 0:
+                return
+            self.live[ids] = False
+            self.num_docs -= len(ids)
+            self.total_length -= int(self.doc_lens[ids].sum())
+            self._has_removals = True
+
+    def _compact(self):
+        """Merge buffered postings into the CSR arrays, dropping removed documents"""
+        if not self._pending and not self._has_removals:
+            return
+
+        # Expand the CSR arrays back to (term, doc, tf) triples and append the new ones
+        term_ids = [np.repeat(np.arange(len(self.indptr) - 1), np.diff(self.indptr))]
+        doc_ids = [np.asarray(self.doc_ids)]
+        tfs = [np.asarray(self.tfs)]
+        for pending_terms, pending_docs, pending_tfs in self._pending:
+            term_ids.append(pending_terms)
+            doc_ids.append(pending_docs)
+            tfs.append(pending_tfs)
+        term_ids = np.concatenate(term_ids)
+        doc_ids = np.concatenate(doc_ids)
+        tfs = np.concatenate(tfs)
+
+        keep = self.live[doc_ids]
+        term_ids, doc_ids, tfs = term_ids[keep], doc_ids[keep], tfs[keep]
+        order = np.argsort(term_ids, kind="stable")
+        counts = np.bincount(term_ids, minlength=len(self.vocab))
+        self.indptr = np.concatenate([[0], np.cumsum(counts)]).astype("int64")
+        self.doc_ids = doc_ids[order]
+        self.tfs = tfs[order]
+        self._pending = []
+        self._has_removals = False
+
+    def search(self, query: str, top_k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """(vector IDs, BM25 scores) of the best-matching documents, best first"""
+        with self._lock:
+            self._compact()
+            terms = {self.vocab[term] for term in tokenize(query) if term in self.vocab}
+            if not terms or self.num_docs == 0:
+                return np.zeros(0, dtype="int64"), np.zeros(0, dtype="float32")
+
+            avg_length = max(self.total_length / self.num_docs, 1.0)
+            matched_docs = []
+            matched_scores = []
+            for term in terms:
+                start, end = self.indptr[term], self.indptr[term + 1]
+                if start == end:
+                    continue
+                docs = self.doc_ids[start:end]
+                tf = self.tfs[start:end].astype("float32")
+                idf = math.log(1.0 + (self.num_docs - (end - start) + 0.5) / (end - start + 0.5))
+                norm = self.k1 * (1.0 - self.b + self.b * self.doc_lens[docs] / avg_length)
+                matched_docs.append(docs)
+                matched_scores.append(idf * tf * (self.k1 + 1.0) / (tf + norm))
+
+        if not matched_docs:
+            return np.zeros(0, dtype="int64"), np.zeros(0, dtype="float32")
+
+        # Sum per-term scores of each matched document
+        docs, inverse = np.unique(np.concatenate(matched_docs), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(matched_scores))
+        if len(docs) > top_k:
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+            docs, scores = docs[best], scores[best]
+        order = np.argsort(-scores, kind="stable")
+        return docs[order].astype("int64"), scores[order].astype("float32")
+
+    def save(self, path: str):
+        """Write the index to a directory (atomically replacing any existing one)"""
+        target = Path(path)
+        tmp_dir = target.with_name(target.name + ".tmp")
+        with self._lock:
+            self._compact()
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            tmp_dir.mkdir(parents=True)
+            for name in ("indptr", "doc_ids", "tfs", "doc_lens", "live"):
+                np.save(tmp_dir / f"{name}.npy", np.asarray(getattr(self, name)))
+            terms = sorted(self.vocab, key=self.vocab.get)
+            with open(tmp_dir / "terms.txt", "w", encoding="utf-8") as f:
+                f.write("\n".join(terms))
+
+        if target.exists():
+            shutil.rmtree(target)
+        os.replace(tmp_dir, target)
+
+    @classmethod
+    def load(cls, path: str, k1: float = 1.2, b: float = 0.75) -> "BM25Index":
+        """Load a saved index, memory-mapping its postings"""
+        index = cls(k1, b)
+        directory = Path(path)
+        index.indptr = np.load(directory / "indptr.npy")
+        index.doc_ids = np.load(directory / "doc_ids.npy", mmap_mode="r")
+        index.tfs = np.load(directory / "tfs.npy", mmap_mode="r")
+        index.doc_lens = np.load(directory / "doc_lens.npy")
+        index.live = np.load(directory / "live.npy")
+        with open(directory / "terms.txt", encoding="utf-8") as f:
+            terms = f.read()
+        index.vocab = {term: i for i, term in enumerate(terms.split("\n"))} if terms else {}
+        index.num_docs = int(index.live.sum())
+        index.total_length = int(index.doc_lens[index.live].sum())
+        return index
+
+
+def reciprocal_rank_fusion(rankings: List[np.ndarray], k: int = RRF_K) -> Dict[int, float]:
+    """Fuse ranked ID lists: each list contributes 1 / (k + rank) to every ID it contains"""
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            fused[int(doc_id)] = fused.get(int(doc_id), 0.0) + 1.0 / (k + rank)
+    return fused
+
+
+def weighted_fusion(
+    results: List[Tuple[np.ndarray, np.ndarray]], weights: List[float]
+) -> Dict[int, float]:
+    """Fuse (IDs, scores) lists by weighted sum of min-max normalized scores"""
+    fused: Dict[int, float] = {}
+    for (ids, scores), weight in zip(results, weights):
+        if len(ids) == 0:
+            continue
+        low, high = float(np.min(scores)), float(np.max(scores))
+        scale = high - low
+        for doc_id, score in zip(ids, scores):
+            normalized = (float(score) - low) / scale if scale > 0 else 1.0
+            fused[int(doc_id)] = fused.get(int(doc_id), 0.0) + weight * normalized
+    return fused
+
+
+def fuse(
+    dense: Tuple[np.ndarray, np.ndarray],
+    sparse: Tuple[np.ndarray, np.ndarray],
+    top_k: int,
+    method: str = "rrf",
+    alpha: float = 0.5,
+) -> List[Tuple[int, float]]:
+    """Merge dense and sparse candidates into the top_k (ID, fused score) pairs
+
+    `alpha` weights the dense side of a weighted fusion (1 - alpha for BM25).
+    """
+    if method == "rrf":
+        fused = reciprocal_rank_fusion([dense[0], sparse[0]])
+    elif method == "weighted":
+        fused = weighted_fusion([dense, sparse], [alpha, 1.0 - alpha])
+    else:
+        raise ValueError(f"Unknown fusion method '{method}'. Expected one of {FUSION_METHODS}")
+
+    return sorted(fused.items(), key=lambda item: (-item[1], item[0]))[:top_k]
@@ -0,0 +1,242 @@
+"""
+Tracing Module
+Timing spans across the RAG pipeline, exported as OpenMetrics histograms
+
+Pipeline stages run inside `span("name", **labels)`. While tracing is disabled (the default)
+`span` returns one shared no-op object, so an instrumented stage costs a flag check. Once
+enabled, every finished span is observed in a histogram per (name, labels). Spans that finish
+inside a `trace()` are also recorded for that request, which is how `@traced` answer methods
+attach a latency breakdown to their result.
+
+The active trace follows contextvars: it reaches async tasks, and threads started through
+`contextvars.copy_context().run`. Shared worker threads, such as the retrieval micro-batcher,
+collect their spans in a trace of their own and hand them back with the result; the caller
+adds them to its trace with `record()`.
+"""
+
+import bisect
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+METRIC_NAME = "rag_span_seconds"
+
+# Histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+_enabled = False
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar(
+    "rag_trace", default=None
+)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        # First bucket whose upper bound is >= seconds; the last slot is +Inf
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+
+class MetricsRegistry:
+    """Span histograms keyed by span name and labels"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._histograms: Dict[Tuple[str, Tuple], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, labels: Dict[str, str], seconds: float):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def snapshot(self) -> Dict[Tuple[str, Tuple], Dict]:
+        """Count, sum and per-bucket counts of every histogram"""
+        with self._lock:
+            return {
+                key: {"count": h.count, "sum": h.sum, "counts": list(h.counts)}
+                for key, h in self._histograms.items()
+            }
+
+    def render_openmetrics(self) -> str:
+        """All histograms in the OpenMetrics text format (also accepted by Prometheus)"""
+        lines = [
+            f"# TYPE {METRIC_NAME} histogram",
+            f"# UNIT {METRIC_NAME} seconds",
+            f"# HELP {METRIC_NAME} Duration of RAG pipeline stages.",
+        ]
+        for (name, labels), data in sorted(self.snapshot().items()):
+            base = [("span", name)] + list(labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), data["counts"]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(f"{METRIC_NAME}_bucket{_labels(base + [('le', le)])} {cumulative}")
+            lines.append(f"{METRIC_NAME}_count{_labels(base)} {data['count']}")
+            lines.append(f"{METRIC_NAME}_sum{_labels(base)} {data['sum']!r}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+def _labels(pairs: List[Tuple[str, str]]) -> str:
+    escaped = (
+        str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for _, value in pairs
+    )
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class Trace:
+    """Spans finished during one request, in completion order"""
+
+    def __init__(self):
+        self.spans: List[Dict] = []
+
+    def record(self, name: str, labels: Dict[str, str], seconds: float):
+        # list.append is atomic, so spans from hedged worker threads need no lock
+        self.spans.append({"name": name, "seconds": seconds, **labels})
+
+    def attach(self, result, total: float):
+        """Add the breakdown to a result dict as "timings" """
+        if isinstance(result, dict):
+            result["timings"] = {"total": total, "spans": list(self.spans)}
+        return result
+
+
+class Span:
+    """A timed pipeline stage; labels can be added before it ends (e.g. the outcome)"""
+
+    __slots__ = ("name", "labels", "start", "seconds")
+
+    def __init__(self, name: str, labels: Dict[str, str]):
+        self.name = name
+        self.labels = labels
+        self.seconds = 0.0
+
+    def set(self, **labels):
+        self.labels.update(labels)
+
+    def __enter__(self) -> "Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.seconds = time.perf_counter() - self.start
+        if exc_type is not None and "status" not in self.labels:
+            self.labels["status"] = "error"
+        REGISTRY.observe(self.name, self.labels, self.seconds)
+        current = _current_trace.get()
+        if current is not None:
+            current.record(self.name, self.labels, self.seconds)
+
+
+class _NoopSpan:
+    """Stands in for every span while tracing is disabled"""
+
+    __slots__ = ()
+
+    def set(self, **labels):
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def enable(enabled: bool = True):
+    """Turn span recording on or off process-wide"""
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def span(name: str, **labels: str):
+    """Time a pipeline stage: `with span("embed"): ...`"""
+    if not _enabled:
+        return _NOOP_SPAN
+    return Span(name, labels)
+
+
+@contextmanager
+def trace() -> Iterator[Trace]:
+    """Collect the spans finished in this context into a new Trace"""
+    current = Trace()
+    token = _current_trace.set(current)
+    try:
+        yield current
+    finally:
+        _current_trace.reset(token)
+
+
+def record(spans: List[Dict]):
+    """Add spans finished in another context, e.g. a shared worker thread, to the current trace
+
+    They were observed in the histograms when they finished, so only the trace gets them.
+    """
+    current = _current_trace.get()
+    if current is not None:
+        current.spans.extend(spans)
+
+
+def traced(method):
+    """Attach a latency breakdown to the result dict of an answer method, when enabled
+
+    Only the outermost traced call of a request attaches one; nested calls add their spans
+    to it. The whole call is observed as an "answer" span, which is the breakdown's total.
+    """
+    if inspect.iscoroutinefunction(method):
+
+        @functools.wraps(method)
+        async def async_wrapper(*args, **kwargs):
+            if not _enabled or _current_trace.get() is not None:
+                return await method(*args, **kwargs)
+            with span("answer") as total:
+                with trace() as current:
+                    result = await method(*args, **kwargs)
+            return current.attach(result, total.seconds)
+
+        return async_wrapper
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        if not _enabled or _current_trace.get() is not None:
+            return method(*args, **kwargs)
+        with span("answer") as total:
+            with trace() as current:
+                result = method(*args, **kwargs)
+        return current.attach(result, total.seconds)
+
+    return wrapper
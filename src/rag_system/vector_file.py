@@ -0,0 +1,134 @@
+"""
+Vector File Module
+Append-only on-disk float32 embeddings, memory-mapped for exact reranking
+
+A vector file is a raw little-endian float32 array with one row per vector ID. Rows are
+only ever appended, so a save after an incremental update writes just the new rows.
+Vectors added since the last save are spilled to an anonymous temporary file rather
+than held in memory.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+VECTOR_DTYPE = np.dtype("<f4")
+
+# Bytes copied per read when rewriting a vector file
+COPY_BLOCK_SIZE = 1 << 24
+
+
+class VectorFile:
+    """Float32 vectors addressed by row (the vector ID), stored on disk and mapped read-only"""
+
+    def __init__(self, dimension: int, path: Optional[str] = None):
+        self.dimension = dimension
+        self.row_bytes = dimension * VECTOR_DTYPE.itemsize
+        self.path = Path(path) if path else None
+        self._stored: Optional[np.ndarray] = None
+        self._pending = None
+        self._pending_rows = 0
+        self._lock = threading.Lock()
+        if self.path is not None:
+            self._map()
+
+    def _map(self):
+        """Map the saved rows of the file, if it has any"""
+        size = self.path.stat().st_size
+        if size % self.row_bytes:
+            raise ValueError(f"{self.path} is not a {self.dimension}-dimensional vector file")
+        rows = size // self.row_bytes
+        self._stored = (
+            np.memmap(self.path, dtype=VECTOR_DTYPE, mode="r", shape=(rows, self.dimension))
+            if rows
+            else None
+        )
+
+    @property
+    def stored_count(self) -> int:
+        return len(self._stored) if self._stored is not None else 0
+
+    def __len__(self) -> int:
+        return self.stored_count + self._pending_rows
+
+    def append(self, vectors: np.ndarray):
+        """Append vectors; their IDs continue from the current length"""
+        vectors = np.ascontiguousarray(vectors, dtype=VECTOR_DTYPE)
+        if vectors.ndim != 2 or vectors.shape[1] != self.dimension:
+            raise ValueError(f"Expected vectors of shape (n, {self.dimension})")
+        with self._lock:
+            if self._pending is None:
+                self._pending = tempfile.TemporaryFile()
+            self._pending.seek(0, os.SEEK_END)
+            self._pending.write(vectors.tobytes())
+            self._pending_rows += len(vectors)
+
+    def rows(self, ids: np.ndarray) -> np.ndarray:
+        """Float32 vectors for the given IDs, in order"""
+        ids = np.asarray(ids, dtype="int64")
+        if len(ids) and (ids.min() < 0 or ids.max() >= len(self)):
+            raise IndexError("Vector ID out of range")
+
+        out = np.empty((len(ids), self.dimension), dtype="float32")
+        stored = ids < self.stored_count
+        if stored.any():
+            out[stored] = self._stored[ids[stored]]
+        if not stored.all():
+            # Unsaved rows: read them back from the spill file
+            with self._lock:
+                for position in np.flatnonzero(~stored):
+                    self._pending.seek(int(ids[position] - self.stored_count) * self.row_bytes)
+                    out[position] = np.frombuffer(
+                        self._pending.read(self.row_bytes), dtype=VECTOR_DTYPE
+                    )
+        return out
+
+    def save(self, path: str):
+        """Write the vectors to `path` and map them from there"""
+        path = Path(path)
+        with self._lock:
+            if self._pending is not None:
+                self._pending.flush()
+                self._pending.seek(0)
+
+            in_place = (
+                self.path == path
+                and path.exists()
+                and path.stat().st_size == self.stored_count * self.row_bytes
+            )
+            if in_place:
+                # Already holds the stored rows: append only the new ones
+                if self._pending is not None:
+                    with open(path, "ab") as f:
+                        shutil.copyfileobj(self._pending, f, COPY_BLOCK_SIZE)
+            else:
+                # Write a new file and replace atomically, keeping existing mappings valid
+                tmp_path = Path(f"{path}.tmp")
+                with open(tmp_path, "wb") as f:
+                    if self._stored is not None:
+                        step = max(1, COPY_BLOCK_SIZE // self.row_bytes)
+                        for start in range(0, self.stored_count, step):
+                            f.write(np.ascontiguousarray(self._stored[start : start + step]))
+                    if self._pending is not None:
+                        shutil.copyfileobj(self._pending, f, COPY_BLOCK_SIZE)
+                os.replace(tmp_path, path)
+
+            if self._pending is not None:
+                self._pending.close()
+            self._pending = None
+            self._pending_rows = 0
+            self.path = path
+            self._map()
+
+    def close(self):
+        """Discard unsaved vectors"""
+        with self._lock:
+            if self._pending is not None:
+                self._pending.close()
+            self._pending = None
+            self._pending_rows = 0
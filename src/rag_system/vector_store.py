@@ -3,13 +3,45 @@ Vector Store Implementation
 FAISS-based vector storage with semantic search capabilities
 """
 
+import os
 import pickle
+import threading
+import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 import faiss
-from sentence_transformers import SentenceTransformer
+import numpy as np
+
+from .caching import EmbeddingCache
+from .index_factory import (
+    INDEX_TYPES,
+    QUANTIZED_TYPES,
+    choose_index_type,
+    create_index,
+    describe_index,
+    index_type_of,
+    read_index,
+    recall_at_k,
+    reconstruct_all,
+    remove_ids,
+    rerank_exact,
+    search_params,
+    set_search_defaults,
+    stored_ids,
+    train_index,
+    with_ids,
+)
+from .sparse_index import BM25Index, fuse
+from .tracing import span
+from .vector_file import VectorFile
+
+# Order in which the "auto" index type upgrades as the corpus grows
+AUTO_UPGRADE_ORDER = ["flat", "hnsw", "ivf_flat", "ivf_pq"]
+
+# Hybrid search fuses this many dense and BM25 candidates per requested result
+HYBRID_CANDIDATE_FACTOR = 4
 
 
 @dataclass
@@ -26,93 +58,541 @@ class DocumentChunk:
 class VectorStore:
     """FAISS-based vector store for semantic search"""
 
-    def __init__(self, embedding_model: str = "all-MiniLM-L6-v2"):
-        self.embedding_model = SentenceTransformer(embedding_model)
-        self.dimension = self.embedding_model.get_sentence_embedding_dimension()
-        self.index = faiss.IndexFlatIP(self.dimension)  # Inner product for cosine similarity
+    def __init__(
+        self,
+        embedding_model: str = "all-MiniLM-L6-v2",
+        index_type: str = "flat",
+        nprobe: int = 16,
+        ef_search: int = 64,
+        train_sample_size: int = 100_000,
+        query_cache_size: int = 1024,
+        query_cache_ttl: Optional[float] = 3600.0,
+        query_cache_path: Optional[str] = None,
+        mmap: bool = False,
+        rerank_factor: int = 4,
+        model=None,
+    ):
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type '{index_type}'. Expected one of {INDEX_TYPES}")
+
+        self.model_name = embedding_model
+        # Loaded on first encode, so opening a saved store or the CLI does not pay for it
+        self._embedding_model = model
+        self._model_lock = threading.Lock()
+        self._dimension: Optional[int] = None
+        self.index_type = index_type
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.train_sample_size = train_sample_size
+        # Serve a loaded index from a shared read-only mapping instead of private memory
+        self.mmap = mmap
+        # Quantized indexes over-fetch this many times top_k and rerank with float32 vectors
+        self.rerank_factor = rerank_factor
+        self.vectors: Optional[VectorFile] = None
+        self.reset()
+        self.query_cache = EmbeddingCache(
+            embedding_model, query_cache_size, query_cache_ttl, query_cache_path
+        )
+
+    @property
+    def embedding_model(self):
+        with self._model_lock:
+            if self._embedding_model is None:
+                from sentence_transformers import SentenceTransformer
+
+                print(f"[*] Loading embedding model {self.model_name}...")
+                self._embedding_model = SentenceTransformer(self.model_name)
+            return self._embedding_model
+
+    @property
+    def dimension(self) -> int:
+        if self._dimension is None:
+            self._dimension = self.embedding_model.get_sentence_embedding_dimension()
+        return self._dimension
+
+    @dimension.setter
+    def dimension(self, value: int):
+        self._dimension = value
+
+    @property
+    def needs_training_sample(self) -> bool:
+        """Whether the first vectors added will train a new, non-flat index"""
+        return self.index is None and self.index_type not in ("flat", "auto")
+
+    def warm_up(self):
+        """Load the embedding model and run one encode ahead of the first query"""
+        self.embedding_model.encode(["warm up"], show_progress_bar=False)
+
+    def reset(self):
+        """Drop every indexed chunk, leaving an empty store ready for a rebuild"""
+        # Inner product for cosine similarity; the index is created on first add.
+        # Vector IDs are row positions in self.chunks, which is append-only.
+        self.index = None
+        self._mapped = False
         self.chunks: List[DocumentChunk] = []
+        self.deleted_ids: Set[int] = set()
+        # Keyword index over the same vector IDs, for hybrid search
+        self.sparse = BM25Index()
+        if self.vectors is not None:
+            self.vectors.close()
+        self.vectors = None
         self.is_built = False
 
-    def add_documents(self, documents: List[DocumentChunk]):
-        """Add documents to the vector store"""
-        print(f"[*] Generating embeddings for {len(documents)} document chunks...")
+    def _keeps_vectors(self) -> bool:
+        """Whether exact vectors are stored alongside the index, i.e. it is quantized (lossy)"""
+        return (
+            self.rerank_factor > 0
+            and self.index is not None
+            and index_type_of(self.index) in QUANTIZED_TYPES
+        )
 
-        # Extract text for embedding
-        texts = [doc.text for doc in documents]
+    def _can_rerank(self) -> bool:
+        """Whether searches can rerank quantized candidates with the stored float32 vectors"""
+        return (
+            self.rerank_factor > 0
+            and self.vectors is not None
+            and len(self.vectors) == len(self.chunks)
+            and index_type_of(self.index) in QUANTIZED_TYPES
+        )
+
+    def add_documents(self, documents: List[DocumentChunk]) -> List[int]:
+        """Add documents to the vector store and return their vector IDs"""
+        print(f"[*] Generating embeddings for {len(documents)} document chunks...")
 
         # Generate embeddings in batches for efficiency
+        embeddings = self.embed_documents(documents)
+
+        # Add to FAISS index
+        ids = self.add_embedded(documents, embeddings)
+
+        print(f"[+] Added {len(documents)} chunks to vector store")
+        print(f"[i] Total vectors in index: {self.index.ntotal} ({index_type_of(self.index)})")
+        return ids
+
+    def embed_documents(
+        self, documents: List[DocumentChunk], show_progress_bar: bool = True
+    ) -> np.ndarray:
+        """Encode document chunks into normalized float32 embeddings"""
+        texts = [doc.text for doc in documents]
         embeddings = self.embedding_model.encode(
-            texts, batch_size=32, show_progress_bar=True, normalize_embeddings=True
+            texts, batch_size=32, show_progress_bar=show_progress_bar, normalize_embeddings=True
         )
+        return np.asarray(embeddings, dtype="float32")
 
-        # Add to FAISS index
-        self.index.add(embeddings.astype("float32"))
+    def add_embedded(self, documents: List[DocumentChunk], embeddings: np.ndarray) -> List[int]:
+        """Add already-embedded documents to the index and return their vector IDs"""
+        ids = np.arange(len(self.chunks), len(self.chunks) + len(documents), dtype="int64")
+        self._add_embeddings(embeddings, ids)
+        if self.vectors is None and not self.chunks and self._keeps_vectors():
+            self.vectors = VectorFile(self.dimension)
+        if self.vectors is not None:
+            self.vectors.append(embeddings)
+        self.sparse.add(ids, [doc.text for doc in documents])
         self.chunks.extend(documents)
         self.is_built = True
+        return ids.tolist()
 
-        print(f"[+] Added {len(documents)} chunks to vector store")
-        print(f"[i] Total vectors in index: {self.index.ntotal}")
+    def _add_embeddings(self, embeddings: np.ndarray, ids: np.ndarray):
+        """Add vectors to the index, creating, training or upgrading it as needed"""
+        self._ensure_writable()
+        current = self.index.ntotal if self.index is not None else 0
+        total = current + len(embeddings)
+
+        if self.index is None:
+            self.index = with_ids(create_index(self.index_type, self.dimension, total))
+            train_index(self.index, embeddings, self.train_sample_size)
+        elif self.index_type == "auto" and self._should_upgrade(total):
+            target = choose_index_type(total)
+            print(
+                f"[*] Upgrading index from {index_type_of(self.index)} to {target} ({total} vectors)"
+            )
+            existing_ids, existing = reconstruct_all(self.index)
+            self.index = with_ids(create_index(target, self.dimension, total))
+            if self._keeps_vectors():
+                # Moving to a lossy index: keep the exact vectors of the existing rows too.
+                # Tombstoned rows, which no search returns, are left as zeros.
+                rows = np.zeros((len(self.chunks), self.dimension), dtype="float32")
+                rows[existing_ids] = existing
+                self.vectors = VectorFile(self.dimension)
+                self.vectors.append(rows)
+            embeddings = np.vstack([existing, embeddings])
+            ids = np.concatenate([existing_ids, ids])
+            train_index(self.index, embeddings, self.train_sample_size)
+        elif not self.index.is_trained:
+            train_index(self.index, embeddings, self.train_sample_size)
+
+        set_search_defaults(self.index, self.nprobe, self.ef_search)
+        self.index.add_with_ids(embeddings, ids)
+
+    def remove_ids(self, ids: Iterable[int]) -> int:
+        """Remove vectors from the index; their chunk rows stay as tombstones until a rebuild"""
+        ids = np.fromiter(ids, dtype="int64")
+        if len(ids) == 0 or self.index is None:
+            return 0
+
+        self._ensure_writable()
+        try:
+            removed = remove_ids(self.index, ids)
+        except RuntimeError:
+            # HNSW graphs cannot delete nodes: rebuild from the surviving vectors
+            all_ids, vectors = reconstruct_all(self.index)
+            keep = ~np.isin(all_ids, ids)
+            rebuilt = with_ids(
+                create_index(index_type_of(self.index), self.dimension, int(keep.sum()))
+            )
+            train_index(rebuilt, vectors[keep], self.train_sample_size)
+            set_search_defaults(rebuilt, self.nprobe, self.ef_search)
+            rebuilt.add_with_ids(vectors[keep], all_ids[keep])
+            removed = len(all_ids) - int(keep.sum())
+            self.index = rebuilt
+
+        self.sparse.remove(ids)
+        self.deleted_ids.update(int(i) for i in ids)
+        print(f"[-] Removed {removed} vectors from index")
+        return removed
+
+    def _ensure_writable(self):
+        """Swap a memory-mapped index for a private in-memory copy before modifying it"""
+        if not self._mapped:
+            return
+        # Copy the mapped index itself rather than re-reading the file, which another process
+        # may have replaced since; a round trip through serialization owns every buffer
+        print("[*] Copying the memory-mapped index into private memory for writing")
+        self.index = faiss.deserialize_index(faiss.serialize_index(self.index))
+        set_search_defaults(self.index, self.nprobe, self.ef_search)
+        self._mapped = False
+
+    def _should_upgrade(self, total: int) -> bool:
+        """Whether the auto index type should move to a larger-corpus backend"""
+        current = AUTO_UPGRADE_ORDER.index(index_type_of(self.index))
+        return AUTO_UPGRADE_ORDER.index(choose_index_type(total)) > current
 
-    def search(self, query: str, top_k: int = 5) -> List[Tuple[DocumentChunk, float]]:
-        """Search for relevant documents"""
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ) -> List[Tuple[DocumentChunk, float]]:
+        """Search for relevant documents, optionally overriding the ANN search effort"""
+        return self.search_batch([query], top_k, nprobe, ef_search)[0]
+
+    def search_batch(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ) -> List[List[Tuple[DocumentChunk, float]]]:
+        """Search for several queries with one encoder pass and one FAISS call"""
         if not self.is_built:
             raise ValueError("Vector store not built. Add documents first.")
 
-        if not query or not query.strip():
+        if any(not query or not query.strip() for query in queries):
             raise ValueError("Query cannot be empty")
 
+        if not queries:
+            return []
+
         try:
-            # Generate query embedding
-            query_embedding = self.embedding_model.encode([query], normalize_embeddings=True)
+            # Generate all query embeddings in a single forward pass
+            query_embeddings = self.embed_queries(queries)
 
             # Search in FAISS index
-            scores, indices = self.index.search(query_embedding.astype("float32"), top_k)
+            return self.search_embeddings(query_embeddings, top_k, nprobe, ef_search)
+        except Exception as e:
+            raise RuntimeError(f"Error during vector search: {str(e)}")
+
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """Encode queries into normalized float32 embeddings, reusing cached ones"""
+        with span("embed") as embed_span:
+            embeddings = [self.query_cache.get_embedding(query) for query in queries]
 
-            # Return chunks with scores
-            results = []
-            for score, idx in zip(scores[0], indices[0]):
+            # Encode each distinct uncached query once
+            missing = {}
+            for query, embedding in zip(queries, embeddings):
+                if embedding is None:
+                    missing.setdefault(EmbeddingCache.normalize(query), query)
+            embed_span.set(cache="miss" if missing else "hit")
+
+            if missing:
+                encoded = self.embedding_model.encode(
+                    list(missing.values()), batch_size=32, normalize_embeddings=True
+                ).astype("float32")
+                fresh = dict(zip(missing.keys(), encoded))
+                for query, vector in zip(missing.values(), encoded):
+                    self.query_cache.put_embedding(query, vector)
+                embeddings = [
+                    fresh[EmbeddingCache.normalize(query)] if embedding is None else embedding
+                    for query, embedding in zip(queries, embeddings)
+                ]
+
+            return np.vstack(embeddings)
+
+    def query_embedding(self, query: str) -> np.ndarray:
+        """Embedding of a query that retrieval already encoded, reused without counting as a
+        cache lookup; encoded again only if it is no longer cached"""
+        embedding = self.query_cache.peek_embedding(query)
+        return embedding if embedding is not None else self.embed_queries([query])[0]
+
+    def search_embeddings(
+        self,
+        query_embeddings: np.ndarray,
+        top_k: int = 5,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ) -> List[List[Tuple[DocumentChunk, float]]]:
+        """Search the index with precomputed query embeddings (one row per query)"""
+        scores, indices = self._index_search(query_embeddings, top_k, nprobe, ef_search)
+
+        # Return chunks with scores
+        results = []
+        for score_row, index_row in zip(scores, indices):
+            hits = []
+            for score, idx in zip(score_row, index_row):
                 if idx != -1 and idx < len(self.chunks):  # Valid result
-                    results.append((self.chunks[idx], float(score)))
+                    hits.append((self.chunks[idx], float(score)))
+            results.append(hits)
+
+        return results
+
+    def hybrid_search(
+        self, query: str, top_k: int = 5, fusion: str = "rrf", alpha: float = 0.5
+    ) -> List[Tuple[DocumentChunk, float]]:
+        """Search by meaning and by exact keywords, fusing the two rankings"""
+        return self.hybrid_search_batch([query], top_k, fusion, alpha)[0]
+
+    def hybrid_search_batch(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        fusion: str = "rrf",
+        alpha: float = 0.5,
+    ) -> List[List[Tuple[DocumentChunk, float]]]:
+        """Fuse dense and BM25 candidates per query with reciprocal rank or weighted scores
+
+        Scores are fused scores: RRF sums 1 / (60 + rank) over both rankings, while the
+        weighted fusion mixes min-max normalized scores, `alpha` for the dense side.
+        """
+        if not self.is_built:
+            raise ValueError("Vector store not built. Add documents first.")
+
+        if any(not query or not query.strip() for query in queries):
+            raise ValueError("Query cannot be empty")
 
-            return results
+        if not queries:
+            return []
+
+        candidates = top_k * HYBRID_CANDIDATE_FACTOR
+        try:
+            query_embeddings = self.embed_queries(queries)
+            dense_scores, dense_ids = self._index_search(query_embeddings, candidates)
         except Exception as e:
             raise RuntimeError(f"Error during vector search: {str(e)}")
 
+        with span("keyword_search"):
+            sparse_results = [self.sparse.search(query, candidates) for query in queries]
+
+        results = []
+        for score_row, id_row, sparse in zip(dense_scores, dense_ids, sparse_results):
+            valid = id_row != -1
+            fused = fuse(
+                (id_row[valid], score_row[valid]),
+                sparse,
+                top_k,
+                fusion,
+                alpha,
+            )
+            results.append(
+                [(self.chunks[idx], score) for idx, score in fused if idx < len(self.chunks)]
+            )
+        return results
+
     def similarity_search(self, query: str, k: int = 5) -> List[DocumentChunk]:
         """Search for similar documents (alias for search method that returns just chunks)"""
         results = self.search(query, top_k=k)
         return [chunk for chunk, score in results]
 
+    def _index_search(
+        self,
+        query_embeddings: np.ndarray,
+        top_k: int,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Run the FAISS search, overriding nprobe/efSearch for this call if given
+
+        Quantized indexes fetch `rerank_factor` times more candidates, which are then
+        re-scored with their exact float32 vectors.
+        """
+        rerank = self._can_rerank()
+        k = top_k * self.rerank_factor if rerank else top_k
+        params = search_params(self.index, nprobe, ef_search)
+        with span("index_search"):
+            if params is None:
+                scores, ids = self.index.search(query_embeddings, k)
+            else:
+                scores, ids = self.index.search(query_embeddings, k, params=params)
+        if not rerank:
+            return scores, ids
+        with span("exact_rerank"):
+            return rerank_exact(query_embeddings, ids, self.vectors.rows, top_k)
+
+    def evaluate_recall(
+        self,
+        queries: List[str],
+        top_k: int = 10,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ) -> Dict:
+        """Measure recall@k and latency of the current index against exact (flat) search"""
+        if not self.is_built:
+            raise ValueError("Vector store not built. Add documents first.")
+
+        query_embeddings = self.embed_queries(queries)
+
+        if self._can_rerank():
+            # Quantized codes are lossy: compare against the stored float32 vectors
+            ids = stored_ids(self.index)
+            vectors = self.vectors.rows(ids)
+        else:
+            ids, vectors = reconstruct_all(self.index)
+        exact_index = faiss.IndexIDMap(faiss.IndexFlatIP(self.dimension))
+        exact_index.add_with_ids(vectors, ids)
+
+        start = time.perf_counter()
+        _, exact_ids = exact_index.search(query_embeddings, top_k)
+        exact_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        _, approx_ids = self._index_search(query_embeddings, top_k, nprobe, ef_search)
+        approx_ms = (time.perf_counter() - start) * 1000
+
+        report = describe_index(self.index)
+        if nprobe and "nprobe" in report:
+            report["nprobe"] = min(nprobe, report["nlist"])
+        if ef_search and "ef_search" in report:
+            report["ef_search"] = ef_search
+        if self._can_rerank():
+            report["rerank_factor"] = self.rerank_factor
+        report.update(
+            {
+                "k": top_k,
+                "num_queries": len(queries),
+                "recall_at_k": recall_at_k(approx_ids, exact_ids),
+                "approx_ms_per_query": approx_ms / max(len(queries), 1),
+                "exact_ms_per_query": exact_ms / max(len(queries), 1),
+            }
+        )
+        return report
+
     def save(self, filepath: str):
         """Save vector store to disk"""
+        from .chunk_store import MappedChunks, append_chunk_segment, write_chunk_store
+
         save_dir = Path(filepath).parent
         save_dir.mkdir(exist_ok=True, parents=True)
 
-        # Save FAISS index
-        faiss.write_index(self.index, f"{filepath}.faiss")
-
-        # Save chunks and metadata
-        with open(f"{filepath}.pkl", "wb") as f:
-            pickle.dump(
-                {
-                    "chunks": self.chunks,
-                    "dimension": self.dimension,
-                    "model_name": "all-MiniLM-L6-v2",
-                },
-                f,
-            )
+        # Save FAISS index; replace the file atomically so processes that have the old one
+        # memory-mapped keep a valid mapping
+        if self.index is None:
+            self.index = with_ids(create_index(self.index_type, self.dimension, 0))
+        tmp_path = f"{filepath}.faiss.tmp"
+        faiss.write_index(self.index, tmp_path)
+        os.replace(tmp_path, f"{filepath}.faiss")
+        if self.mmap and not self._mapped:
+            # Serve the freshly written index from the shared mapping, freeing the private copy
+            self.index = with_ids(read_index(f"{filepath}.faiss", mmap=True))
+            set_search_defaults(self.index, self.nprobe, self.ef_search)
+            self._mapped = True
+
+        # Exact vectors for reranking; a store that no longer keeps them drops the stale file
+        vectors_path = Path(f"{filepath}.vectors")
+        if self.vectors is not None:
+            self.vectors.save(str(vectors_path))
+        elif vectors_path.exists():
+            vectors_path.unlink()
+
+        # Save chunks and metadata as a memory-mappable columnar store
+        chunks_path = f"{filepath}.chunks"
+        metadata = {
+            "dimension": self.dimension,
+            "model_name": self.model_name,
+            "index_type": self.index_type,
+            "deleted_ids": sorted(self.deleted_ids),
+        }
+        if (
+            isinstance(self.chunks, MappedChunks)
+            and self.chunks.path == Path(chunks_path)
+            and self.chunks.manifest.get("version") != 1
+        ):
+            # Chunks are append-only, so only the rows added since loading are written
+            append_chunk_segment(chunks_path, self.chunks.pending, metadata=metadata)
+        else:
+            write_chunk_store(chunks_path, self.chunks, metadata=metadata)
+        self.chunks = MappedChunks(chunks_path)
+        self.sparse.save(f"{filepath}.bm25")
+        self.query_cache.save()
         print(f"[+] Vector store saved to {filepath}")
 
     def load(self, filepath: str):
         """Load vector store from disk"""
-        # Load FAISS index
-        self.index = faiss.read_index(f"{filepath}.faiss")
+        from .chunk_store import MappedChunks, recover_chunk_store
+
+        # Load FAISS index, memory-mapped in serving mode so workers share its pages
+        self.index = with_ids(read_index(f"{filepath}.faiss", mmap=self.mmap))
+        self._mapped = self.mmap
 
-        # Load chunks and metadata
-        with open(f"{filepath}.pkl", "rb") as f:
-            data = pickle.load(f)
+        # Map chunk storage; chunks are materialized lazily as search hits are returned
+        recover_chunk_store(f"{filepath}.chunks")
+        if Path(f"{filepath}.chunks").is_dir():
+            self.chunks = MappedChunks(f"{filepath}.chunks")
+            data = self.chunks.metadata
+        else:
+            # Legacy pickle format
+            with open(f"{filepath}.pkl", "rb") as f:
+                data = pickle.load(f)
             self.chunks = data["chunks"]
-            self.dimension = data["dimension"]
+
+        self.dimension = data["dimension"]
+        self.index_type = data.get("index_type", index_type_of(self.index))
+        self.deleted_ids = set(data.get("deleted_ids", []))
+        self._load_vectors(f"{filepath}.vectors")
+        self._load_sparse(f"{filepath}.bm25")
+        set_search_defaults(self.index, self.nprobe, self.ef_search)
 
         self.is_built = True
         print(f"[+] Vector store loaded from {filepath}")
+
+    def _load_sparse(self, path: str):
+        """Load the BM25 index, rebuilding it from the chunks if it is missing or stale"""
+        if Path(path).is_dir():
+            self.sparse = BM25Index.load(path)
+            if len(self.sparse) == len(self.chunks):
+                return
+
+        print(f"[*] Building keyword index for {len(self.chunks)} chunks...")
+        self.sparse = BM25Index()
+        batch_size = 10_000
+        for start in range(0, len(self.chunks), batch_size):
+            ids = list(range(start, min(start + batch_size, len(self.chunks))))
+            self.sparse.add(ids, [self.chunks[i].text for i in ids])
+        # Tombstoned rows keep their IDs so the keyword index lines up with the chunks
+        self.sparse.remove(self.deleted_ids)
+
+    def _load_vectors(self, path: str):
+        """Map the saved float32 vectors, if they match the loaded chunks"""
+        if self.vectors is not None:
+            self.vectors.close()
+        self.vectors = None
+        if not self._keeps_vectors():
+            return
+
+        if Path(path).exists():
+            vectors = VectorFile(self.dimension, path)
+            if len(vectors) == len(self.chunks):
+                self.vectors = vectors
+                return
+            print(f"[!] {path} does not match the index; rebuild to enable reranking")
+        elif index_type_of(self.index) in QUANTIZED_TYPES:
+            print("[i] No float32 vectors saved with this index; rebuild to enable reranking")
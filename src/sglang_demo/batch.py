@@ -0,0 +1,231 @@
+"""
+Batch Query Mode
+Answer a JSONL file of questions into a JSONL file of answers, resumably
+
+Each input line is a JSON object with a "query" (or "question") and an optional "id"; lines
+without an id are identified by their line number. Questions are read as a stream, retrieved
+in windows with one embedding pass and one index search each, and answered by concurrent LLM
+calls. Every answer is appended to the output as soon as it completes, so an interrupted run
+picks up where it stopped: questions already answered without error are skipped.
+"""
+
+import contextlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from rag_system.llm_providers import ALL_PROVIDERS_FAILED
+from rag_system.rate_limiter import PRIORITY_BATCH
+
+# Questions retrieved per embedding pass and index search
+SEARCH_BATCH_SIZE = 256
+
+# Seconds between progress lines
+PROGRESS_INTERVAL = 10.0
+
+
+def read_questions(path: str) -> Iterator[Tuple[object, str]]:
+    """(id, query) for each non-blank line of a JSONL file"""
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_number}: invalid JSON ({e.msg})")
+            if not isinstance(record, dict):
+                raise ValueError(f"{path}:{line_number}: expected a JSON object")
+            query = record.get("query", record.get("question", ""))
+            yield record.get("id", line_number), query if isinstance(query, str) else ""
+
+
+def load_completed(path: str) -> Set[str]:
+    """IDs answered without error in an existing output file
+
+    Rows with an error, and a last line cut short by an interrupted write, are removed from
+    the file so that those questions are answered again rather than duplicated.
+    """
+    out_path = Path(path)
+    if not out_path.exists():
+        return set()
+
+    completed: Set[str] = set()
+    kept: List[str] = []
+    dropped = 0
+    with open(out_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                dropped += 1
+                continue
+            if not line.endswith("\n") or "error" in record:
+                dropped += 1
+                continue
+            completed.add(str(record.get("id")))
+            kept.append(line)
+
+    if dropped:
+        tmp_path = out_path.with_name(out_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(kept)
+        os.replace(tmp_path, out_path)
+    return completed
+
+
+class BatchRunner:
+    """Answers a stream of questions with bounded LLM concurrency, writing results as they land"""
+
+    def __init__(
+        self,
+        rag,
+        provider: str = "groq",
+        top_k: int = 3,
+        max_workers: int = 5,
+        search_batch_size: int = SEARCH_BATCH_SIZE,
+        verbose: bool = False,
+    ):
+        self.rag = rag
+        self.provider = provider
+        self.top_k = top_k
+        self.max_workers = max_workers
+        self.search_batch_size = search_batch_size
+        self.verbose = verbose
+        self.stats = {"answered": 0, "errors": 0, "skipped": 0, "duplicates": 0}
+        self._latencies: List[float] = []
+        self._log = sys.stdout
+        self._last_progress = 0.0
+        self._start_time = 0.0
+
+    def run(self, in_path: str, out_path: str) -> Dict:
+        """Answer every question in `in_path` not already answered in `out_path`"""
+        completed = load_completed(out_path)
+        Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+        self._start_time = self._last_progress = time.perf_counter()
+        self._log = sys.stdout
+
+        with contextlib.ExitStack() as stack:
+            out = stack.enter_context(open(out_path, "a", encoding="utf-8"))
+            if not self.verbose:
+                # Per-question pipeline logging would drown the progress lines
+                devnull = stack.enter_context(open(os.devnull, "w"))
+                stack.enter_context(contextlib.redirect_stdout(devnull))
+            executor = stack.enter_context(ThreadPoolExecutor(max_workers=self.max_workers))
+
+            in_flight: Dict[Future, Tuple[object, str]] = {}
+            window: List[Tuple[object, str]] = []
+            seen: Set[str] = set()
+            try:
+                for question_id, query in read_questions(in_path):
+                    key = str(question_id)
+                    if key in seen:
+                        # One output row per id: later questions with the same id are dropped
+                        self.stats["duplicates"] += 1
+                        print(
+                            f"[!] Duplicate id {question_id!r} in {in_path}; only its first "
+                            "question is answered",
+                            file=self._log,
+                            flush=True,
+                        )
+                        continue
+                    seen.add(key)
+                    if key in completed:
+                        self.stats["skipped"] += 1
+                        continue
+                    window.append((question_id, query))
+                    if len(window) >= self.search_batch_size:
+                        self._submit(window, executor, in_flight, out)
+                        window = []
+                        # Keep reading only while the LLM calls keep up
+                        while len(in_flight) > self.search_batch_size + self.max_workers:
+                            self._collect(in_flight, out)
+                if window:
+                    self._submit(window, executor, in_flight, out)
+                while in_flight:
+                    self._collect(in_flight, out)
+            except KeyboardInterrupt:
+                # Answers written so far are kept; the rest are asked again on the next run
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+
+        return self.summary()
+
+    def _submit(self, window, executor: ThreadPoolExecutor, in_flight: Dict, out):
+        """Retrieve for a window of questions at once and queue their LLM calls"""
+        valid = [(question_id, query) for question_id, query in window if query.strip()]
+        for question_id, query in window:
+            if not query.strip():
+                self._write(out, question_id, self._error(query, "Empty or invalid query"))
+
+        if not valid:
+            return
+        try:
+            batch_docs = self.rag.search_batch([query for _, query in valid], top_k=self.top_k)
+        except Exception as e:
+            for question_id, query in valid:
+                self._write(out, question_id, self._error(query, f"Search error: {str(e)}"))
+            return
+
+        for (question_id, query), docs in zip(valid, batch_docs):
+            future = executor.submit(self._answer, query, docs)
+            in_flight[future] = (question_id, query)
+
+    def _answer(self, query: str, docs) -> Tuple[Dict, float]:
+        start_time = time.perf_counter()
+        result = self.rag.generate_answer_from_docs(query, docs, self.provider, PRIORITY_BATCH)
+        if result.get("answer") == ALL_PROVIDERS_FAILED and "error" not in result:
+            # Mark it so a resumed run asks again instead of keeping the failure as an answer
+            result = {**result, "error": "No provider answered"}
+        return result, time.perf_counter() - start_time
+
+    def _collect(self, in_flight: Dict, out):
+        """Wait for at least one LLM call and write the answers of all finished ones"""
+        done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+        for future in done:
+            question_id, query = in_flight.pop(future)
+            try:
+                result, latency = future.result()
+                self._latencies.append(latency)
+            except Exception as e:
+                result = self._error(query, f"LLM error: {str(e)}")
+            self._write(out, question_id, result)
+
+    @staticmethod
+    def _error(query: str, error: str) -> Dict:
+        return {"answer": "", "sources": [], "query": query, "error": error}
+
+    def _write(self, out, question_id, result: Dict):
+        out.write(json.dumps({"id": question_id, **result}) + "\n")
+        out.flush()
+        self.stats["errors" if "error" in result else "answered"] += 1
+
+        now = time.perf_counter()
+        if now - self._last_progress >= PROGRESS_INTERVAL:
+            self._last_progress = now
+            done = self.stats["answered"] + self.stats["errors"]
+            rate = done / (now - self._start_time)
+            print(f"[i] {done} questions done ({rate:.1f}/s)", file=self._log, flush=True)
+
+    def summary(self) -> Dict:
+        """Counts, throughput and LLM latency percentiles of the run"""
+        elapsed = time.perf_counter() - self._start_time
+        done = self.stats["answered"] + self.stats["errors"]
+        latencies = sorted(self._latencies)
+
+        def percentile(q: float) -> Optional[float]:
+            return (
+                latencies[min(len(latencies) - 1, int(q * len(latencies)))] if latencies else None
+            )
+
+        return {
+            **self.stats,
+            "elapsed_seconds": elapsed,
+            "questions_per_second": done / elapsed if elapsed > 0 else 0.0,
+            "latency_p50": percentile(0.5),
+            "latency_p95": percentile(0.95),
+        }
@@ -12,7 +12,6 @@ src_path = Path(__file__).parent.parent
 sys.path.insert(0, str(src_path))
 
 from config import config
-from rag_system import RAGSystem
 
 
 def main():
@@ -25,7 +24,10 @@ Examples:
   sglang-rag                        # Interactive demo
   sglang-rag --query "What is RAG?" # Single query
   sglang-rag --build-index          # Rebuild vector index
+  sglang-rag --incremental          # Re-embed only new/changed documents
   sglang-rag --stats                # Show system statistics
+  sglang-rag --serve                # Keep model and index warm for later queries
+  sglang-rag --batch q.jsonl --out a.jsonl  # Answer a file of questions (resumable)
         """,
     )
 
@@ -35,15 +37,22 @@ Examples:
         "--provider",
         "-p",
         type=str,
-        choices=["groq", "together"],
+        choices=["groq", "together", "auto"],
         default=config.default_provider,
-        help="LLM provider to use",
+        help="LLM provider to use (auto: fastest healthy provider, hedged)",
     )
 
     parser.add_argument(
         "--build-index", "-b", action="store_true", help="Force rebuild of vector index"
     )
 
+    parser.add_argument(
+        "--incremental",
+        "-i",
+        action="store_true",
+        help="Update the index with only new, changed and deleted documents",
+    )
+
     parser.add_argument("--stats", "-s", action="store_true", help="Show system statistics")
 
     parser.add_argument(
@@ -51,29 +60,102 @@ Examples:
     )
 
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
+
+    parser.add_argument(
+        "--no-stream", action="store_true", help="Print the answer only once it is complete"
+    )
     
     parser.add_argument(
         "--multi-perspective", "-m", action="store_true", 
         help="Use SGLang multi-perspective analysis"
     )
 
-    args = parser.parse_args()
+    parser.add_argument(
+        "--batch",
+        type=str,
+        metavar="QUESTIONS_JSONL",
+        help='Answer every {"id": ..., "query": ...} line of a JSONL file',
+    )
 
-    try:
-        # Initialize RAG system
-        print(f"[*] Initializing {config.app_name} v{config.app_version}")
+    parser.add_argument(
+        "--out",
+        type=str,
+        metavar="ANSWERS_JSONL",
+        help="Output file for --batch; questions already answered in it are skipped",
+    )
 
-        rag = RAGSystem(
-            docs_dir=args.docs_dir, vector_store_path=f"{config.vector_index_dir}/knowledge_base"
-        )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=config.max_concurrent_calls,
+        help="Concurrent LLM calls in --batch mode",
+    )
+
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help=f"Run a daemon on {config.daemon_socket or 'DAEMON_SOCKET'} that keeps the "
+        "embedding model and index loaded for later --query calls",
+    )
+
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Answer in this process even if a daemon is running",
+    )
+
+    args = parser.parse_args()
+    if args.batch and not args.out:
+        parser.error("--batch requires --out")
+    vector_store_path = f"{config.vector_index_dir}/knowledge_base"
+
+    if args.serve:
+        from sglang_demo.daemon import serve
 
-        # Build index
+        if not config.daemon_socket:
+            print("[!] Set DAEMON_SOCKET to run the daemon.")
+            return 1
         try:
-            rag.build_index(force_rebuild=args.build_index)
+            serve(config.daemon_socket, args.docs_dir, vector_store_path)
+        except KeyboardInterrupt:
+            pass
+        except ImportError as e:
+            print(f'[!] The daemon needs the API extras ({e}): pip install -e ".[api]"')
+            return 1
         except Exception as e:
-            print(f"[!] Error building index: {e}")
-            print("[!] Please check your documents directory and try again.")
+            print(f"[!] Daemon error: {e}")
             return 1
+        return 0
+
+    try:
+        rag = None
+        local_only = (
+            args.no_daemon or args.build_index or args.incremental or args.stats or args.batch
+        )
+        if args.query and not local_only:
+            # A warm daemon answers in milliseconds; without one, load everything here
+            from sglang_demo.daemon import connect
+
+            rag = connect(config.daemon_socket, args.docs_dir, vector_store_path)
+
+        if rag is None:
+            # Imported after argument parsing so --help never waits for the ML stack
+            from rag_system import RAGSystem
+
+            # Initialize RAG system
+            print(f"[*] Initializing {config.app_name} v{config.app_version}")
+
+            rag = RAGSystem(docs_dir=args.docs_dir, vector_store_path=vector_store_path)
+
+            # Build index
+            try:
+                rag.build_index(force_rebuild=args.build_index, incremental=args.incremental)
+            except Exception as e:
+                print(f"[!] Error building index: {e}")
+                print("[!] Please check your documents directory and try again.")
+                return 1
+        elif args.verbose:
+            print(f"[*] Using the daemon on {config.daemon_socket}")
 
         if args.stats:
             try:
@@ -84,6 +166,9 @@ Examples:
                 print(f"[!] Error showing statistics: {e}")
                 return 1
 
+        if args.batch:
+            return run_batch(rag, args)
+
         if args.query:
             if not args.query.strip():
                 print("[!] Please provide a non-empty query.")
@@ -102,6 +187,9 @@ Examples:
                     
                     print("\n[+] Synthesized Answer:")
                     print(result["answer"])
+                    if result.get("missing_perspectives"):
+                        missing = ", ".join(result["missing_perspectives"])
+                        print(f"[i] Synthesized without: {missing}")
                     
                     if args.verbose and "perspectives" in result:
                         print("\n[+] Individual Perspectives:")
@@ -112,6 +200,8 @@ Examples:
                         print(f"\n[i] Sources ({len(result['sources'])}):")
                         for i, source in enumerate(result["sources"], 1):
                             print(f"   {i}. {source['file']} (score: {source['score']:.3f})")
+                elif not args.no_stream:
+                    return print_streamed_answer(rag, args.query, args.provider, args.verbose)
                 else:
                     result = rag.generate_answer(args.query, provider=args.provider)
 
@@ -126,6 +216,8 @@ Examples:
                         print(f"\n[i] Sources ({len(result['sources'])}):")
                         for i, source in enumerate(result["sources"], 1):
                             print(f"   {i}. {source['file']} (score: {source['score']:.3f})")
+                        if "timings" in result:
+                            print_timings(result["timings"])
             except Exception as e:
                 print(f"[!] Error processing query: {e}")
                 return 1
@@ -144,6 +236,75 @@ Examples:
     return 0
 
 
+def run_batch(rag, args) -> int:
+    """Answer the --batch file into --out and print throughput; returns the exit code"""
+    from sglang_demo.batch import BatchRunner
+
+    print(f"\n[*] Answering {args.batch} into {args.out} ({args.concurrency} concurrent calls)")
+    runner = BatchRunner(
+        rag,
+        provider=args.provider,
+        top_k=config.top_k_results,
+        max_workers=args.concurrency,
+        verbose=args.verbose,
+    )
+    try:
+        stats = runner.run(args.batch, args.out)
+    except KeyboardInterrupt:
+        print("\n[!] Interrupted; run the same command again to resume")
+        return 130
+    except (OSError, ValueError) as e:
+        print(f"[!] Batch error: {e}")
+        return 1
+
+    print(f"[+] {stats['answered']} answered, {stats['errors']} errors, {stats['skipped']} skipped")
+    if stats["duplicates"]:
+        print(f"[!] {stats['duplicates']} questions with a duplicate id were not answered")
+    print(
+        f"[i] {stats['elapsed_seconds']:.1f}s, {stats['questions_per_second']:.2f} questions/s"
+    )
+    if stats["latency_p50"] is not None:
+        print(
+            f"[i] LLM latency p50 {stats['latency_p50']:.2f}s, p95 {stats['latency_p95']:.2f}s"
+        )
+    return 1 if stats["errors"] else 0
+
+
+def print_timings(timings: dict):
+    """Print the per-stage latency breakdown of an answer (TRACING=true)"""
+    print(f"\n[i] Timings ({timings['total'] * 1000:.1f}ms total):")
+    for entry in timings["spans"]:
+        labels = ", ".join(f"{k}={v}" for k, v in entry.items() if k not in ("name", "seconds"))
+        suffix = f" ({labels})" if labels else ""
+        print(f"   {entry['name']}: {entry['seconds'] * 1000:.1f}ms{suffix}")
+
+
+def print_streamed_answer(rag, query: str, provider: str, verbose: bool = False) -> int:
+    """Print an answer token by token as it is generated; returns the exit code
+
+    `rag` is a RAGSystem or a DaemonClient; both stream the same events.
+    """
+    sources = []
+    for event in rag.stream_answer(query, provider=provider):
+        if event["type"] == "sources":
+            sources = event["sources"]
+            print("\n[+] Answer:")
+        elif event["type"] == "token":
+            print(event["text"], end="", flush=True)
+        elif event["type"] == "error":
+            print(f"[!] Error: {event['error']}")
+            return 1
+        elif event["type"] == "done":
+            print()
+            if verbose:
+                if event.get("time_to_first_token") is not None:
+                    print(f"[i] Time to first token: {event['time_to_first_token']:.2f}s")
+                print(f"\n[i] Sources ({len(sources)}):")
+                for i, source in enumerate(sources, 1):
+                    print(f"   {i}. {source['file']} (score: {source['score']:.3f})")
+    return 0
+
+
 def web_main():
     """Launches Streamlit application with the web interface components"""
     import subprocess
@@ -0,0 +1,156 @@
+"""
+CLI Daemon
+Keeps the embedding model and vector index warm in one process and answers CLI queries over a
+Unix socket
+
+The daemon serves the HTTP API (web.api) on the socket instead of a TCP port. DaemonClient
+offers the query methods of RAGSystem that the CLI uses, so a `sglang-rag --query` call only
+pays for the HTTP round trip when a daemon is running. Its health reply names the documents
+and saved index version it serves, so clients skip a daemon started for other documents or
+before the index was rebuilt.
+"""
+
+import json
+import os
+import socket
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+# Seconds to wait for the daemon to accept a connection and answer a health check
+CONNECT_TIMEOUT = 1.0
+
+
+class DaemonClient:
+    """Stand-in for RAGSystem that sends queries to a running daemon"""
+
+    def __init__(self, socket_path: str):
+        import httpx
+
+        self.socket_path = socket_path
+        self._http = httpx.Client(
+            transport=httpx.HTTPTransport(uds=socket_path),
+            base_url="http://sglang-rag",
+            # LLM calls can take a while; only connecting is bounded
+            timeout=httpx.Timeout(None, connect=CONNECT_TIMEOUT),
+        )
+
+    def health(self) -> Optional[Dict]:
+        """The daemon's health reply, or None unless it is up and has an index to search"""
+        import httpx
+
+        try:
+            response = self._http.get("/health", timeout=CONNECT_TIMEOUT)
+        except httpx.HTTPError:
+            return None
+        return response.json() if response.status_code == 200 else None
+
+    def _post(self, path: str, query: str, provider: str) -> Dict:
+        response = self._http.post(path, json={"query": query, "provider": provider})
+        result = response.json()
+        if response.status_code == 400:
+            raise ValueError(result["error"])
+        return result
+
+    def generate_answer(self, query: str, provider: str = "groq") -> Dict:
+        """Answer a query in the daemon; same result shape as RAGSystem.generate_answer"""
+        return self._post("/query", query, provider)
+
+    def generate_multi_perspective_answer(self, query: str, provider: str = "groq") -> Dict:
+        """Multi-perspective analysis in the daemon"""
+        return self._post("/multi-perspective", query, provider)
+
+    def stream_answer(self, query: str, provider: str = "groq") -> Iterator[Dict]:
+        """Stream answer events from the daemon, as RAGSystem.stream_answer yields them"""
+        with self._http.stream(
+            "POST", "/query/stream", json={"query": query, "provider": provider}
+        ) as response:
+            if response.status_code != 200:
+                response.read()
+                yield {"type": "error", "error": response.json()["error"]}
+                return
+            for line in response.iter_lines():
+                if line.startswith("data: "):
+                    yield json.loads(line[len("data: ") :])
+
+    def close(self):
+        self._http.close()
+
+
+def _saved_index_version(vector_store_path: str) -> Optional[int]:
+    """Version of the index saved at `vector_store_path`, as RAGSystem reports it"""
+    try:
+        return os.stat(f"{vector_store_path}.faiss").st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _serves(health: Dict, docs_dir: str, vector_store_path: str) -> bool:
+    """Whether the daemon answers from these documents and the index currently saved"""
+    if health.get("docs_dir") != str(Path(docs_dir).resolve()):
+        print(f"[i] The daemon serves {health.get('docs_dir')}; answering in this process")
+        return False
+    if health.get("vector_store_path") != str(Path(vector_store_path).resolve()):
+        print("[i] The daemon serves another vector index; answering in this process")
+        return False
+    if health.get("index_version") != _saved_index_version(vector_store_path):
+        print("[i] The index changed since the daemon loaded it; answering in this process")
+        return False
+    return True
+
+
+def connect(
+    socket_path: str, docs_dir: Optional[str] = None, vector_store_path: Optional[str] = None
+) -> Optional[DaemonClient]:
+    """Client for the daemon listening on `socket_path`, or None if none is running
+
+    With `docs_dir` and `vector_store_path`, also None unless the daemon serves those
+    documents from the index currently saved there; a daemon started before a rebuild
+    would answer from the old index.
+    """
+    if not socket_path or not Path(socket_path).exists():
+        return None
+    client = DaemonClient(socket_path)
+    health = client.health()
+    if health is not None and (
+        docs_dir is None or _serves(health, docs_dir, vector_store_path or "")
+    ):
+        return client
+    client.close()
+    return None
+
+
+def serve(socket_path: str, docs_dir: str, vector_store_path: str):
+    """Load the index and models once, then answer queries on `socket_path` until stopped"""
+    import uvicorn
+
+    from rag_system import RAGSystem
+    from web.api import create_app
+
+    path = Path(socket_path)
+    if path.exists():
+        if connect(socket_path) is not None:
+            raise RuntimeError(f"A daemon is already listening on {socket_path}")
+        # Left behind by a daemon that did not shut down cleanly
+        path.unlink()
+
+    rag = RAGSystem(docs_dir=docs_dir, vector_store_path=vector_store_path)
+    rag.build_index()
+    rag.warm_up()
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # Owner-only from the moment it exists: the daemon answers with this user's API keys
+    umask = os.umask(0o177)
+    try:
+        listener.bind(str(path))
+    finally:
+        os.umask(umask)
+
+    server = uvicorn.Server(uvicorn.Config(create_app(rag, serves_paths=True), log_level="warning"))
+    print(f"[+] Daemon listening on {socket_path} (Ctrl+C to stop)")
+    try:
+        server.run(sockets=[listener])
+    finally:
+        listener.close()
+        path.unlink(missing_ok=True)
+        print("[*] Daemon stopped")
@@ -4,23 +4,34 @@ Async and concurrent execution for LLM operations
 """
 
 import asyncio
-import time
-from typing import Any, Callable, Coroutine, List
+import weakref
+from typing import Any, Coroutine, List
+
 
 class ParallelProcessor:
     """Handle parallel and async LLM operations"""
 
     def __init__(self, max_concurrent: int = 5):
         self.max_concurrent = max_concurrent
-        self.semaphore = asyncio.Semaphore(max_concurrent)
+        # asyncio primitives bind to one event loop, so keep a semaphore per loop
+        self._semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """Concurrency limit shared by all tasks on the running event loop"""
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphores[loop]
+
+    async def run(self, task: Coroutine) -> Any:
+        """Await a single task under the shared concurrency limit"""
+        async with self.semaphore:
+            return await task
 
     async def execute_parallel(self, tasks: List[Coroutine]) -> List[Any]:
         """Execute multiple async tasks in parallel with concurrency control"""
-        async def bounded_task(task):
-            async with self.semaphore:
-                return await task
-        bounded_tasks = [bounded_task(task) for task in tasks]
-        return await asyncio.gather(*bounded_tasks)
+        return await asyncio.gather(*(self.run(task) for task in tasks))
 
     async def execute_with_timeout(self, task: Coroutine, timeout: float = 30.0) -> Any:
         """Execute task with timeout"""
@@ -30,14 +41,15 @@ class ParallelProcessor:
             raise TimeoutError(f"Task timed out after {timeout} seconds")
 
     async def execute_batch(self, tasks: List[Coroutine], batch_size: int = None) -> List[Any]:
-        """Execute tasks in batches to manage memory and API limits"""
+        """Execute tasks in batches to manage memory
+
+        Provider rate limits are enforced per call by the LLM rate limiter, so batches run
+        back to back instead of pausing between them.
+        """
         if batch_size is None:
             batch_size = self.max_concurrent
         results = []
         for i in range(0, len(tasks), batch_size):
             batch = tasks[i : i + batch_size]
-            batch_results = await self.execute_parallel(batch)
-            results.extend(batch_results)
-            if i + batch_size < len(tasks):
-                await asyncio.sleep(0.1)
+            results.extend(await self.execute_parallel(batch))
         return results
@@ -0,0 +1,215 @@
+"""
+HTTP API for SGLang RAG System
+Async JSON and server-sent-event endpoints for serving and load testing
+"""
+
+import asyncio
+import json
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+# Add src to path for imports
+src_path = Path(__file__).parent.parent
+sys.path.insert(0, str(src_path))
+
+from config import config
+from rag_system import RAGSystem
+from rag_system.tracing import OPENMETRICS_CONTENT_TYPE, REGISTRY
+
+PROVIDERS = ("groq", "together", "auto")
+
+
+class RequestError(ValueError):
+    """Invalid request body; reported to the client as HTTP 400"""
+
+
+async def _read_request(request: Request) -> Dict:
+    """Parse and validate the JSON body shared by the query endpoints"""
+    try:
+        body = await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise RequestError("Request body must be JSON")
+    if not isinstance(body, dict):
+        raise RequestError("Request body must be a JSON object")
+
+    query = body.get("query")
+    if not isinstance(query, str) or not query.strip():
+        raise RequestError("'query' must be a non-empty string")
+
+    provider = body.get("provider", config.default_provider)
+    if provider not in PROVIDERS:
+        raise RequestError(f"'provider' must be one of: {', '.join(PROVIDERS)}")
+
+    top_k = body.get("top_k", config.top_k_results)
+    if not isinstance(top_k, int) or isinstance(top_k, bool) or not 1 <= top_k <= 100:
+        raise RequestError("'top_k' must be an integer between 1 and 100")
+
+    return {"query": query, "provider": provider, "top_k": top_k}
+
+
+def _endpoint(handler):
+    """Run a handler within the request concurrency limit, mapping bad input to HTTP 400"""
+
+    async def endpoint(request: Request):
+        try:
+            params = await _read_request(request)
+        except RequestError as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        async with request.app.state.slots:
+            return await handler(request.app.state.rag, params)
+
+    return endpoint
+
+
+async def search(rag: RAGSystem, params: Dict) -> JSONResponse:
+    try:
+        results = await rag.asearch(params["query"], params["top_k"])
+    except Exception as e:
+        return JSONResponse({"error": f"Search error: {str(e)}"}, status_code=500)
+    return JSONResponse(
+        {
+            "query": params["query"],
+            "results": [
+                {
+                    "file": chunk.source_file,
+                    "chunk_id": chunk.id,
+                    "score": score,
+                    "text": chunk.text,
+                }
+                for chunk, score in results
+            ],
+        }
+    )
+
+
+async def query(rag: RAGSystem, params: Dict) -> JSONResponse:
+    result = await rag.generate_answer_async(params["query"], params["provider"], params["top_k"])
+    return JSONResponse(result, status_code=500 if "error" in result else 200)
+
+
+async def multi_perspective(rag: RAGSystem, params: Dict) -> JSONResponse:
+    result = await rag.agenerate_multi_perspective_answer(
+        params["query"], params["provider"], params["top_k"]
+    )
+    return JSONResponse(result, status_code=500 if "error" in result else 200)
+
+
+async def query_stream(request: Request) -> StreamingResponse:
+    """Server-sent events: one `data:` line per sources/token/done/error event"""
+    try:
+        params = await _read_request(request)
+    except RequestError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+    rag = request.app.state.rag
+    slots = request.app.state.slots
+
+    async def events() -> AsyncIterator[str]:
+        async with slots:
+            async for event in rag.astream_answer(
+                params["query"], params["provider"], params["top_k"]
+            ):
+                yield f"data: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def health(request: Request) -> JSONResponse:
+    rag = request.app.state.rag
+    store = rag.vector_store
+    status = {
+        "status": "ok" if store.is_built else "no_index",
+        "vectors": store.index.ntotal if store.index is not None else 0,
+        "providers": rag.llm.list_available_providers(),
+        "max_concurrent": config.max_concurrent_calls,
+    }
+    if request.app.state.serves_paths:
+        # Only on the daemon's owner-only socket: lets a CLI client check that it would get
+        # answers from its own documents, without exposing the filesystem layout over TCP
+        status["docs_dir"] = str(Path(rag.docs_dir).resolve())
+        status["vector_store_path"] = str(Path(rag.vector_store_path).resolve())
+        status["index_version"] = rag.index_version
+    return JSONResponse(status, status_code=200 if store.is_built else 503)
+
+
+async def metrics(request: Request) -> Response:
+    """Stage latency histograms in the OpenMetrics text format (empty unless TRACING=true)"""
+    return Response(REGISTRY.render_openmetrics(), media_type=OPENMETRICS_CONTENT_TYPE)
+
+
+def create_app(rag: Optional[RAGSystem] = None, serves_paths: bool = False) -> Starlette:
+    """Build the API around one RAGSystem, loaded once and shared by every request
+
+    `serves_paths` adds the documents and index paths to /health, for the CLI daemon.
+    """
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        if app.state.rag is None:
+            # Several worker processes share one copy of the index through the page cache
+            system = RAGSystem(mmap=config.vector_mmap or config.api_workers > 1)
+            # Load (or build) the index and the models off the event loop
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, system.build_index)
+            await loop.run_in_executor(None, system.warm_up)
+            app.state.rag = system
+        # Requests beyond the limit wait for a slot rather than overloading the providers
+        app.state.slots = asyncio.Semaphore(config.max_concurrent_calls)
+        yield
+
+    app = Starlette(
+        routes=[
+            Route("/health", health, methods=["GET"]),
+            Route("/metrics", metrics, methods=["GET"]),
+            Route("/search", _endpoint(search), methods=["POST"]),
+            Route("/query", _endpoint(query), methods=["POST"]),
+            Route("/query/stream", query_stream, methods=["POST"]),
+            Route("/multi-perspective", _endpoint(multi_perspective), methods=["POST"]),
+        ],
+        lifespan=lifespan,
+    )
+    app.state.rag = rag
+    app.state.serves_paths = serves_paths
+    return app
+
+
+def _build_missing_index():
+    """Build the saved index in this process if there is none yet
+
+    Worker processes then all load the same files instead of each building the index at
+    once, writing over one another's temporary files.
+    """
+    system = RAGSystem()
+    if not Path(f"{system.vector_store_path}.faiss").exists():
+        system.build_index()
+
+
+def run_api():
+    """Entry point for console script"""
+    import uvicorn
+
+    if config.api_workers > 1:
+        _build_missing_index()
+
+    uvicorn.run(
+        "web.api:create_app",
+        factory=True,
+        host=config.api_host,
+        port=config.api_port,
+        workers=config.api_workers,
+    )
+
+
+if __name__ == "__main__":
+    run_api()
@@ -26,6 +26,34 @@ def initialize_rag_system():
         return None, str(e)
 
 
+def render_streamed_answer(rag: RAGSystem, query: str, provider: str):
+    """Render the answer incrementally as tokens arrive, with sources shown as soon as known"""
+    st.subheader("📝 Answer")
+    answer_box = st.empty()
+    answer_box.markdown("_Retrieving documents..._")
+    answer = ""
+
+    for event in rag.stream_answer(query, provider):
+        if event["type"] == "sources":
+            answer_box.markdown("_Generating answer..._")
+            if event["sources"]:
+                st.subheader("📚 Sources")
+                for i, source in enumerate(event["sources"], 1):
+                    with st.expander(f"Source {i}"):
+                        st.text(source.get("preview", "No preview"))
+                        st.caption(f"Score: {source.get('score', 0):.3f}")
+        elif event["type"] == "token":
+            answer += event["text"]
+            answer_box.markdown(answer + "▌")
+        elif event["type"] == "error":
+            answer_box.empty()
+            st.error(f"Error: {event['error']}")
+        elif event["type"] == "done":
+            answer_box.markdown(event["answer"] or "No answer generated")
+            if event.get("time_to_first_token") is not None:
+                st.caption(f"Time to first token: {event['time_to_first_token']:.2f}s")
+
+
 def main():
     """Main Streamlit application"""
     st.set_page_config(page_title=config.app_name, page_icon="🤖", layout="wide")
@@ -39,10 +67,13 @@ def main():
     with st.sidebar:
         st.header("Configuration")
 
+        providers = ["groq", "together", "auto"]
         provider = st.selectbox(
             "LLM Provider",
-            options=["groq", "together"],
-            index=0 if config.default_provider == "groq" else 1,
+            options=providers,
+            index=providers.index(config.default_provider)
+            if config.default_provider in providers
+            else 0,
         )
 
         st.markdown("---")
@@ -74,23 +105,10 @@ def main():
         # Process query
         if st.button("🔍 Get Answer", type="primary"):
             if query.strip():
-                with st.spinner("Processing..."):
-                    try:
-                        rag = st.session_state.rag_system
-                        response = rag.generate_answer(query, provider)
-
-                        st.subheader("📝 Answer")
-                        st.write(response.get("answer", "No answer generated"))
-
-                        if "sources" in response and response["sources"]:
-                            st.subheader("📚 Sources")
-                            for i, source in enumerate(response["sources"], 1):
-                                with st.expander(f"Source {i}"):
-                                    st.text(source.get("preview", "No preview"))
-                                    st.caption(f"Score: {source.get('score', 0):.3f}")
-
-                    except Exception as e:
-                        st.error(f"Error: {str(e)}")
+                try:
+                    render_streamed_answer(st.session_state.rag_system, query, provider)
+                except Exception as e:
+                    st.error(f"Error: {str(e)}")
             else:
                 st.warning("Please enter a question.")
 
@@ -110,12 +128,17 @@ def main():
         if st.button("🔨 Rebuild Index"):
             with st.spinner("Rebuilding..."):
                 try:
-                    rag, error = initialize_rag_system()
-                    if error:
-                        st.error(f"Failed: {error}")
-                    else:
+                    rag = st.session_state.get("rag_system")
+                    if rag is None:
+                        rag, error = initialize_rag_system()
+                        if error:
+                            st.error(f"Failed: {error}")
+                            return
                         st.session_state.rag_system = rag
-                        st.success("Index rebuilt!")
+                    else:
+                        # Reuse the loaded model and pooled LLM connections; only re-index
+                        rag.build_index(force_rebuild=True)
+                    st.success("Index rebuilt!")
                 except Exception as e:
                     st.error(f"Error: {str(e)}")
 
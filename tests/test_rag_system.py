@@ -16,6 +16,35 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 from rag_system import DocumentChunk, DocumentProcessor, LLMProvider, VectorStore
 
 
+class WordHashModel:
+    """Offline stand-in for the sentence encoder: each word adds to one hashed dimension"""
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return 64
+
+    def encode(self, texts, normalize_embeddings=True, **kwargs):
+        import zlib
+
+        import numpy as np
+
+        embeddings = np.zeros((len(texts), 64), dtype="float32")
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                embeddings[row, zlib.crc32(word.encode()) % 64] += 1.0
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
+
+
+def make_chunks(texts, source_file="a.txt"):
+    """DocumentChunks for a list of texts"""
+    return [
+        DocumentChunk(
+            id=f"{source_file}-{i}", text=text, source_file=source_file, chunk_index=i, metadata={}
+        )
+        for i, text in enumerate(texts)
+    ]
+
+
 class TestVectorStore:
     """Tests for vector store initialization and document chunk operations"""
 
@@ -41,6 +70,784 @@ class TestVectorStore:
         assert chunk.source_file == "test.txt"
         assert chunk.metadata["word_count"] == 5
 
+    def test_embedding_model_loads_on_first_encode(self):
+        """Tests that indexing precomputed embeddings and searching them never loads the model"""
+        import numpy as np
+
+        store = VectorStore()
+        store.dimension = 8
+        embeddings = np.eye(8, dtype="float32")[:3]
+        chunks = [
+            DocumentChunk(
+                id=f"c{i}", text=f"chunk {i}", source_file="a.txt", chunk_index=i, metadata={}
+            )
+            for i in range(3)
+        ]
+        store.add_embedded(chunks, embeddings)
+
+        results = store.search_embeddings(embeddings[1:2], top_k=1)
+        assert results[0][0][0].id == "c1"
+        assert store._embedding_model is None
+
+
+class TestStartup:
+    """Tests for import cost of the package and CLI"""
+
+    def test_imports_defer_heavy_dependencies(self):
+        """Tests that importing the pipeline and CLI loads no ML stack or provider SDK"""
+        import subprocess
+
+        src = Path(__file__).parent.parent / "src"
+        code = (
+            "import sys, rag_system.rag_pipeline, sglang_demo.cli\n"
+            "heavy = ('torch', 'sentence_transformers', 'groq', 'together')\n"
+            "print(','.join(name for name in heavy if name in sys.modules))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=src, capture_output=True, text=True, check=True
+        )
+        assert result.stdout.strip() == ""
+
+    def test_cli_help_loads_no_ml_stack(self):
+        """Tests that `--help` returns without importing FAISS or the embedding model stack"""
+        import subprocess
+
+        src = Path(__file__).parent.parent / "src"
+        code = (
+            "import runpy, sys\n"
+            "sys.argv = ['sglang-rag', '--help']\n"
+            "try:\n"
+            "    runpy.run_path('sglang_demo/cli.py', run_name='__main__')\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            "heavy = ('faiss', 'sentence_transformers', 'torch')\n"
+            "print(','.join(name for name in heavy if name in sys.modules), file=sys.stderr)\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=src, capture_output=True, text=True, check=True
+        )
+        assert "usage:" in result.stdout
+        assert result.stderr.strip() == ""
+
+
+class TestIndexFactory:
+    """Tests for ANN index construction, auto-selection and recall measurement"""
+
+    def test_auto_selection_by_corpus_size(self):
+        """Tests that larger corpora move to approximate index backends"""
+        from rag_system.index_factory import choose_index_type
+
+        assert choose_index_type(100) == "flat"
+        assert choose_index_type(50_000) == "hnsw"
+        assert choose_index_type(500_000) == "ivf_flat"
+        assert choose_index_type(5_000_000) == "ivf_pq"
+
+    def test_ivf_index_trains_and_matches_exact_search(self):
+        """Tests that an IVF index with full nprobe reaches perfect recall"""
+        import faiss
+        import numpy as np
+
+        from rag_system.index_factory import create_index, recall_at_k, search_params, train_index
+
+        vectors = np.random.default_rng(0).random((2000, 32)).astype("float32")
+        faiss.normalize_L2(vectors)
+
+        exact = create_index("flat", 32)
+        exact.add(vectors)
+        ivf = create_index("ivf_flat", 32, len(vectors))
+        train_index(ivf, vectors)
+        ivf.add(vectors)
+
+        _, exact_ids = exact.search(vectors[:20], 5)
+        _, ivf_ids = ivf.search(vectors[:20], 5, params=search_params(ivf, nprobe=ivf.nlist))
+        assert recall_at_k(ivf_ids, exact_ids) == 1.0
+
+    @pytest.mark.parametrize("index_type", ["flat", "ivf_flat", "hnsw"])
+    def test_memory_mapped_index_matches_and_copies_for_writes(self, tmp_path, index_type):
+        """Tests that a mapped index searches like the original and copies out for writes"""
+        import faiss
+        import numpy as np
+
+        from rag_system.index_factory import create_index, read_index, train_index, with_ids
+
+        vectors = np.random.default_rng(0).random((1000, 16)).astype("float32")
+        faiss.normalize_L2(vectors)
+        index = with_ids(create_index(index_type, 16, len(vectors)))
+        train_index(index, vectors)
+        index.add_with_ids(vectors, np.arange(len(vectors), dtype="int64"))
+        faiss.write_index(index, str(tmp_path / "kb.faiss"))
+
+        mapped = with_ids(read_index(str(tmp_path / "kb.faiss"), mmap=True))
+        assert np.array_equal(mapped.search(vectors[:5], 3)[1], index.search(vectors[:5], 3)[1])
+
+        private = faiss.deserialize_index(faiss.serialize_index(mapped))
+        private.add_with_ids(vectors[:1], np.array([5000], dtype="int64"))
+        assert private.ntotal == mapped.ntotal + 1
+
+    @pytest.mark.parametrize("index_type", ["sq8", "pq", "ivf_sq8", "ivf_pq"])
+    def test_quantized_index_is_smaller_and_rerank_restores_recall(self, tmp_path, index_type):
+        """Tests that quantized codes shrink the index and a float32 rerank recovers recall"""
+        import faiss
+        import numpy as np
+
+        from rag_system.index_factory import (
+            create_index,
+            index_type_of,
+            recall_at_k,
+            rerank_exact,
+            search_params,
+            train_index,
+            with_ids,
+        )
+        from rag_system.vector_file import VectorFile
+
+        # Embeddings cluster by topic, which is what quantizers exploit
+        rng = np.random.default_rng(0)
+        topics = rng.standard_normal((20, 32)).astype("float32")
+        vectors = topics[rng.integers(0, 20, 1000)]
+        vectors += 0.5 * rng.standard_normal(vectors.shape).astype("float32")
+        faiss.normalize_L2(vectors)
+        queries = vectors[:50]
+
+        exact = create_index("flat", 32)
+        exact.add(vectors)
+        _, exact_ids = exact.search(queries, 5)
+
+        index = with_ids(create_index(index_type, 32, len(vectors)))
+        train_index(index, vectors)
+        index.add_with_ids(vectors, np.arange(len(vectors), dtype="int64"))
+        assert index_type_of(index) == index_type
+        assert len(faiss.serialize_index(index)) < len(faiss.serialize_index(exact)) / 1.5
+
+        stored = VectorFile(32)
+        stored.append(vectors)
+        stored.save(str(tmp_path / "kb.vectors"))
+
+        params = search_params(index, nprobe=1024)
+        _, approx_ids = index.search(queries, 5, params=params)
+        _, candidates = index.search(queries, 40, params=params)
+        _, reranked_ids = rerank_exact(queries, candidates, stored.rows, 5)
+        assert recall_at_k(reranked_ids, exact_ids) > recall_at_k(approx_ids, exact_ids) - 0.01
+        assert recall_at_k(reranked_ids, exact_ids) >= 0.95
+
+    def test_vector_file_appends_new_rows_on_save(self, tmp_path):
+        """Tests that saved and unsaved vectors read back by ID and saves append in place"""
+        import numpy as np
+
+        from rag_system.vector_file import VectorFile
+
+        vectors = np.random.default_rng(0).random((30, 8)).astype("float32")
+        path = tmp_path / "kb.vectors"
+
+        stored = VectorFile(8)
+        stored.append(vectors[:20])
+        stored.save(str(path))
+        stored.append(vectors[20:])
+        assert len(stored) == 30
+        assert np.array_equal(stored.rows(np.array([25, 3, 20])), vectors[[25, 3, 20]])
+
+        stored.save(str(path))
+        assert path.stat().st_size == vectors.nbytes
+        assert np.array_equal(VectorFile(8, str(path)).rows(np.arange(30)), vectors)
+
+    def test_exact_vectors_kept_only_once_the_index_is_lossy(self, tmp_path, monkeypatch):
+        """Tests that an auto store writes no vector file until it upgrades to IVF-PQ"""
+        import numpy as np
+
+        import rag_system.vector_store as vector_store_module
+
+        rng = np.random.default_rng(0)
+        topics = rng.standard_normal((20, 64)).astype("float32")
+        vectors = topics[rng.integers(0, 20, 1500)] + 0.3 * rng.standard_normal((1500, 64))
+        vectors = (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype("float32")
+        chunks = make_chunks([f"chunk {i}" for i in range(1500)])
+
+        store = VectorStore(index_type="auto", model=WordHashModel())
+        store.add_embedded(chunks[:500], vectors[:500])
+        store.save(str(tmp_path / "kb"))
+        assert store.vectors is None
+        assert not (tmp_path / "kb.vectors").exists()
+
+        monkeypatch.setattr(
+            vector_store_module,
+            "choose_index_type",
+            lambda total: "ivf_pq" if total > 600 else "flat",
+        )
+        store.remove_ids([3])
+        store.add_embedded(chunks[500:], vectors[500:])
+        assert store.vectors is not None and len(store.vectors) == 1500
+        assert np.array_equal(store.vectors.rows(np.array([10, 700])), vectors[[10, 700]])
+        assert store.search_embeddings(vectors[700:701], top_k=1)[0][0][0].id == "a.txt-700"
+
+    def test_unknown_index_type_rejected(self):
+        """Tests that unsupported index types raise a clear error"""
+        from rag_system.index_factory import create_index
+
+        with pytest.raises(ValueError):
+            create_index("lsh", 32)
+
+    @pytest.mark.parametrize("index_type", ["flat", "ivf_flat", "hnsw"])
+    def test_vectors_removed_by_external_id(self, index_type):
+        """Tests that removable indexes drop vectors by ID and HNSW refuses so callers rebuild"""
+        import faiss
+        import numpy as np
+
+        from rag_system.index_factory import (
+            create_index,
+            remove_ids,
+            stored_ids,
+            train_index,
+            with_ids,
+        )
+
+        vectors = np.random.default_rng(0).random((500, 16)).astype("float32")
+        faiss.normalize_L2(vectors)
+        ids = np.arange(100, 600, dtype="int64")
+
+        index = with_ids(create_index(index_type, 16, len(vectors)))
+        train_index(index, vectors)
+        index.add_with_ids(vectors, ids)
+
+        if index_type == "hnsw":
+            with pytest.raises(RuntimeError):
+                remove_ids(index, ids[:10])
+            return
+
+        assert remove_ids(index, ids[:10]) == 10
+        assert sorted(stored_ids(index)) == list(ids[10:])
+        _, found = index.search(vectors[10:11], 1)
+        assert found[0][0] == ids[10]
+
+
+class TestSparseIndex:
+    """Tests for the BM25 keyword index and hybrid rank fusion"""
+
+    def test_bm25_finds_exact_identifiers_and_survives_reload(self, tmp_path):
+        """Tests that identifiers match whole and by parts, removals apply and saves reload"""
+        from rag_system.sparse_index import BM25Index, tokenize
+
+        assert tokenize("Call /api/v1/users, got ERR_AUTH_401.") == [
+            "call",
+            "api/v1/users",
+            "api",
+            "v1",
+            "users",
+            "got",
+            "err_auth_401",
+            "err",
+            "auth",
+            "401",
+        ]
+
+        index = BM25Index()
+        index.add([0, 1, 2], ["login failed with ERR_AUTH_401", "users endpoint", "auth docs"])
+        index.add([3], ["GET /api/v1/users lists users"])
+        assert list(index.search("ERR_AUTH_401", 2)[0]) == [0, 2]
+        assert index.search("/api/v1/users", 1)[0][0] == 3
+
+        index.remove([0])
+        assert list(index.search("ERR_AUTH_401", 2)[0]) == [2]
+
+        index.save(str(tmp_path / "kb.bm25"))
+        loaded = BM25Index.load(str(tmp_path / "kb.bm25"))
+        assert len(loaded) == 4
+        assert list(loaded.search("users", 3)[0]) == list(index.search("users", 3)[0])
+        loaded.add([4], ["ERR_AUTH_401 again"])
+        assert loaded.search("err_auth_401", 1)[0][0] == 4
+
+    def test_rank_fusion_rewards_agreement(self):
+        """Tests that documents ranked by both retrievers come first under either fusion"""
+        import numpy as np
+
+        from rag_system.sparse_index import fuse
+
+        dense = (np.array([1, 2, 3]), np.array([0.9, 0.8, 0.7]))
+        sparse = (np.array([3, 4]), np.array([12.0, 3.0]))
+
+        assert [doc_id for doc_id, _ in fuse(dense, sparse, 2, "rrf")] == [3, 1]
+        weighted = fuse(dense, sparse, 4, "weighted", alpha=0.5)
+        assert weighted[0][0] == 1 and weighted[1][0] == 3
+        with pytest.raises(ValueError):
+            fuse(dense, sparse, 2, "max")
+
+
+class TestReranker:
+    """Tests for the cross-encoder rerank stage"""
+
+    class OverlapModel:
+        """Stands in for a cross-encoder: scores pairs by shared words"""
+
+        def __init__(self, delay: float = 0.0):
+            self.delay = delay
+            self.pairs = 0
+
+        def predict(self, pairs, batch_size=32, show_progress_bar=False):
+            import time
+
+            time.sleep(self.delay)
+            self.pairs += len(pairs)
+            return [len(set(query.split()) & set(text.split())) for query, text in pairs]
+
+    @staticmethod
+    def candidates(texts):
+        return [
+            (
+                DocumentChunk(
+                    id=f"c{i}", text=text, source_file="a.txt", chunk_index=i, metadata={}
+                ),
+                0.5,
+            )
+            for i, text in enumerate(texts)
+        ]
+
+    def test_rerank_reorders_and_caches_pair_scores(self):
+        """Tests that the best cross-encoder matches come first and repeats are cached"""
+        from rag_system.reranker import CrossEncoderReranker
+
+        model = self.OverlapModel()
+        reranker = CrossEncoderReranker(model=model, batch_size=2)
+        hits = self.candidates(["unrelated text", "refund policy", "the refund policy applies"])
+
+        ranked = reranker.rerank("the refund policy", hits, top_k=2)
+        assert [chunk.id for chunk, _ in ranked] == ["c2", "c1"]
+        assert ranked[0][1] == 3.0
+
+        reranker.rerank(" the  refund policy ", hits, top_k=2)
+        assert model.pairs == 3
+        assert reranker.stats()["cache"]["hits"] == 3
+
+    def test_latency_budget_limits_candidates_and_scoring(self):
+        """Tests that a slow scorer shrinks the candidate count and stops at the budget"""
+        from rag_system.reranker import CrossEncoderReranker
+
+        model = self.OverlapModel(delay=0.05)
+        reranker = CrossEncoderReranker(
+            model=model, candidates=50, batch_size=2, latency_budget=0.04
+        )
+        assert reranker.candidate_count(num_queries=4, top_k=3) == 50
+
+        hits = self.candidates([f"chunk {i}" for i in range(6)] + ["chunk match"])
+        ranked = reranker.rerank("match", hits, top_k=3)
+        # Only the first batch fits the budget; the rest keep their retrieval order
+        assert model.pairs == 2
+        assert [chunk.id for chunk, _ in ranked] == ["c0", "c1", "c2"]
+        # The unscored candidate ranks below the cross-encoder scores, not at its dense 0.5
+        scores = [score for _, score in ranked]
+        assert scores[:2] == [0.0, 0.0]
+        assert scores[2] < 0.0
+        assert reranker.stats()["over_budget"] == 1
+        assert reranker.candidate_count(num_queries=4, top_k=3) == 3
+
+
+class TestCaching:
+    """Tests for the LRU caches used on the query path"""
+
+    def test_lru_eviction_and_counters(self):
+        """Tests that the least recently used entry is evicted and hits are counted"""
+        from rag_system.caching import LRUCache
+
+        cache = LRUCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1  # "b" is now least recently used
+        cache.put("c", 3)
+
+        assert "b" not in cache
+        assert cache.get("b") is None
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["evictions"] == 1
+
+    def test_ttl_expiry(self):
+        """Tests that expired entries are treated as misses"""
+        import time
+
+        from rag_system.caching import LRUCache
+
+        cache = LRUCache(max_size=10)
+        cache.put("stale", 1, expires_at=time.time() - 1)
+        assert cache.get("stale") is None
+        assert len(cache) == 0
+
+    def test_embedding_cache_normalizes_and_persists(self, tmp_path):
+        """Tests that whitespace variants share an entry and a spilled cache reloads"""
+        import numpy as np
+
+        from rag_system.caching import EmbeddingCache
+
+        path = str(tmp_path / "query_cache.npz")
+        cache = EmbeddingCache("test-model", persist_path=path)
+        cache.put_embedding("What  is RAG? ", np.ones(4, dtype="float32"))
+        assert cache.get_embedding("What is RAG?") is not None
+        cache.save()
+
+        reloaded = EmbeddingCache("test-model", persist_path=path)
+        assert np.allclose(reloaded.get_embedding("What is RAG?"), np.ones(4))
+        assert len(EmbeddingCache("other-model", persist_path=path)) == 0
+
+    def test_semantic_answer_cache_matches_similar_queries_in_same_context(self):
+        """Tests that answers are reused only above the threshold and for the same chunks"""
+        import numpy as np
+
+        from rag_system.caching import SemanticAnswerCache
+
+        cache = SemanticAnswerCache(threshold=0.9, max_size=8)
+        query = np.array([1.0, 0.0], dtype="float32")
+        paraphrase = np.array([0.99, 0.141], dtype="float32")
+        unrelated = np.array([0.0, 1.0], dtype="float32")
+
+        cache.store(query, "groq", ["c1", "c2"], "cached answer")
+
+        assert cache.lookup(paraphrase, "groq", ["c1", "c2"])[0] == "cached answer"
+        assert cache.lookup(unrelated, "groq", ["c1", "c2"]) is None
+        assert cache.lookup(query, "groq", ["c1", "c3"]) is None
+        assert cache.lookup(query, "together", ["c1", "c2"]) is None
+        assert cache.stats()["hits"] == 1
+
+    def test_edited_chunks_and_rebuilds_invalidate_cached_answers(self, tmp_path):
+        """Tests that an edit keeping the chunk ID, and a rebuild, both force a new answer"""
+        from rag_system import RAGSystem
+        from rag_system.llm_providers import StubChatClient
+        from rag_system.rate_limiter import RateLimiter
+
+        client = StubChatClient("answer")
+        rag = RAGSystem(
+            docs_dir=str(tmp_path / "docs"),
+            vector_store_path=str(tmp_path / "kb"),
+            llm=LLMProvider(
+                clients={"groq": client},
+                async_clients={},
+                rate_limiters={"groq": RateLimiter()},
+            ),
+            embedder=WordHashModel(),
+        )
+        rag.vector_store.add_documents(make_chunks(["refunds take five days"]))
+        docs = rag.search("how long do refunds take")
+
+        rag.generate_answer_from_docs("how long do refunds take", docs)
+        assert rag.generate_answer_from_docs("how long do refunds take", docs)["cached"]
+
+        (edited,) = make_chunks(["refunds take ten days"])
+        assert edited.id == docs[0][0].id
+        result = rag.generate_answer_from_docs("how long do refunds take", [(edited, 1.0)])
+        assert "cached" not in result and client.calls == 2
+
+        (tmp_path / "docs").mkdir()
+        (tmp_path / "docs" / "policy.txt").write_text("refunds take ten days")
+        rag.build_index(force_rebuild=True)
+        assert len(rag.answer_cache) == 0
+
+    def test_answer_reuses_the_retrieval_embedding(self, tmp_path, monkeypatch):
+        """Tests that a hybrid search plus answer encodes a query once and counts one lookup"""
+        from rag_system import RAGSystem
+        from rag_system.llm_providers import StubChatClient
+        from rag_system.rate_limiter import RateLimiter
+
+        class CountingModel(WordHashModel):
+            encoded = 0
+
+            def encode(self, texts, **kwargs):
+                CountingModel.encoded += len(texts)
+                return super().encode(texts, **kwargs)
+
+        monkeypatch.setenv("HYBRID_SEARCH", "true")
+        rag = RAGSystem(
+            docs_dir=str(tmp_path / "docs"),
+            vector_store_path=str(tmp_path / "kb"),
+            llm=LLMProvider(
+                clients={"groq": StubChatClient("answer")},
+                async_clients={},
+                rate_limiters={"groq": RateLimiter()},
+            ),
+            embedder=CountingModel(),
+        )
+        rag.vector_store.add_documents(make_chunks(["refunds take five days"]))
+        CountingModel.encoded = 0
+
+        rag.generate_answer("how long do refunds take")
+        stats = rag.vector_store.query_cache.stats()
+        assert CountingModel.encoded == 1
+        assert (stats["hits"], stats["misses"]) == (0, 1)
+
+
+class TestChunkStore:
+    """Tests for the memory-mapped columnar chunk store"""
+
+    def test_round_trip_materializes_chunks_lazily(self, tmp_path):
+        """Tests that stored chunks come back identical, including extra metadata"""
+        from rag_system.chunk_store import MappedChunks, write_chunk_store
+
+        chunks = [
+            DocumentChunk(
+                id=f"id{i}",
+                text=f"chunk {i} café ✓",
+                source_file=f"doc{i % 2}.txt",
+                chunk_index=i,
+                metadata={"word_count": 3, "tag": "x"} if i == 1 else {"word_count": 3},
+            )
+            for i in range(4)
+        ]
+        write_chunk_store(str(tmp_path / "kb.chunks"), chunks, metadata={"dimension": 384})
+
+        mapped = MappedChunks(str(tmp_path / "kb.chunks"))
+        assert len(mapped) == 4
+        assert mapped.metadata["dimension"] == 384
+        assert mapped[1] == chunks[1]
+        assert mapped[-1] == chunks[-1]
+        assert list(mapped) == chunks
+
+    def test_save_interrupted_mid_swap_is_recovered(self, tmp_path, monkeypatch):
+        """Tests that a crash between moving the old store aside and the new one in loses
+        neither: the complete new store is put in place"""
+        import os
+
+        from rag_system import chunk_store
+        from rag_system.chunk_store import MappedChunks, recover_chunk_store, write_chunk_store
+
+        path = tmp_path / "kb.chunks"
+        write_chunk_store(str(path), make_chunks(["old text"]))
+
+        real_replace = os.replace
+
+        def crash_moving_in(src, dst):
+            if Path(src).name == "kb.chunks.tmp":
+                raise OSError("crashed")
+            real_replace(src, dst)
+
+        monkeypatch.setattr(chunk_store.os, "replace", crash_moving_in)
+        with pytest.raises(OSError):
+            write_chunk_store(str(path), make_chunks(["new text"]))
+        monkeypatch.setattr(chunk_store.os, "replace", real_replace)
+        assert not path.exists()
+
+        recover_chunk_store(str(path))
+        assert [chunk.text for chunk in MappedChunks(str(path))] == ["new text"]
+        assert not (tmp_path / "kb.chunks.old").exists()
+
+    def test_appended_chunks_follow_stored_ones(self, tmp_path):
+        """Tests that chunks added after loading are addressable after the stored rows"""
+        from rag_system.chunk_store import MappedChunks, write_chunk_store
+
+        stored = DocumentChunk("a", "stored", "a.txt", 0, {})
+        added = DocumentChunk("b", "added", "b.txt", 0, {})
+        write_chunk_store(str(tmp_path / "kb.chunks"), [stored])
+
+        mapped = MappedChunks(str(tmp_path / "kb.chunks"))
+        mapped.extend([added])
+        assert len(mapped) == 2
+        assert mapped[1] == added
+
+    def test_appended_segments_extend_the_store(self, tmp_path):
+        """Tests that incremental saves add segments that read back in order"""
+        from rag_system.chunk_store import MappedChunks, append_chunk_segment, write_chunk_store
+
+        first = [DocumentChunk(f"a{i}", f"first {i}", "a.txt", i, {"n": i}) for i in range(3)]
+        second = [DocumentChunk(f"b{i}", f"second {i}", "b.txt", i, {"n": i}) for i in range(2)]
+        write_chunk_store(str(tmp_path / "kb.chunks"), first)
+        append_chunk_segment(str(tmp_path / "kb.chunks"), second, metadata={"deleted_ids": [1]})
+
+        mapped = MappedChunks(str(tmp_path / "kb.chunks"))
+        assert list(mapped) == first + second
+        assert mapped.metadata["deleted_ids"] == [1]
+
+
+class TestIndexManifest:
+    """Tests for change detection used by incremental index updates"""
+
+    def test_scan_classifies_files(self, tmp_path):
+        """Tests that scans report new, changed, deleted and unchanged documents"""
+        import os
+
+        from rag_system.index_manifest import FileManifest
+
+        for name in ("keep.txt", "touch.txt", "edit.txt", "gone.txt"):
+            (tmp_path / name).write_text(f"contents of {name}")
+
+        manifest = FileManifest(str(tmp_path / "kb.files.json"))
+        for name in ("keep.txt", "touch.txt", "edit.txt", "gone.txt"):
+            manifest.record(tmp_path / name, [len(manifest.files)])
+        manifest.save()
+
+        (tmp_path / "new.txt").write_text("new document")
+        (tmp_path / "edit.txt").write_text("edited contents")
+        os.utime(tmp_path / "touch.txt", (0, 0))
+        (tmp_path / "gone.txt").unlink()
+
+        diff = FileManifest(manifest.path).load().scan(str(tmp_path))
+        assert diff.new == ["new.txt"]
+        assert diff.changed == ["edit.txt"]
+        assert diff.deleted == ["gone.txt"]
+        assert sorted(diff.unchanged) == ["keep.txt", "touch.txt"]
+        assert manifest.forget("edit.txt") == [2]
+
+    def test_file_edited_during_ingestion_is_seen_as_changed(self, tmp_path):
+        """Tests that the manifest keeps the fingerprint of the contents that were indexed"""
+        from rag_system import RAGSystem
+        from rag_system.index_manifest import FileManifest
+
+        docs = tmp_path / "docs"
+        docs.mkdir()
+        policy = docs / "policy.txt"
+        policy.write_text("refunds take five days")
+
+        class EditingModel(WordHashModel):
+            def encode(self, texts, **kwargs):
+                # The file is edited after it was read, while its chunks are embedded
+                policy.write_text("refunds take ten business days")
+                return super().encode(texts, **kwargs)
+
+        rag = RAGSystem(str(docs), str(tmp_path / "kb"), embedder=EditingModel())
+        rag.build_index(force_rebuild=True)
+
+        diff = FileManifest(rag.manifest_path).load().scan(str(docs))
+        assert diff.changed == ["policy.txt"]
+
+
+class TestBatchedSearch:
+    """Tests for multi-query search and batched answering"""
+
+    TEXTS = [
+        "vacation requests go to the HR department",
+        "API errors are fixed by checking the service logs",
+        "the capital of France is Paris",
+        "expense reports are approved by Finance",
+    ]
+    QUERIES = ["who handles vacation requests", "API errors in service logs", "capital of France"]
+
+    def make_rag(self, tmp_path):
+        from rag_system import RAGSystem
+        from rag_system.llm_providers import StubChatClient
+        from rag_system.rate_limiter import RateLimiter
+
+        llm = LLMProvider(
+            clients={"groq": StubChatClient(lambda prompt: f"answer {len(prompt)}")},
+            async_clients={},
+            rate_limiters={"groq": RateLimiter()},
+        )
+        rag = RAGSystem(
+            docs_dir=str(tmp_path),
+            vector_store_path=str(tmp_path / "kb"),
+            llm=llm,
+            embedder=WordHashModel(),
+        )
+        rag.vector_store.add_documents(make_chunks(self.TEXTS))
+        return rag
+
+    def test_batched_search_matches_single_searches(self, tmp_path):
+        """Tests that batched results equal per-query searches, in query order"""
+        rag = self.make_rag(tmp_path)
+        store = rag.vector_store
+
+        batched = store.search_batch(self.QUERIES, top_k=2)
+        assert batched == [store.search(query, top_k=2) for query in self.QUERIES]
+        assert [hits[0][0].id for hits in batched] == ["a.txt-0", "a.txt-1", "a.txt-2"]
+        assert rag.search_batch(self.QUERIES, top_k=2) == [
+            rag.search(query, top_k=2) for query in self.QUERIES
+        ]
+
+        with pytest.raises(ValueError):
+            store.search_batch(["fine", "  "])
+
+    def test_batched_answers_keep_positions_of_invalid_queries(self, tmp_path):
+        """Tests that empty queries get an error entry in place while the rest are answered"""
+        rag = self.make_rag(tmp_path)
+        queries = [self.QUERIES[0], "", self.QUERIES[1], "   ", self.QUERIES[2]]
+
+        results = rag.generate_answers_batch(queries, max_workers=2)
+
+        assert [result["query"] for result in results] == queries
+        assert [result.get("error") for result in results] == [
+            None,
+            "Empty or invalid query",
+            None,
+            "Empty or invalid query",
+            None,
+        ]
+        for result, query in zip(results[::2], self.QUERIES):
+            single = rag.generate_answer(query)
+            assert result["answer"] == single["answer"]
+            assert result["sources"] == single["sources"]
+
+    def test_batched_retrieval_spans_reach_each_answers_timings(self, tmp_path):
+        """Tests that embed and index_search spans from the batcher thread land in `timings`"""
+        import asyncio
+
+        from rag_system import tracing
+
+        rag = self.make_rag(tmp_path)
+        assert rag.retrieval_batcher is not None
+
+        tracing.enable()
+        try:
+            results = [
+                rag.generate_answer(self.QUERIES[0]),
+                asyncio.run(rag.generate_answer_async(self.QUERIES[1])),
+                rag.submit_answer(self.QUERIES[2]).result(),
+            ]
+        finally:
+            tracing.enable(False)
+            tracing.REGISTRY.reset()
+            rag.retrieval_batcher.close()
+
+        for result in results:
+            names = [span["name"] for span in result["timings"]["spans"]]
+            assert {"embed", "index_search"} <= set(names)
+
+
+class TestRetrievalBatcher:
+    """Tests for micro-batching of concurrent retrievals"""
+
+    def test_concurrent_searches_share_batches(self):
+        """Tests that concurrent queries are coalesced and each gets its own results"""
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        from rag_system.retrieval_batcher import RetrievalBatcher
+
+        batch_sizes = []
+
+        def search_batch(queries, top_k):
+            if "bad" in queries:
+                raise ValueError("Query cannot be empty")
+            batch_sizes.append(len(queries))
+            time.sleep(0.02)
+            return [[(query, float(rank)) for rank in range(top_k)] for query in queries]
+
+        batcher = RetrievalBatcher(search_batch, max_batch_size=8, max_wait=0.005)
+        with ThreadPoolExecutor(max_workers=24) as executor:
+            results = list(executor.map(lambda i: batcher.search(f"q{i}", 1 + i % 3), range(24)))
+
+        assert results == [[(f"q{i}", float(rank)) for rank in range(1 + i % 3)] for i in range(24)]
+        assert max(batch_sizes) > 1 and len(batch_sizes) < 24
+
+        bad, good = batcher.submit("bad"), batcher.submit("good", 2)
+        assert good.result() == [("good", 0.0), ("good", 1.0)]
+        with pytest.raises(ValueError):
+            bad.result()
+        batcher.close()
+
+    def test_mixed_top_k_matches_unbatched_search(self):
+        """Tests that batched callers get exactly the unbatched results at their own top_k"""
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        from rag_system.retrieval_batcher import RetrievalBatcher
+
+        def search_batch(queries, top_k):
+            time.sleep(0.01)
+            # Scores depend on top_k, as with rerank over-fetch or rank fusion
+            return [[(query, 1.0 / (rank + top_k)) for rank in range(top_k)] for query in queries]
+
+        batcher = RetrievalBatcher(search_batch, max_batch_size=8, max_wait=0.005)
+        requests = [(f"q{i}", 1 + i % 3) for i in range(24)]
+        with ThreadPoolExecutor(max_workers=24) as executor:
+            results = list(executor.map(lambda request: batcher.search(*request), requests))
+        batcher.close()
+
+        assert results == [search_batch([query], top_k)[0] for query, top_k in requests]
+        assert batcher.stats()["avg_batch_size"] > 1
+
 
 class TestLLMProvider:
     """Test LLM provider functionality"""
@@ -58,6 +865,542 @@ class TestLLMProvider:
         # Should return a list (may be empty if no API keys)
         assert isinstance(available_providers, list)
 
+    def test_async_generation_with_stub_clients_falls_back(self):
+        """Tests async generation over injected clients, falling back past a failing provider"""
+        import asyncio
+
+        from rag_system.llm_providers import ALL_PROVIDERS_FAILED, AsyncStubChatClient
+
+        def fail(prompt):
+            raise ConnectionError("provider down")
+
+        together = AsyncStubChatClient(lambda prompt: f"answer to {prompt}", latency=0.05)
+        provider = LLMProvider(
+            clients={}, async_clients={"groq": AsyncStubChatClient(fail), "together": together}
+        )
+
+        async def ask_many():
+            return await asyncio.gather(*(provider.agenerate_response(f"q{i}") for i in range(20)))
+
+        answers = asyncio.run(ask_many())
+        assert answers == [f"answer to q{i}" for i in range(20)]
+        assert together.calls == 20
+        assert asyncio.run(LLMProvider(clients={}, async_clients={}).agenerate_response("q")) == (
+            ALL_PROVIDERS_FAILED
+        )
+
+    def test_streamed_tokens_reassemble_the_answer(self):
+        """Tests that streaming yields incremental deltas and falls back before the first token"""
+        from rag_system.llm_providers import StubChatClient
+
+        class DownClient(StubChatClient):
+            def _create(self, messages, stream=False, **kwargs):
+                raise ConnectionError("provider down")
+
+        provider = LLMProvider(
+            clients={"groq": DownClient(), "together": StubChatClient("Tokens arrive one by one.")}
+        )
+        tokens = list(provider.stream_response("question", provider="groq"))
+
+        assert len(tokens) == 5
+        assert "".join(tokens) == "Tokens arrive one by one."
+
+    def test_broken_stream_is_an_error_and_never_cached(self, tmp_path):
+        """Tests that a stream cut off midway ends in an error event instead of "done" and
+        leaves no answer in the cache, and that a full stream is charged what it produced"""
+        import asyncio
+
+        from rag_system import RAGSystem
+        from rag_system.llm_providers import AsyncStubChatClient, StubChatClient
+        from rag_system.rate_limiter import RateLimiter
+
+        limiter = RateLimiter(tpm=60_000)
+        complete = LLMProvider(
+            clients={"groq": StubChatClient("A complete answer.")},
+            async_clients={},
+            rate_limiters={"groq": limiter},
+        )
+        assert "".join(complete.stream_response("q", max_tokens=500)) == "A complete answer."
+        assert limiter.tokens.level >= limiter.tokens.capacity - 10
+
+        class BreakingClient(StubChatClient):
+            def _stream(self, chunks):
+                yield from chunks[:2]
+                raise ConnectionError("connection reset")
+
+        class AsyncBreakingClient(AsyncStubChatClient):
+            async def _astream(self, chunks):
+                for chunk in chunks[:2]:
+                    yield chunk
+                raise ConnectionError("connection reset")
+
+        reply = "streams deliver their tokens one by one"
+        llm = LLMProvider(
+            clients={"groq": BreakingClient(reply)},
+            async_clients={"groq": AsyncBreakingClient(reply)},
+            rate_limiters={"groq": RateLimiter()},
+        )
+        rag = RAGSystem(str(tmp_path), str(tmp_path / "kb"), llm=llm, embedder=WordHashModel())
+        rag.vector_store.add_documents(make_chunks(["streams deliver tokens one by one"]))
+
+        async def collect():
+            return [event async for event in rag.astream_answer("how do streams deliver")]
+
+        expected = ["sources", "token", "token", "error"]
+        assert [event["type"] for event in rag.stream_answer("how do streams deliver")] == (
+            expected
+        )
+        assert [event["type"] for event in asyncio.run(collect())] == expected
+        assert len(rag.answer_cache) == 0
+
+    def test_perspectives_synthesize_after_quorum_without_stragglers(self):
+        """Tests that a slow perspective is dropped once the quorum is in and the grace ends"""
+        import asyncio
+        import time
+
+        from rag_system.rag_pipeline import RAGSystem
+
+        delays = {"technical": 0.01, "business": 0.02, "user": 5.0, "broken": 0.0}
+
+        async def generate(prompt, max_tokens):
+            await asyncio.sleep(delays[prompt])
+            if prompt == "broken":
+                raise ConnectionError("provider down")
+            return f"{prompt} view"
+
+        prompts = {name: name for name in delays}
+        start = time.time()
+        results = asyncio.run(
+            RAGSystem._gather_perspectives(prompts, generate, timeout=3, quorum=2, grace=0.1)
+        )
+
+        assert results == {"technical": "technical view", "business": "business view"}
+        assert time.time() - start < 1
+
+    def test_parallel_processor_bounds_concurrency_on_each_loop(self):
+        """Tests that the concurrency limit holds and the processor is reusable across loops"""
+        import asyncio
+
+        from sglang_helpers import ParallelProcessor
+
+        processor = ParallelProcessor(max_concurrent=3)
+        active = {"now": 0, "peak": 0}
+
+        async def task(i):
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+            await asyncio.sleep(0.01)
+            active["now"] -= 1
+            return i
+
+        for _ in range(2):
+            assert asyncio.run(processor.execute_parallel([task(i) for i in range(10)])) == list(
+                range(10)
+            )
+        assert active["peak"] == 3
+
+    def test_client_registry_reuses_and_evicts_unhealthy_clients(self):
+        """Tests that clients are shared per key and rebuilt after repeated connection errors"""
+        from rag_system.client_registry import MAX_CONSECUTIVE_FAILURES, ClientRegistry
+
+        class DummyClient:
+            def __init__(self, api_key, http_client):
+                self.api_key = api_key
+                self.http_client = http_client
+
+            def close(self):
+                self.http_client.close()
+
+        registry = ClientRegistry(pool_size=4)
+        first = registry.get("groq", DummyClient, "key")
+        assert registry.get("groq", DummyClient, "key") is first
+        assert registry.get("groq", DummyClient, "other-key") is not first
+
+        registry.report_failure("groq", ValueError("bad request"))
+        for _ in range(MAX_CONSECUTIVE_FAILURES - 1):
+            registry.report_failure("groq", ConnectionError("reset"))
+        assert registry.get("groq", DummyClient, "key") is first
+
+        registry.report_failure("groq", ConnectionError("reset"))
+        assert registry.get("groq", DummyClient, "key") is not first
+        assert registry.stats()["created"] == 3
+        # Calls still holding the evicted client keep a working connection pool
+        assert not first.http_client.is_closed
+        registry.close()
+        assert first.http_client.is_closed
+
+    def test_auto_routing_hedges_slow_provider_and_prefers_fastest(self):
+        """Tests hedging past a slow provider, cancelling it, and routing to the fast one"""
+        import asyncio
+        import time
+
+        from rag_system.llm_providers import AsyncStubChatClient
+        from rag_system.provider_router import ProviderRouter
+
+        slow = AsyncStubChatClient("slow answer", latency=1.0)
+        fast = AsyncStubChatClient("fast answer", latency=0.01)
+        router = ProviderRouter(default_hedge_delay=0.05)
+        provider = LLMProvider(
+            clients={}, async_clients={"groq": slow, "together": fast}, router=router
+        )
+
+        start_time = time.time()
+        assert asyncio.run(provider.agenerate_response("q", provider="auto")) == "fast answer"
+        assert time.time() - start_time < 0.5
+        assert router.rank(["groq", "together"]) == ["together", "groq"]
+
+        asyncio.run(provider.agenerate_response("q", provider="auto"))
+        # The hedged-out request was cancelled before it could complete
+        assert slow.calls == 0 and fast.calls == 2
+
+    def test_rate_limiter_serves_interactive_before_batch(self):
+        """Tests that an exhausted token budget is refilled to waiters in priority order"""
+        import asyncio
+
+        from rag_system.rate_limiter import PRIORITY_BATCH, PRIORITY_INTERACTIVE, RateLimiter
+
+        limiter = RateLimiter(tpm=1200)  # 20 tokens per second
+        limiter.acquire(1200)
+        order = []
+
+        async def request(name, priority):
+            await limiter.aacquire(5, priority)
+            order.append(name)
+
+        async def burst():
+            batch = asyncio.ensure_future(request("batch", PRIORITY_BATCH))
+            await asyncio.sleep(0.01)
+            await asyncio.gather(batch, request("interactive", PRIORITY_INTERACTIVE))
+
+        asyncio.run(burst())
+        assert order == ["interactive", "batch"]
+        assert limiter.stats()["granted"] == 3
+
+    def test_rate_limited_call_backs_off_and_retries(self):
+        """Tests that a 429 with retry-after pauses the provider and retries the same call"""
+        from types import SimpleNamespace
+
+        from rag_system.llm_providers import StubChatClient
+        from rag_system.rate_limiter import RateLimiter
+
+        class RateLimitError(Exception):
+            status_code = 429
+            response = SimpleNamespace(headers={"retry-after": "0.05"})
+
+        def reply(prompt):
+            if client.calls == 1:
+                raise RateLimitError("too many requests")
+            return "answer"
+
+        client = StubChatClient(reply)
+        limiter = RateLimiter(tpm=60_000)
+        provider = LLMProvider(
+            clients={"groq": client}, async_clients={}, rate_limiters={"groq": limiter}
+        )
+
+        assert provider.generate_response("q", provider="groq", max_tokens=500) == "answer"
+        assert client.calls == 2
+        assert limiter.stats()["throttled"] == 1
+        # The rejected attempt's reservation was returned: only the retry is charged
+        assert limiter.tokens.level >= limiter.tokens.capacity - 501
+
+
+class TestTracing:
+    """Tests for pipeline timing spans and their OpenMetrics export"""
+
+    def test_disabled_spans_are_shared_no_ops(self):
+        """Tests that nothing is timed or attached while tracing is off"""
+        from rag_system import tracing
+
+        @tracing.traced
+        def answer():
+            with tracing.span("embed") as embed_span:
+                embed_span.set(cache="hit")
+            return {"answer": "a"}
+
+        assert tracing.span("embed") is tracing.span("llm", provider="groq")
+        assert answer() == {"answer": "a"}
+        assert tracing.REGISTRY.snapshot() == {}
+
+    def test_traced_answer_breaks_down_fallback_attempts(self):
+        """Tests per-provider LLM spans in the result and the OpenMetrics histograms"""
+        from rag_system import tracing
+        from rag_system.llm_providers import StubChatClient
+
+        def fail(prompt):
+            raise ConnectionError("provider down")
+
+        provider = LLMProvider(
+            clients={"groq": StubChatClient(fail), "together": StubChatClient("ok")},
+            async_clients={},
+        )
+
+        @tracing.traced
+        def answer(query):
+            with tracing.span("prompt"):
+                prompt = f"Q: {query}"
+            return {"answer": provider.generate_response(prompt, "groq")}
+
+        tracing.enable()
+        try:
+            result = answer("q")
+        finally:
+            tracing.enable(False)
+        metrics = tracing.REGISTRY.render_openmetrics()
+        tracing.REGISTRY.reset()
+
+        assert result["answer"] == "ok"
+        llm_spans = [span for span in result["timings"]["spans"] if span["name"] == "llm"]
+        assert [(span["provider"], span["status"]) for span in llm_spans] == [
+            ("groq", "error"),
+            ("together", "ok"),
+        ]
+        assert result["timings"]["total"] >= sum(span["seconds"] for span in llm_spans)
+        assert (
+            'rag_span_seconds_bucket{span="llm",provider="together",status="ok",le="+Inf"} 1'
+            in (metrics)
+        )
+        assert 'rag_span_seconds_count{span="answer"} 1' in metrics
+        assert metrics.endswith("# EOF\n")
+
+    def test_sync_multi_perspective_spans_reach_the_trace(self, tmp_path):
+        """Tests that LLM calls on the executor threads of sync multi-perspective are traced"""
+        from rag_system import RAGSystem, tracing
+        from rag_system.llm_providers import StubChatClient
+        from rag_system.rate_limiter import RateLimiter
+
+        llm = LLMProvider(
+            clients={"groq": StubChatClient("a view")},
+            async_clients={},
+            rate_limiters={"groq": RateLimiter()},
+        )
+        rag = RAGSystem(str(tmp_path), str(tmp_path / "kb"), llm=llm, embedder=WordHashModel())
+        rag.vector_store.add_documents(make_chunks(["perspectives share one set of documents"]))
+
+        tracing.enable()
+        try:
+            result = rag.generate_multi_perspective_answer("which documents do perspectives share")
+        finally:
+            tracing.enable(False)
+            tracing.REGISTRY.reset()
+
+        names = [span["name"] for span in result["timings"]["spans"]]
+        assert {"retrieve", "embed", "index_search"} <= set(names)
+        # One call per perspective plus the synthesis
+        assert names.count("llm") == 4
+
+
+class TestHTTPAPI:
+    """Tests for the async HTTP API routes"""
+
+    def test_query_search_stream_and_validation(self):
+        """Tests JSON and server-sent-event responses over a shared RAG system"""
+        import json
+        from types import SimpleNamespace
+
+        pytest.importorskip("starlette")
+        from starlette.testclient import TestClient
+
+        from web.api import create_app
+
+        chunk = DocumentChunk(
+            id="c1", text="RAG text", source_file="a.txt", chunk_index=0, metadata={}
+        )
+
+        class StaticRAG:
+            vector_store = SimpleNamespace(is_built=True, index=SimpleNamespace(ntotal=1))
+            llm = SimpleNamespace(list_available_providers=lambda: ["groq"])
+
+            async def asearch(self, query, top_k=3):
+                return [(chunk, 0.9)][:top_k]
+
+            async def generate_answer_async(self, query, provider="groq", top_k=3):
+                return {
+                    "answer": f"{provider}: {query}",
+                    "sources": [],
+                    "query": query,
+                    "context_used": top_k,
+                }
+
+            async def astream_answer(self, query, provider="groq", top_k=3):
+                for event in ({"type": "token", "text": "RAG"}, {"type": "done", "answer": "RAG"}):
+                    yield event
+
+        with TestClient(create_app(StaticRAG())) as client:
+            health = client.get("/health").json()
+            assert health["vectors"] == 1
+            # The public API does not reveal where the documents and index live
+            assert "docs_dir" not in health and "vector_store_path" not in health
+            assert client.post("/query", json={"query": "q"}).json()["answer"].endswith(": q")
+            assert (
+                client.post("/query", json={"query": "q", "top_k": 5}).json()["context_used"] == 5
+            )
+            assert (
+                client.post("/search", json={"query": "q"}).json()["results"][0]["file"] == "a.txt"
+            )
+
+            stream = client.post("/query/stream", json={"query": "q", "provider": "auto"})
+            events = [json.loads(line[6:]) for line in stream.text.splitlines() if line]
+            assert [event["type"] for event in events] == ["token", "done"]
+
+            assert client.post("/query", json={"query": " "}).status_code == 400
+            assert client.post("/query", json={"query": "q", "provider": "x"}).status_code == 400
+            assert client.post("/search", content=b"not json").status_code == 400
+
+
+class TestDaemon:
+    """Tests for the CLI daemon client over a Unix socket"""
+
+    def test_client_answers_through_socket_and_skips_stale_one(self, tmp_path):
+        """Tests answers and streams via the daemon, and fallback when nothing listens or the
+        daemon serves other documents or an older index"""
+        import os
+        import socket
+        import threading
+        import time
+        from types import SimpleNamespace
+
+        uvicorn = pytest.importorskip("uvicorn")
+
+        from sglang_demo.daemon import connect
+        from web.api import create_app
+
+        socket_path = str(tmp_path / "d.sock")
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(socket_path)
+        stale.close()
+        assert connect(socket_path) is None
+        assert connect(str(tmp_path / "missing.sock")) is None
+
+        docs_dir = tmp_path / "docs"
+        vector_store_path = str(tmp_path / "kb")
+        Path(f"{vector_store_path}.faiss").write_bytes(b"index")
+
+        class StaticRAG:
+            vector_store = SimpleNamespace(is_built=True, index=SimpleNamespace(ntotal=1))
+            llm = SimpleNamespace(list_available_providers=lambda: ["groq"])
+
+            def __init__(self):
+                self.docs_dir = str(docs_dir)
+                self.vector_store_path = vector_store_path
+                self.index_version = os.stat(f"{vector_store_path}.faiss").st_mtime_ns
+
+            async def generate_answer_async(self, query, provider="groq", top_k=3):
+                return {
+                    "answer": f"{provider}: {query}",
+                    "sources": [],
+                    "query": query,
+                    "context_used": top_k,
+                }
+
+            async def astream_answer(self, query, provider="groq", top_k=3):
+                for event in ({"type": "token", "text": "RAG"}, {"type": "done", "answer": "RAG"}):
+                    yield event
+
+        Path(socket_path).unlink()
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(socket_path)
+        server = uvicorn.Server(
+            uvicorn.Config(create_app(StaticRAG(), serves_paths=True), log_level="warning")
+        )
+        thread = threading.Thread(target=server.run, kwargs={"sockets": [listener]})
+        thread.start()
+        try:
+            while not server.started:
+                time.sleep(0.01)
+            client = connect(socket_path)
+            assert client is not None
+            assert client.generate_answer("q", "together")["answer"] == "together: q"
+            events = list(client.stream_answer("q"))
+            assert [event["type"] for event in events] == ["token", "done"]
+            with pytest.raises(ValueError):
+                client.generate_answer(" ")
+            client.close()
+
+            served = connect(socket_path, str(docs_dir), vector_store_path)
+            assert served is not None
+            served.close()
+            assert connect(socket_path, str(tmp_path / "other"), vector_store_path) is None
+            # A rebuild replaces the saved index after the daemon loaded it
+            stat = os.stat(f"{vector_store_path}.faiss")
+            os.utime(f"{vector_store_path}.faiss", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            assert connect(socket_path, str(docs_dir), vector_store_path) is None
+        finally:
+            server.should_exit = True
+            thread.join()
+            listener.close()
+
+
+class TestBatchMode:
+    """Tests for JSONL batch answering"""
+
+    class EchoRAG:
+        """Answers by echoing the query; queries listed in `failing` get an LLM error"""
+
+        def __init__(self, failing=()):
+            self.failing = set(failing)
+            self.searched = []
+
+        def search_batch(self, queries, top_k=3):
+            self.searched.append(list(queries))
+            return [[] for _ in queries]
+
+        def generate_answer_from_docs(self, query, docs, provider="groq", priority=0):
+            if query in self.failing:
+                return {"answer": "", "sources": [], "query": query, "error": "LLM error"}
+            return {"answer": query.upper(), "sources": [], "query": query}
+
+    def test_batch_writes_answers_and_resumes(self, tmp_path):
+        """Tests windowed retrieval, incremental output and resume after errors and a crash"""
+        import json
+
+        from sglang_demo.batch import BatchRunner
+
+        questions = tmp_path / "questions.jsonl"
+        lines = [json.dumps({"id": f"q{i}", "query": f"question {i}"}) for i in range(5)]
+        questions.write_text("\n".join(lines + ['{"question": "no id"}', '{"query": " "}']) + "\n")
+        answers = tmp_path / "answers.jsonl"
+
+        rag = self.EchoRAG(failing={"question 3"})
+        stats = BatchRunner(rag, max_workers=2, search_batch_size=2).run(
+            str(questions), str(answers)
+        )
+        assert stats["answered"] == 5 and stats["errors"] == 2
+        assert [len(window) for window in rag.searched] == [2, 2, 2]
+        rows = {row["id"]: row for row in map(json.loads, answers.read_text().splitlines())}
+        assert rows["q1"]["answer"] == "QUESTION 1"
+        assert rows[6]["answer"] == "NO ID"
+
+        # Simulate a write cut short by a crash, then resume
+        with open(answers, "a") as f:
+            f.write('{"id": "q4", "answ')
+        rag = self.EchoRAG()
+        stats = BatchRunner(rag, max_workers=2, search_batch_size=2).run(
+            str(questions), str(answers)
+        )
+        assert stats["skipped"] == 5
+        assert rag.searched == [["question 3"]]
+        rows = [json.loads(line) for line in answers.read_text().splitlines()]
+        assert sorted(str(row["id"]) for row in rows) == ["6", "7", "q0", "q1", "q2", "q3", "q4"]
+
+    def test_duplicate_ids_are_counted_and_reported(self, tmp_path, capsys):
+        """Tests that a repeated id is answered once and shows up as a duplicate"""
+        import json
+
+        from sglang_demo.batch import BatchRunner
+
+        questions = tmp_path / "questions.jsonl"
+        records = [{"id": "a", "query": "first"}, {"id": "a", "query": "again"}, {"query": "x"}]
+        questions.write_text("".join(json.dumps(record) + "\n" for record in records))
+        answers = tmp_path / "answers.jsonl"
+
+        stats = BatchRunner(self.EchoRAG()).run(str(questions), str(answers))
+
+        assert (stats["answered"], stats["duplicates"], stats["skipped"]) == (2, 1, 0)
+        assert "Duplicate id 'a'" in capsys.readouterr().out
+        rows = [json.loads(line) for line in answers.read_text().splitlines()]
+        assert [row["answer"] for row in rows if row["id"] == "a"] == ["FIRST"]
+
 
 class TestDocumentProcessor:
     """Test document processing functionality"""
@@ -95,6 +1438,31 @@ class TestDocumentProcessor:
 
         assert clean_text == "This has extra whitespace"
 
+    def test_streaming_chunker_matches_in_memory_chunking(self, tmp_path):
+        """Tests that block-wise streaming gives the same chunks even with words split by blocks"""
+        text = " ".join(f"wörd{i}" for i in range(57)) + "\n\n tail"
+        (tmp_path / "doc.txt").write_text(text, encoding="utf-8")
+
+        processor = DocumentProcessor(chunk_size=10, chunk_overlap=3, workers=1)
+        processor.READ_BLOCK_SIZE = 7
+
+        streamed = list(processor.iter_chunks(tmp_path / "doc.txt"))
+        assert streamed == processor._chunk_text(text, "doc.txt")
+        assert streamed[-1].metadata["end_word"] == 58
+
+    def test_parallel_loading_matches_sequential(self, tmp_path):
+        """Tests that chunking files in a process pool yields the same chunks in file order"""
+        for i in range(6):
+            (tmp_path / f"doc{i}.txt").write_text(" ".join(f"word{i}_{j}" for j in range(40)))
+        (tmp_path / "empty.txt").write_text("   ")
+
+        sequential = DocumentProcessor(chunk_size=10, chunk_overlap=2, workers=1)
+        parallel = DocumentProcessor(chunk_size=10, chunk_overlap=2, workers=3)
+        files = sorted(tmp_path.glob("*.txt"))
+
+        assert parallel.load_documents(str(tmp_path)) == sequential.load_documents(str(tmp_path))
+        assert [path for path, _ in parallel.iter_file_chunks(files)] == files
+
 
 # Integration test
 class TestIntegration: